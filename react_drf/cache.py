@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import re
+
+from django.db.models.query import QuerySet
+
+from react_drf.writer import file_stat, write_atomically
+
+
+CACHE_VERSION = 4
+
+MEMORY_ADDRESS = re.compile(r' at 0x[0-9a-fA-F]+')
+
+
+def stable_repr(value, seen=None):
+    """
+    A repr that is stable across processes, used to fingerprint serializers
+    and views. Querysets are never evaluated and classes are named by their
+    import path.
+    """
+    seen = seen or set()
+
+    if id(value) in seen:
+        return '...'
+    elif isinstance(value, QuerySet):
+        return 'QuerySet(%s)' % value.model._meta.label
+    elif isinstance(value, type):
+        if hasattr(value, '_original_name'):
+            return '%s.%s' % (value._original_module, value._original_name)
+        return '%s.%s' % (value.__module__, value.__qualname__)
+    elif isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return repr(value)
+    elif callable(value) and hasattr(value, '__qualname__'):
+        return '%s.%s' % (getattr(value, '__module__', None), value.__qualname__)
+
+    seen = seen | {id(value)}
+
+    if isinstance(value, dict):
+        return '{%s}' % ', '.join('%s: %s' % (stable_repr(key, seen), stable_repr(value[key], seen))
+                                  for key in sorted(value, key=str))
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=str) if isinstance(value, (set, frozenset)) else value
+        return '[%s]' % ', '.join(stable_repr(item, seen) for item in items)
+    elif hasattr(value, 'deconstruct') and not hasattr(value, '__code__'):
+        # Django's validators and model fields, by the arguments they were
+        # built with.
+        return stable_repr(value.deconstruct(), seen)
+    elif hasattr(value, '__dict__') and not hasattr(value, '__code__'):
+        # Arbitrary objects, such as validators, may hold querysets. Walk
+        # their attributes rather than trusting their repr.
+        return '%s(%s)' % (stable_repr(type(value)), stable_repr(vars(value), seen))
+
+    return MEMORY_ADDRESS.sub('', repr(value))
+
+
+def signature(value):
+    """
+    A stable encoding of `value`. Plain data, most of a fingerprint, is
+    encoded as JSON, which is much faster than stable_repr. Anything else
+    falls back to it.
+    """
+    try:
+        return json.dumps(value, sort_keys=True, default=stable_repr)
+    except (TypeError, ValueError):
+        # Keys that are not strings, or that cannot be sorted, and cycles.
+        return stable_repr(value)
+
+
+def digest(*parts):
+    return hashlib.sha1(signature(parts).encode('utf-8')).hexdigest()
+
+
+class ExportCache(object):
+    """
+    Fingerprint cache for generated entries, stored next to the output as a
+    JSON index of fingerprints, with the value of every entry in a file of
+    its own in the directory named after the index. Values are read back
+    whenever they are used rather than kept, so a run never holds all of
+    them at once. Entries that are not used during a run are dropped on
+    save. The files written from the entries are recorded by their
+    modification time and size, so a run changing nothing can leave them
+    alone.
+
+    Without a path, values are kept in memory instead.
+    """
+
+    def __init__(self, path=None, entries=None, outputs=None):
+        self.path = path
+        self.directory = os.path.splitext(path)[0] if path is not None else None
+        self.entries = entries or {}
+        self.outputs = outputs or {}
+        self.used = {}
+        self.values = {}
+        self.changed = False
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r') as f:
+                stored = json.load(f)
+        except (IOError, ValueError):
+            return cls(path)
+
+        if stored.get('version') != CACHE_VERSION:
+            return cls(path)
+        return cls(path, stored.get('entries'), stored.get('outputs'))
+
+    def value_path(self, key, fingerprint):
+        filename = hashlib.sha1(('%s\0%s' % (key, fingerprint)).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, '%s.json' % filename)
+
+    def is_fresh(self, key, fingerprint):
+        entry = self.entries.get(key)
+
+        if entry is None or entry['fingerprint'] != fingerprint:
+            return False
+        return self.directory is None or os.path.exists(self.value_path(key, fingerprint))
+
+    def meta(self, key):
+        """
+        What was stored along with the entry's fingerprint, which unlike its
+        value is kept in memory.
+        """
+        return (self.used.get(key) or self.entries[key]).get('meta')
+
+    def use(self, key):
+        self.used[key] = self.entries[key]
+
+    def value(self, key):
+        if self.directory is None:
+            return self.values[key]
+
+        with open(self.value_path(key, self.used[key]['fingerprint']), 'r') as f:
+            return json.load(f)
+
+    def stored(self, key):
+        return StoredValue(self, key)
+
+    def get_or_build(self, key, fingerprint, build):
+        if not self.is_fresh(key, fingerprint):
+            return self.store(key, fingerprint, build())
+        self.use(key)
+        return self.value(key)
+
+    def store(self, key, fingerprint, value, meta=None):
+        entry = self.entries.get(key)
+        self.used[key] = {'fingerprint': fingerprint}
+
+        if meta is not None:
+            self.used[key]['meta'] = meta
+
+        if self.directory is None:
+            self.values[key] = value
+            self.changed = True
+            return value
+
+        filename = self.value_path(key, fingerprint)
+        contents = json.dumps(value, sort_keys=True)
+
+        # Entries with the same fingerprint, such as serializers nesting a
+        # changed one, may still have been built differently.
+        if entry == self.used[key] and read_file(filename) == contents:
+            return value
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        # Only read by the cache, so replaced without the care taken with
+        # output files.
+        with open('%s.tmp' % filename, 'w') as f:
+            f.write(contents)
+        os.replace('%s.tmp' % filename, filename)
+
+        self.changed = True
+        return value
+
+    def is_unchanged(self):
+        """
+        Whether every entry loaded was used as it was, and no other.
+        """
+        return not self.changed and self.used.keys() == self.entries.keys()
+
+    def is_written(self, signature):
+        """
+        Whether the files recorded by `written` with the same `signature`
+        are untouched, and the entries they were written from unchanged.
+        """
+        files = self.outputs.get('files')
+
+        return (
+            self.is_unchanged() and bool(files) and self.outputs.get('signature') == signature and
+            all(file_stat(filename) == stat for filename, stat in files.items())
+        )
+
+    def written(self, signature, filenames):
+        outputs = {
+            'signature': signature,
+            'files': {filename: file_stat(filename) for filename in filenames},
+        }
+
+        if outputs != self.outputs:
+            self.outputs = outputs
+            self.changed = True
+
+    def save(self):
+        if self.path is None or self.is_unchanged():
+            return
+
+        write_atomically(self.path, json.JSONEncoder(sort_keys=True).iterencode({
+            'version': CACHE_VERSION,
+            'entries': self.used,
+            'outputs': self.outputs,
+        }))
+
+        if os.path.isdir(self.directory):
+            filenames = {self.value_path(key, entry['fingerprint']) for key, entry in self.used.items()}
+
+            for filename in os.listdir(self.directory):
+                path = os.path.join(self.directory, filename)
+
+                if path not in filenames:
+                    os.remove(path)
+
+
+def read_file(filename):
+    try:
+        with open(filename, 'r') as f:
+            return f.read()
+    except (IOError, OSError):
+        return None
+
+
+class StoredValue(object):
+    """
+    The value of a cache entry, read back whenever it is used instead of
+    being kept in memory.
+    """
+
+    def __init__(self, cache, key):
+        self.cache = cache
+        self.key = key
+
+    def __iter__(self):
+        return iter(self.cache.value(self.key))
+
+    def __getitem__(self, name):
+        return self.cache.value(self.key)[name]
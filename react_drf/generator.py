@@ -1,17 +1,29 @@
-from django.contrib.auth import get_user_model
 from django.core.exceptions import FieldDoesNotExist
-from django.core.urlresolvers import RegexURLPattern
+from django.utils.encoding import force_text
 from django.template.loader import render_to_string
-from django.test import RequestFactory
 
 from rest_framework import serializers
 from rest_framework.metadata import SimpleMetadata
 
-factory = RequestFactory()
+from react_drf import profiling, typescript
+from react_drf.cache import ExportCache, digest
+from react_drf.introspection import clear_contexts, introspection_context
+from react_drf.registry import ExportRegistry, pattern_key, serializer_key
+from react_drf.routes import URLPattern, clear_templates, route_source, url_prefixes, url_template
+from react_drf.serializers import CompiledRepresentationMixin, SparseFieldsMixin, classify_field
+from react_drf.settings import get_setting
+from react_drf.writer import write_atomically
 
 import collections
+import functools
+import glob
+import hashlib
+import io
+import itertools
 import json
+import os
 import re
+import sys
 
 
 class DenumMeta(type):
@@ -74,15 +86,39 @@ def snake_case(name):
 def constant_case(name):
     return snake_case(name).upper()
 
-patterns_to_export = []
-serializers_to_export = []
+registry = ExportRegistry()
+patterns_to_export = registry.patterns
+serializers_to_export = registry.serializers
+
+
+def calling_module():
+    """
+    The first module outside of this package on the stack, i.e. the one
+    registering exports.
+    """
+    frame = sys._getframe(1)
+
+    while frame.f_globals.get('__name__', '').startswith('react_drf.'):
+        frame = frame.f_back
+    return frame.f_globals.get('__name__')
 
 
 def register_list_of_urls_for_export(patterns):
-    patterns_to_export.extend(patterns)
+    from react_drf.renderers import require_msgpack
+
+    module = calling_module()
+
+    for pattern in patterns:
+        require_msgpack(pattern.callback.view_class)
+        pattern._export_module = module
+        registry.patterns.add(pattern)
     return patterns
 
 
+def register_serializer_for_export(SourceSerializer):
+    return registry.serializers.add(SourceSerializer)
+
+
 def export(*input, **kwargs):
     if kwargs:
         return bind_export(**kwargs)
@@ -112,17 +148,21 @@ def export(*input, **kwargs):
         return Wrapped
 """
 
-def bind_export(discriminate=False):
+def bind_export(discriminate=False, compiled=False, context=None):
     def _export(*input):
-        if len(input) > 1 or type(input[0]) == RegexURLPattern:
+        if len(input) > 1 or isinstance(input[0], URLPattern):
             return register_list_of_urls_for_export(input)
         elif not len(input) == 1 or not issubclass(input[0], serializers.Serializer):
             assert False, "Export only supports url patterns or serializers."
         else:
             SourceSerializer = input[0]
 
-            class Wrapped(SourceSerializer):
+            mixins = (CompiledRepresentationMixin, SparseFieldsMixin) if compiled else (SparseFieldsMixin,)
+
+            class Wrapped(*mixins, SourceSerializer):
                 _original_name = SourceSerializer.__name__
+                _original_module = SourceSerializer.__module__
+                _export_context = context
 
                 if discriminate:
                     type = serializers.SerializerMethodField()
@@ -134,26 +174,269 @@ def bind_export(discriminate=False):
                         class Meta(SourceSerializer.Meta):
                             fields = (list(SourceSerializer.Meta.fields) + ['type']) if SourceSerializer.Meta.fields != '__all__' else '__all__'
 
-            serializers_to_export.append(Wrapped)
-            return Wrapped
+            return register_serializer_for_export(Wrapped)
     return _export
 
-def process_serializers():
+def code_signature(cls):
+    """
+    The bytecode of every function defined along the MRO outside of Django,
+    REST framework and this package, whose sources package_signature
+    covers, so overriding things like `get_fields` counts as a change.
+    """
+    return [class_code(klass) for klass in cls.__mro__
+            if klass.__module__.split('.')[0] not in ('rest_framework', 'django', 'builtins', 'react_drf')]
+
+@functools.lru_cache(maxsize=None)
+def class_code(klass):
+    """
+    Digests the functions `klass` defines, once per run, as mixins and
+    base serializers are shared by many exported ones.
+    """
+    signature = []
+
+    for name, attribute in sorted(vars(klass).items()):
+        code = getattr(attribute, '__code__', None)
+
+        if code is not None:
+            signature.append((klass.__qualname__, name, code.co_code, code.co_consts, code.co_names))
+    return digest(signature)
+
+def model_signature(model):
+    signature = [model._meta.label]
+
+    for field in model._meta.get_fields():
+        if hasattr(field, 'deconstruct'):
+            signature.append(field.deconstruct())
+        else:
+            signature.append((field.name, type(field).__name__, field.related_model))
+
+    for name, attribute in sorted(vars(model).items()):
+        if type(attribute) is DenumMeta:
+            signature.append((name, list(attribute._ordered.items()), list(attribute.members())))
+    return signature
+
+@functools.lru_cache(maxsize=None)
+def fingerprint_model(model):
+    """
+    Shared by every serializer of `model`, so its fields are only
+    deconstructed once per run.
+    """
+    return digest(model_signature(model))
+
+def field_signature(field):
+    if isinstance(field, serializers.ListSerializer):
+        # The child is in the kwargs too, signed by its fingerprint instead.
+        kwargs = {name: value for name, value in field._kwargs.items() if name != 'child'}
+        return ('list', field_signature(field.child), kwargs)
+    elif isinstance(field, serializers.BaseSerializer):
+        return ('serializer', fingerprint_serializer(type(field)), field._kwargs)
+    return (type(field), field._args, field._kwargs)
+
+@functools.lru_cache(maxsize=None)
+def fingerprint_serializer(SourceSerializer):
+    meta = getattr(SourceSerializer, 'Meta', None)
+    meta_signature = []
+
+    for name in dir(meta) if meta is not None else []:
+        if name.startswith('_'):
+            continue
+        elif name == 'model':
+            meta_signature.append(fingerprint_model(meta.model))
+        else:
+            meta_signature.append((name, getattr(meta, name)))
+
+    return digest(
+        generator_fingerprint(),
+        SourceSerializer,
+        [klass for klass in SourceSerializer.__mro__],
+        code_signature(SourceSerializer),
+        getattr(SourceSerializer, '_export_context', None),
+        [(name, field_signature(field)) for name, field in SourceSerializer._declared_fields.items()],
+        meta_signature,
+    )
+
+def fingerprint_pattern(pattern):
+    """
+    Only what process_pattern reads from the view counts. Walking every
+    attribute would pick up ones REST framework fills in lazily, such as its
+    settings, so the second run in a process would rebuild every view.
+    """
+    view_class = pattern.callback.view_class
+
+    return digest(
+        generator_fingerprint(),
+        route_source(pattern),
+        pattern.name,
+        [(route_source(entry), entry.namespace) for entry in url_prefixes().get(id(pattern), ())],
+        view_class,
+        [klass for klass in view_class.__mro__],
+        view_class.serializer_class,
+        view_class.lookup_field,
+        getattr(view_class, 'coalesce_requests', True),
+        getattr(view_class, 'pagination_class', None),
+        is_paginated(view_class),
+        list(getattr(view_class, 'renderer_classes', ())),
+    )
+
+def generator_signature():
+    """
+    Output also depends on this package and its settings, so any change to
+    them invalidates every cached entry.
+    """
+    from django.conf import settings
+
+    return [getattr(settings, 'REACT_DRF', {}), package_signature()]
+
+@functools.lru_cache(maxsize=None)
+def generator_fingerprint():
+    # Settings only change between runs, which clear it.
+    return digest(generator_signature())
+
+@functools.lru_cache(maxsize=None)
+def package_signature():
+    """
+    The sources and templates of this package, which cannot change without
+    restarting the process, so they are only hashed once.
+    """
+    package_directory = os.path.dirname(os.path.abspath(__file__))
+    sources = []
+
+    for pattern in ('*.py', os.path.join('templates', '*.ts')):
+        for filename in sorted(glob.glob(os.path.join(package_directory, pattern))):
+            with open(filename, 'rb') as f:
+                sources.append(hashlib.sha1(f.read()).hexdigest())
+    return sources
+
+def clear_fingerprints():
+    fingerprint_serializer.cache_clear()
+    fingerprint_model.cache_clear()
+    class_code.cache_clear()
+    generator_fingerprint.cache_clear()
+    clear_templates()
+    clear_contexts()
+
+def process_serializers(cache=None, jobs=1):
     class_definitions = ["class RelatedModel {}"]
 
-    for SourceSerializer in serializers_to_export:
-        process_serializer(class_definitions, SourceSerializer)
+    for SourceSerializer, entry in serializer_entries(cache, jobs):
+        class_definitions.extend(entry['definitions'])
     return class_definitions
 
-def process_serializer(class_definitions, SourceSerializer):
+def serializer_entries(cache=None, jobs=1):
+    """
+    Pairs every exported serializer with its generated definitions and the
+    serializers it nests, reusing cached entries whose fingerprint matches.
+    Entries of serializers nesting a changed one, as recorded by the
+    registry, are built again too. Nested serializers come before the ones
+    nesting them. With a cache, entries are stored as they are built and
+    read back from it when used.
+    """
+    changed = set()
+
+    for SourceSerializer in serializers_to_export:
+        key = serializer_key(SourceSerializer)
+
+        if cache is None or not cache.is_fresh('serializer:%s' % key, fingerprint_serializer(SourceSerializer)):
+            changed.add(key)
+        else:
+            registry.set_dependencies(key, cache.meta('serializer:%s' % key))
+
+    stale_keys = registry.dependents(changed)
+    stale = [
+        index for index, SourceSerializer in enumerate(serializers_to_export)
+        if serializer_key(SourceSerializer) in stale_keys
+    ]
+    profiling.count('cached serializers', len(serializers_to_export) - len(stale))
+    entries = {}
+
+    for index, entry in build_serializers(stale, jobs):
+        SourceSerializer = serializers_to_export[index]
+        key = serializer_key(SourceSerializer)
+
+        if cache is None:
+            entries[key] = entry
+        else:
+            cache.store('serializer:%s' % key, fingerprint_serializer(SourceSerializer), entry, entry['dependencies'])
+        registry.set_dependencies(key, entry['dependencies'])
+
+    if cache is not None:
+        for index, SourceSerializer in enumerate(serializers_to_export):
+            key = serializer_key(SourceSerializer)
+
+            if key not in stale_keys:
+                cache.use('serializer:%s' % key)
+            entries[key] = cache.stored('serializer:%s' % key)
+
+    return [(SourceSerializer, entries[serializer_key(SourceSerializer)])
+            for SourceSerializer in registry.topological_order()]
+
+def build_serializers(indexes, jobs=1):
+    """
+    Runs process_serializer for the exported serializers at the given
+    positions, yielding each position with its result in order. With more
+    than one job, they are spread across forked worker processes, which
+    inherit the loaded registry.
+    """
+    if jobs > 1 and len(indexes) > 1:
+        import multiprocessing
+
+        with multiprocessing.get_context('fork').Pool(min(jobs, len(indexes)), forget_connections) as pool:
+            if profiling.active is None:
+                yield from zip(indexes, pool.imap(process_serializer_at, indexes))
+            else:
+                for index, (result, state) in zip(indexes, pool.imap(profiled_serializer_at, indexes)):
+                    profiling.active.merge(state)
+                    yield index, result
+    else:
+        for index in indexes:
+            yield index, process_serializer_at(index)
+
+def forget_connections():
+    """
+    Runs in forked workers, whose database connections are the parent's.
+    Closing them would close the parent's, so they are dropped and workers
+    open their own. In-memory SQLite databases, such as test databases, only
+    exist in the connection and are kept.
+    """
+    from django.db import connections
+
+    for connection in connections.all():
+        name = str(connection.settings_dict['NAME'])
+
+        if connection.vendor != 'sqlite' or not (name == ':memory:' or 'mode=memory' in name):
+            connection.connection = None
+
+def process_serializer_at(index):
+    SourceSerializer = serializers_to_export[index]
+    dependencies = []
+    columns = []
+    choices = []
+
+    with profiling.entry('serializer', serializer_key(SourceSerializer)):
+        definitions = process_serializer([], SourceSerializer, dependencies, columns, choices)
+
+    return {
+        'definitions': definitions,
+        'dependencies': dependencies,
+        'columns': columns,
+        'choices': choices,
+    }
+
+def profiled_serializer_at(index):
+    # Runs in worker processes, whose timings are merged by the parent.
+    with profiling.profiling() as profile:
+        result = process_serializer_at(index)
+    return result, profile.state()
+
+def process_serializer(class_definitions, SourceSerializer, dependencies=None, columns=None, choices=None):
     # return SourceSerializer
     class_name = stylize_class_name(SourceSerializer._original_name)
-    class_schema = []
     class_statics = []
     class_constants = []
     class_constants_map = {}
     class_members = []
     class_methods = []
+    lap = profiling.laps('serializers')
 
     if issubclass(SourceSerializer, serializers.ModelSerializer):
         for name, attribute in vars(SourceSerializer.Meta.model).items():
@@ -197,14 +480,13 @@ def process_serializer(class_definitions, SourceSerializer):
                 else:
                     assert False, "Unsupported enum type"
 
-    request = factory.get('/')
-    user = get_user_model()()
+    serializer_instance = SourceSerializer(read_only=True, context=introspection_context(SourceSerializer))
+    profiling.count('fields', len(serializer_instance.fields))
+    lap('instantiate')
 
-    # Hard coded for now
-    from apps.journal.models import Profile
-    user.profile = Profile()
-    request.user = user
-    serializer_instance = SourceSerializer(read_only=True, context={'request': request})
+    if columns is not None:
+        # As rendered by ColumnarJSONRenderer.
+        columns.extend(name for name, field in serializer_instance.fields.items() if not field.write_only)
 
     for name, field in serializer_instance.fields.items():
         if name == 'units':
@@ -214,10 +496,18 @@ def process_serializer(class_definitions, SourceSerializer):
             class_members.append("%s: '%s';" %  (name, snake_case(stylize_class_name(SourceSerializer._original_name))))
             continue
 
-        if isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.ModelSerializer):
+        kind = classify_field(field)
+
+        if kind == 'nested_many':
+            if dependencies is not None:
+                dependencies.append(serializer_key(field.child.__class__))
+
             class_members.append('%s: %s[];' %  (name,
                                             stylize_class_name(field.child.__class__._original_name)))
-        elif isinstance(field, serializers.ModelSerializer):
+        elif kind == 'nested':
+            if dependencies is not None:
+                dependencies.append(serializer_key(field.__class__))
+
             field_type = stylize_class_name(field.__class__._original_name)
 
             if (field.allow_null):
@@ -225,13 +515,16 @@ def process_serializer(class_definitions, SourceSerializer):
 
             class_members.append('%s: %s;' %  (name,
                                             field_type))
-        elif isinstance(field, serializers.ChoiceField):
+        elif kind == 'choice':
             try:
                 model_field = SourceSerializer.Meta.model._meta.get_field(name)
             except FieldDoesNotExist:
                 continue
                 # Currently skipping serializer only choice fields.
 
+            if choices is not None:
+                choices.append(name)
+
             if type(model_field.choices) is DenumMeta:
                 class_members.append('%s: %s.%s;' % (name, class_name, class_constants_map[model_field.choices.__name__]))
             else:
@@ -247,21 +540,21 @@ def process_serializer(class_definitions, SourceSerializer):
                 'name': name,
                 'class_name': class_name,
             })
-        elif isinstance(field, serializers.JSONField):
+        elif kind == 'json':
             # Must be typed manually.
             pass
             # class_members.append('%s: {[name: string]: any};' % name)
-        elif isinstance(field, serializers.IntegerField):
+        elif kind == 'integer':
             class_members.append('%s: number;' % name)
-        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+        elif kind == 'primary_key':
             # TODO: primary key might not be a number.
             if (field.allow_null):
                 class_members.append('%s: number|null;' % name)
             else:
                 class_members.append('%s: number;' % name)
-        elif isinstance(field, serializers.BooleanField):
+        elif kind == 'boolean':
             class_members.append('%s: boolean;' % name)
-        elif isinstance(field, serializers.ManyRelatedField):
+        elif kind == 'primary_keys':
             class_members.append('%s: number[];' % name)
         else:
             if (field.allow_null):
@@ -269,23 +562,24 @@ def process_serializer(class_definitions, SourceSerializer):
             else:
                 class_members.append('%s: string;' % name)
 
+    lap('fields')
     metadata_handler = SimpleMetadata()
     serializer_metadata = metadata_handler.get_serializer_info(serializer_instance)
+    lap('metadata')
 
-    for field_name, field in serializer_metadata.items():
+    class_schema = io.StringIO()
+
+    for index, (field_name, field) in enumerate(serializer_metadata.items()):
         field['name'] = field_name
-        casted = json.dumps(field)
-
-        casted = re.sub(r'"name": ("(\w+)")', r'"name": \1 as \1', casted)
-        casted = casted.replace('"string"', '"string" as "string"')
-        casted = casted.replace('"datetime"', '"datetime" as "datetime"')
-        casted = casted.replace('"field"', '"field" as "field"')
-        casted = casted.replace('"email"', '"email" as "email"')
-        casted = casted.replace('"decimal"', '"decimal" as "decimal"')
-        casted = casted.replace('"integer"', '"integer" as "integer"')
-        casted = casted.replace('"boolean"', '"boolean" as "boolean"')
-        casted = casted.replace('"choice"', '"choice" as "choice"')
-        class_schema.append('%s: %s,' % (field_name, casted))
+
+        if index:
+            class_schema.write('\n')
+        class_schema.write('%s: ' % field_name)
+        typescript.write_literal(class_schema.write, field)
+        class_schema.write(',')
+
+    class_validator = compile_validator(class_name, serializer_instance, serializer_metadata)
+    lap('validator')
 
     class_definition = """
     /*
@@ -313,6 +607,7 @@ def process_serializer(class_definitions, SourceSerializer):
             %(class_schema)s
         };
         %(class_constants)s
+        %(class_validator)s
         /*
         export interface Data {
             %(class_members)s
@@ -325,89 +620,659 @@ def process_serializer(class_definitions, SourceSerializer):
         'class_constants': "\n".join(class_constants),
         'class_members': "\n".join(class_members),
         'class_methods': "\n".join(class_methods),
-        'class_schema': "\n".join(class_schema),
+        'class_schema': class_schema.getvalue(),
+        'class_validator': class_validator,
     }
 
     class_definitions.append(class_definition)
+    lap('render')
+    return class_definitions
 
-def process_patterns():
+VALIDATOR = """
+        // Rejects what the serializer would reject for these checks, before
+        // sending it. Returns the errors by field, as in a 400 response, or
+        // null when there are none.
+        %(choices)sexport const validate = (item: Partial<%(name)s>): {[field: string]: string[]}|null => {
+            const data: any = item;
+            const errors: {[field: string]: string[]} = {};
+            let value: any;
+            %(checks)s
+            return Object.keys(errors).length > 0 ? errors : null;
+        };"""
+
+# Choices are keyed by str() of their values, which spells booleans
+# differently.
+CHOICE_KEYS = """const validChoices: {[field: string]: Set<string>} = {%s};
+
+        const choiceKey = (value: any): string => typeof value === 'boolean' ? (value ? 'True' : 'False') : String(value);
+
+        """
+
+VALIDATOR_CHECK = """
+            value = data[%(key)s];
+
+            %(branches)s"""
+
+def field_checks(name, field, info):
+    """
+    The conditions on `value` under which `field` fails, paired with its
+    message, in the order the field checks them.
+    """
+    def message(key, **kwargs):
+        return typescript.literal(force_text(field.error_messages[key]).format(**kwargs))
+
+    checks = []
+
+    if info['required']:
+        checks.append(('value === undefined', message('required')))
+    if not field.allow_null:
+        checks.append(('value === null', message('null')))
+    # Strings are validated with their whitespace trimmed, blank ones only
+    # checked for being allowed.
+    text = 'value.trim()' if getattr(field, 'trim_whitespace', False) else 'value'
+
+    if getattr(field, 'allow_blank', True) is False and 'blank' in field.error_messages:
+        checks.append(("typeof value === 'string' && %s === ''" % text, message('blank')))
+
+    if 'min_length' in info:
+        checks.append(("typeof value === 'string' && %s !== '' && %s.length < %d" % (text, text, info['min_length']),
+                       message('min_length', min_length=info['min_length'])))
+    if 'max_length' in info:
+        checks.append(("typeof value === 'string' && %s.length > %d" % (text, info['max_length']),
+                       message('max_length', max_length=info['max_length'])))
+
+    # Decimals are sent as strings, so values are compared as numbers.
+    if 'min_value' in info:
+        checks.append(("value !== undefined && value !== null && value !== '' && Number(value) < %s" % typescript.literal(info['min_value']),
+                       message('min_value', min_value=info['min_value'])))
+    if 'max_value' in info:
+        checks.append(("value !== undefined && value !== null && value !== '' && Number(value) > %s" % typescript.literal(info['max_value']),
+                       message('max_value', max_value=info['max_value'])))
+
+    # Related fields list the rows they could point to, which may change.
+    if 'choices' in info and isinstance(field, serializers.ChoiceField):
+        # Choices are matched by their string, as the serializer does, and
+        # blank is a valid choice when allowed.
+        invalid = '!validChoices[%s].has(choiceKey(%%s))' % typescript.literal(name)
+
+        if field.allow_blank:
+            invalid = "%%s !== '' && %s" % invalid
+        invalid_choice = typescript.literal(force_text(field.error_messages['invalid_choice']))
+
+        if isinstance(field, serializers.MultipleChoiceField):
+            # Anything but a list fails on the server with its own message.
+            checks.append(('Array.isArray(value) && value.some(item => %s)' % invalid.replace('%s', 'item'),
+                           invalid_choice.replace('{input}', '" + value.find(item => %s) + "' % invalid.replace('%s', 'item'))))
+        else:
+            checks.append(('value !== undefined && value !== null && %s' % invalid.replace('%s', 'value'),
+                           invalid_choice.replace('{input}', '" + value + "')))
+    return checks
+
+def compile_validator(class_name, serializer_instance, serializer_metadata):
+    """
+    Compiles the required, null, blank, length, range and choice checks of
+    the writable fields described by `serializer_metadata` into a validate
+    function, one branch per check, so nothing is interpreted when it runs.
+    """
+    checks = []
+    choices = []
+
+    for name, info in serializer_metadata.items():
+        if info.get('read_only'):
+            continue
+
+        field = serializer_instance.fields[name]
+        branches = field_checks(name, field, info)
+
+        if 'choices' in info and isinstance(field, serializers.ChoiceField):
+            choices.append('%s: new Set<string>(%s)' % (
+                typescript.literal(name), typescript.literal(list(field.choice_strings_to_values))))
+
+        if branches:
+            checks.append(VALIDATOR_CHECK % {
+                'key': typescript.literal(name),
+                'branches': ' else '.join(
+                    'if (%s) {\n                errors[%s] = [%s];\n            }' % (condition, typescript.literal(name), message)
+                    for condition, message in branches
+                ),
+            })
 
+    return VALIDATOR % {
+        'name': class_name,
+        'choices': CHOICE_KEYS % ', '.join(choices) if choices else '',
+        'checks': '\n'.join(checks),
+    }
+
+def process_patterns(cache=None):
     exported_views = []
 
-    from rest_framework import mixins
-    from django.core.urlresolvers import reverse
+    for pattern, views in pattern_entries(cache):
+        exported_views.extend(views)
+    return exported_views
+
+def pattern_entries(cache=None):
+    """
+    Pairs every exported pattern with its views, reusing cached entries
+    whose fingerprint matches. With a cache, views are stored as they are
+    built and read back from it when used.
+    """
+    entries = []
 
     for pattern in patterns_to_export:
-        view_class = pattern.callback.view_class
-        serializer_class = view_class.serializer_class
+        if cache is None:
+            entries.append((pattern, build_pattern(pattern)))
+            continue
 
-        model_name = stylize_class_name(serializer_class._original_name)
-        camel_case_model_name = model_name[0].lower() + model_name[1:]
+        key = 'pattern:%s' % pattern_key(pattern)
+        fingerprint = fingerprint_pattern(pattern)
 
-        view_name = stylize_view_name(view_class.__name__)
-        constant_name = constant_case(view_name)
-        camel_case_name = view_name[0].lower() + view_name[1:]
+        if cache.is_fresh(key, fingerprint):
+            profiling.count('cached patterns')
+            cache.use(key)
+        else:
+            cache.store(key, fingerprint, build_pattern(pattern))
+        entries.append((pattern, cache.stored(key)))
+    return entries
+
+def build_pattern(pattern):
+    with profiling.entry('pattern', pattern_key(pattern)):
+        views = process_pattern([], pattern)
+        profiling.count('views', len(views))
+    return views
+
+ENTITY_SCHEMA = [
+    'entities: emptyTable<%(model_name)s>()',
+    'list: [] as %(key_type)s[]',
+]
+
+ENTITY_PAGE_SCHEMA = [
+    'next: null as string|null',
+    'hasMore: false',
+]
+
+ENTITY_REDUCERS = {
+    'merge': """
+case '%(FETCH_SUCCESS)s': {
+    const entities = mergeEntities(state.entities, [action.%(camel_case_name)s], item => item.%(key_name)s);
+    return Object.assign({}, state, {entities});
+}
+            """,
+    'list': """
+case '%(FETCH_SUCCESS)s': {
+    const entities = mergeEntities(state.entities, action.%(camel_case_name)s, item => item.%(key_name)s);
+    const list = action.%(camel_case_name)s.map(item => item.%(key_name)s);
+    return Object.assign({}, state, {entities, list});
+}
+            """,
+    'page': """
+case '%(FETCH_SUCCESS)s': {
+    const entities = mergeEntities(state.entities, action.%(camel_case_name)s, item => item.%(key_name)s);
+    const page = action.%(camel_case_name)s.map(item => item.%(key_name)s);
+    const list = action.append ? state.list.concat(page) : page;
+    return Object.assign({}, state, {entities, list, next: action.next, hasMore: action.next !== null});
+}
+            """,
+    'keep': """
+            // Currently we do not delete objects from the store.
+            """,
+    'sync': """
+case '%(FETCH_SUCCESS)s': {
+    const entities = removeEntities(mergeEntities(state.entities, action.changed, item => item.%(key_name)s), action.deleted);
+    const deleted = new Set(action.deleted);
+    let list = action.full && !action.append ? [] : state.list;
 
-        key_name = view_class.lookup_field if view_class.lookup_field != 'pk' else 'id'
-        key_type = 'string' if view_class.lookup_field != 'pk' else 'number'
+    if (deleted.size > 0) {
+        list = list.filter(key => !deleted.has(key));
+    }
 
-        by_key_name = '%ssById' % camel_case_model_name
-        list_name = '%sList' % camel_case_model_name
+    const known = new Set(list);
+    const added = action.changed.map(item => item.%(key_name)s).filter(key => !known.has(key));
+    const %(watermark_name)s = action.next === null ? action.watermark : state.%(watermark_name)s;
+    return Object.assign({}, state, {entities, list: added.length > 0 ? list.concat(added) : list, %(watermark_name)s});
+}
+            """,
+}
 
-        reverse_args = ['%s' % (position * 1000) for key, position in pattern.regex.groupindex.items()]
-        url_with_placeholders = reverse(pattern.name, args=reverse_args)
-        function_args = []
+def entity_reducer(kind, context):
+    """
+    Returns the slice schema and reducer of a view for the entity store,
+    where each model's state is kept in its own slice.
+    """
+    schema = ENTITY_SCHEMA + ENTITY_PAGE_SCHEMA if kind == 'page' else ENTITY_SCHEMA
 
-        for key, position in pattern.regex.groupindex.items():
-            function_args.append('%s: string|number' % key)
-            url_with_placeholders = url_with_placeholders.replace('%s' % (position * 1000), '${%s}' % key)
+    if kind == 'sync':
+        schema = schema + ['%(watermark_name)s: null as string|null']
+    return [item % context for item in schema], ENTITY_REDUCERS[kind] % context
 
-        # print(reverse(pattern.name))
-        base_context = {
-            'lookup_field': view_class.lookup_field,
-            'args': ', '.join(function_args),
-            'view_name': view_name,
-            'model_name': model_name,
-            'camel_case_name': camel_case_name,
-            'url': url_with_placeholders,
-            'list_name': list_name,
-            'by_key_name': by_key_name,
-            'key_name': key_name,
-        }
+CONDITIONAL_FETCH = """
+
+export const fetch%(view_name)s = (%(args)s) => {
+    return (dispatch: Dispatch) => %(coalesce_start)s{
+        dispatch({
+            type: '%(FETCH_REQUEST)s',
+        });
 
-        if issubclass(view_class, mixins.CreateModelMixin):
-            context = {**base_context, **dict(
-                view_name=view_class.__name__[:-4],
-                FETCH_REQUEST='CREATE_%s_REQUEST' % constant_case(view_class.__name__[:-4]),
-                FETCH_SUCCESS='CREATE_%s_SUCCESS' % constant_case(view_class.__name__[:-4]),
-                FETCH_ERROR='CREATE_%s_ERROR' % constant_case(view_class.__name__[:-4]),
-                camel_case_name = model_name[0].lower() + model_name[1:]
-            )}
-
-            view_actions = [
-                """{type: '%(FETCH_REQUEST)s', %(camel_case_name)s: %(model_name)s}""" % context,
-                """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s}""" % context,
-                """{type: '%(FETCH_ERROR)s', errors: any}""" % context,
-            ]
-
-            schema = [
-                '%s: {} as {[%s: %s]: %s}' % (by_key_name, key_name, key_type, model_name),
-                '%s: [] as number[]' % (list_name),
-            ]
-
-            reducer_definition = """
+        return conditionalGet<%(response_type)s>(`%(url)s`%(conditional_options)s).then(response => {
+            // Nothing to dispatch when the server answered 304 Not Modified.
+            if (response.modified) {
+                dispatch({
+                    type: '%(FETCH_SUCCESS)s',
+                    %(camel_case_name)s: response.data,
+                });
+            }
+            return response.data;
+        });
+    }%(coalesce_end)s;
+};"""
+
+SYNC_REDUCER = """
+case '%(FETCH_SUCCESS)s': {
+    const %(by_key_name)s = Object.assign({}, state.%(by_key_name)s);
+    const deleted = new Set(action.deleted);
+    let %(list_name)s = action.full && !action.append ? [] : state.%(list_name)s;
+
+    action.deleted.forEach(key => {
+        delete %(by_key_name)s[key];
+    });
+
+    if (deleted.size > 0) {
+        %(list_name)s = %(list_name)s.filter(key => !deleted.has(key));
+    }
+
+    const known = new Set(%(list_name)s);
+    const added = action.changed.map(item => {
+        %(by_key_name)s[item.%(key_name)s] = item;
+        return item.%(key_name)s;
+    }).filter(key => !known.has(key));
+
+    if (added.length > 0) {
+        %(list_name)s = %(list_name)s.concat(added);
+    }
+    // Only stored with the last page, so an interrupted sync starts over.
+    const %(watermark_name)s = action.next === null ? action.watermark : state.%(watermark_name)s;
+    return Object.assign({}, state, {%(by_key_name)s, %(list_name)s, %(watermark_name)s});
+}
+            """
+
+SYNC_FETCH = """
+
+// Merges what changed since `watermark`, the one stored after the previous
+// sync, or everything without one, following every page of full syncs.
+export const sync%(view_name)s = (%(sync_args)s) => {
+    const url = withSince(`%(url)s`, watermark);
+
+    return (dispatch: Dispatch) => %(sync_coalesce_start)s{
+        dispatch({
+            type: '%(FETCH_REQUEST)s',
+        });
+
+        const syncPage = (pageUrl: string, append: boolean): Promise<Delta<%(model_name)s>> => {
+            return %(get)s<Delta<%(model_name)s>>(pageUrl%(get_options)s).then(response => {
+                dispatch({
+                    type: '%(FETCH_SUCCESS)s',
+                    changed: response.data.changed,
+                    deleted: response.data.deleted,
+                    watermark: response.data.watermark,
+                    full: response.data.full,
+                    next: response.data.next,
+                    append,
+                });
+                return response.data.next === null ? response.data : syncPage(response.data.next, true);
+            });
+        };
+        return syncPage(url, false);
+    }%(sync_coalesce_end)s;
+};"""
+
+def sync_view(context, entity_store, runtime):
+    """
+    The thunk, actions and reducer merging the changes answered by views
+    with DeltaSyncMixin.
+    """
+    coalesced = bool(context['coalesce_start'])
+    context = dict(
+        context,
+        FETCH_REQUEST='SYNC_%s_REQUEST' % context['constant_name'],
+        FETCH_SUCCESS='SYNC_%s_SUCCESS' % context['constant_name'],
+        watermark_name='%sWatermark' % context['camel_case_name'],
+        sync_args=', '.join(filter(None, [context['args'], 'watermark: string|null'])),
+        sync_coalesce_start="coalesce('GET', url, () => " if coalesced else '',
+        sync_coalesce_end=')' if coalesced else '',
+    )
+
+    if entity_store:
+        schema, reducer_definition = entity_reducer('sync', context)
+        runtime = runtime + ['removeEntities']
+    else:
+        schema = [
+            '%(by_key_name)s: {} as {[%(key_name)s: %(key_type)s]: %(model_name)s}' % context,
+            '%(list_name)s: [] as number[]' % context,
+            '%(watermark_name)s: null as string|null' % context,
+        ]
+        reducer_definition = SYNC_REDUCER % context
+
+    return {
+        'schema': schema,
+        'reducer': reducer_definition,
+        'definition': SYNC_FETCH % context,
+        'actions': [
+            """{type: '%(FETCH_REQUEST)s'}""" % context,
+            """{type: '%(FETCH_SUCCESS)s', changed: %(model_name)s[], deleted: %(key_type)s[], watermark: string, full: boolean, next: string|null, append: boolean}""" % context,
+        ],
+        'model': context['model_name'],
+        'key_type': context['key_type'],
+        'runtime': runtime + ['withSince', 'Delta'],
+    }
+
+PAGINATED_REDUCER = """
+case '%(FETCH_SUCCESS)s': {
+    let %(by_key_name)s = Object.assign({}, state.%(by_key_name)s);
+    const page = action.%(camel_case_name)s.map(item => {
+        %(by_key_name)s[item.%(key_name)s] = item;
+        return item.%(key_name)s;
+    });
+    const %(list_name)s = action.append ? state.%(list_name)s.concat(page) : page;
+    const %(list_name)sNext = action.next;
+    const %(list_name)sHasMore = action.next !== null;
+    return Object.assign({}, state, {%(by_key_name)s, %(list_name)s, %(list_name)sNext, %(list_name)sHasMore});
+}
+            """
+
+PAGINATED_FETCH = """
+
+const fetch%(view_name)sPage = (url: string, append: boolean) => {
+    return (dispatch: Dispatch) => %(page_coalesce_start)s{
+        dispatch({
+            type: '%(FETCH_REQUEST)s',
+        });
+
+        return %(page_request)s<Page<%(model_name)s>>(url%(page_options)s).then(response => {%(page_success)s
+            return response.data.results;
+        });
+    }%(page_coalesce_end)s;
+};
+
+export const fetch%(view_name)s = (%(args)s) => fetch%(view_name)sPage(`%(url)s`, false);
+
+// Appends the page at `next`, as stored in the state after each page.
+export const fetchMore%(view_name)s = (next: string) => fetch%(view_name)sPage(next, true);"""
+
+PAGE_SUCCESS = """
+            dispatch({
+                type: '%(FETCH_SUCCESS)s',
+                %(camel_case_name)s: response.data.results,
+                next: response.data.next,
+                append,
+            });"""
+
+CONDITIONAL_PAGE_SUCCESS = """
+            // Nothing to dispatch when the server answered 304 Not Modified.
+            if (response.modified) {
+                dispatch({
+                    type: '%(FETCH_SUCCESS)s',
+                    %(camel_case_name)s: response.data.results,
+                    next: response.data.next,
+                    append,
+                });
+            }"""
+
+SPARSE_FETCH = """
+
+// Fetches only the given fields, leaving the store untouched.
+export const fetch%(view_name)sFields = <K extends keyof %(model_name)s>(%(sparse_args)s) => {
+    const url = withFields(`%(url)s`, fields);
+
+    return () => %(sparse_request)s;
+};"""
+
+def sparse_fetch(context, response_type):
+    request = "%s<%s>(url%s).then(response => response.data)" % (context['get'], response_type, context['get_options'])
+
+    if context['coalesce_start']:
+        request = "coalesce('GET', url, () => %s)" % request
+
+    return SPARSE_FETCH % dict(
+        context,
+        sparse_args=', '.join(filter(None, [context['args'], 'fields: K[]'])),
+        sparse_request=request,
+    )
+
+COLUMNAR_DECODER = """
+
+// Decodes %(model_name)s lists rendered by ColumnarJSONRenderer, directly
+// when the server sent the generated columns.
+const %(camel_case_name)sColumns = %(columns)s;
+
+export const %(camel_case_name)sRows = columnarFormat<%(model_name)s>(data => {
+    if (data.columns.join(',') !== %(camel_case_name)sColumns) {
+        return decodeColumns<%(model_name)s>(data);
+    }
+    return data.rows.map(row => ({%(members)s}) as %(model_name)s);
+});"""
+
+def columnar_decoder(model_name, columns):
+    return COLUMNAR_DECODER % {
+        'model_name': model_name,
+        'camel_case_name': model_name[0].lower() + model_name[1:],
+        'columns': json.dumps(','.join(columns)),
+        'members': ', '.join('%s: row[%s]' % (json.dumps(column), index) for index, column in enumerate(columns)),
+    }
+
+def model_definitions(model_entries, columnar=()):
+    """
+    The definitions of every model, with a columnar decoder for those
+    named in `columnar`, listed by views rendering columns.
+    """
+    for SourceSerializer, entry in model_entries:
+        model_name = stylize_class_name(SourceSerializer._original_name)
+        yield from entry['definitions']
+
+        if model_name in columnar:
+            yield columnar_decoder(model_name, entry['columns'])
+
+def columnar_models(views):
+    return {view['model'] for view in views if view.get('columnar')}
+
+
+class ViewList(object):
+    """
+    The views of several patterns, in order, optionally only those of one
+    model. Views read back from the export cache are only in memory while
+    iterated, so every iteration reads them again.
+    """
+
+    def __init__(self, sources, model=None):
+        self.sources = sources
+        self.model = model
+
+    def __iter__(self):
+        for source in self.sources:
+            for view in source:
+                if self.model is None or view['model'] == self.model:
+                    yield view
+
+    def by_model(self):
+        """
+        A ViewList of each model's views, by model name in order of
+        appearance, iterating only the sources holding them.
+        """
+        sources = collections.OrderedDict()
+
+        for source in self.sources:
+            for view in source:
+                if self.model is None or view['model'] == self.model:
+                    model_sources = sources.setdefault(view['model'], [])
+
+                    if not model_sources or model_sources[-1] is not source:
+                        model_sources.append(source)
+
+        return collections.OrderedDict((model, ViewList(model_sources, model))
+                                       for model, model_sources in sources.items())
+
+
+def response_format(view_class):
+    """
+    The first of the formats generated thunks can decode that the view
+    renders, in the view's order of preference: 'msgpack', 'columnar', or
+    None for plain JSON.
+    """
+    from react_drf.renderers import ColumnarJSONRenderer, MessagePackRenderer
+
+    for renderer_class in getattr(view_class, 'renderer_classes', ()):
+        if issubclass(renderer_class, MessagePackRenderer):
+            return 'msgpack'
+        elif issubclass(renderer_class, ColumnarJSONRenderer):
+            return 'columnar'
+    return None
+
+def is_paginated(view_class):
+    """
+    Whether a list view wraps its results in the `{next, previous, results}`
+    envelope of the page number, limit/offset and cursor paginations. They
+    only paginate when a default page size is set, which PAGE_SIZE leaves
+    unset by default.
+    """
+    from rest_framework import pagination
+
+    pagination_class = getattr(view_class, 'pagination_class', None)
+
+    if pagination_class is None:
+        return False
+    elif issubclass(pagination_class, pagination.LimitOffsetPagination):
+        return bool(pagination_class.default_limit)
+    elif issubclass(pagination_class, (pagination.PageNumberPagination, pagination.CursorPagination)):
+        return bool(pagination_class.page_size)
+    return False
+
+def paginated_fetch(context, conditional):
+    coalesced = bool(context['coalesce_start'])
+
+    return PAGINATED_FETCH % dict(
+        context,
+        page_coalesce_start="coalesce('GET', url, () => " if coalesced else '',
+        page_coalesce_end=')' if coalesced else '',
+        page_request='conditionalGet' if conditional else context['get'],
+        page_options=context['conditional_options'] if conditional else context['get_options'],
+        page_success=(CONDITIONAL_PAGE_SUCCESS if conditional else PAGE_SUCCESS) % context,
+    )
+
+def process_pattern(exported_views, pattern):
+    from rest_framework import mixins
+    from react_drf.views import ConditionalGetMixin, DeltaSyncMixin
+
+    lap = profiling.laps('patterns')
+    entity_store = get_setting('ENTITY_STORE')
+    view_class = pattern.callback.view_class
+    serializer_class = view_class.serializer_class
+
+    model_name = stylize_class_name(serializer_class._original_name)
+    camel_case_model_name = model_name[0].lower() + model_name[1:]
+
+    view_name = stylize_view_name(view_class.__name__)
+    constant_name = constant_case(view_name)
+    camel_case_name = view_name[0].lower() + view_name[1:]
+
+    key_name = view_class.lookup_field if view_class.lookup_field != 'pk' else 'id'
+    key_type = 'string' if view_class.lookup_field != 'pk' else 'number'
+
+    by_key_name = '%ssById' % camel_case_model_name
+    list_name = '%sList' % camel_case_model_name
+
+    compiled_url = url_template(pattern)
+    url_with_placeholders = compiled_url.template
+    function_args = ['%s: %s' % argument for argument in compiled_url.arguments.items()]
+    lap('url')
+
+    base_context = {
+        'lookup_field': view_class.lookup_field,
+        'args': ', '.join(function_args),
+        'view_name': view_name,
+        'model_name': model_name,
+        'camel_case_name': camel_case_name,
+        'url': url_with_placeholders,
+        'list_name': list_name,
+        'by_key_name': by_key_name,
+        'key_name': key_name,
+        'key_type': key_type,
+        'coalesce_start': '',
+        'coalesce_end': '',
+        'get': 'api.get',
+        'get_options': '',
+        'conditional_options': '',
+        'constant_name': constant_name,
+    }
+    runtime = ['emptyTable', 'mergeEntities'] if entity_store else []
+    fetch_runtime = runtime
+
+    # Views opt out with `coalesce_requests = False`.
+    if getattr(view_class, 'coalesce_requests', True):
+        base_context['coalesce_start'] = "coalesce('GET', `%s`, () => " % url_with_placeholders
+        base_context['coalesce_end'] = ')'
+        fetch_runtime = runtime + ['coalesce']
+
+    conditional = issubclass(view_class, ConditionalGetMixin)
+
+    if conditional:
+        fetch_runtime = fetch_runtime + ['conditionalGet']
+
+    if get_setting('BATCH_URL_NAME'):
+        base_context['get'] = 'batchGet'
+        fetch_runtime = fetch_runtime + ['batchGet']
+
+    fetch_runtime = fetch_runtime + ['withFields']
+    format = response_format(view_class)
+
+    if format == 'msgpack':
+        # Always through batchGet, which takes the format to request.
+        base_context['get'] = 'batchGet'
+        base_context['get_options'] = ', null, messagePackFormat'
+        base_context['conditional_options'] = ', messagePackFormat'
+        fetch_runtime = fetch_runtime + ['batchGet', 'messagePackFormat']
+
+    if issubclass(view_class, mixins.CreateModelMixin):
+        context = {**base_context, **dict(
+            view_name=view_class.__name__[:-4],
+            FETCH_REQUEST='CREATE_%s_REQUEST' % constant_case(view_class.__name__[:-4]),
+            FETCH_SUCCESS='CREATE_%s_SUCCESS' % constant_case(view_class.__name__[:-4]),
+            FETCH_ERROR='CREATE_%s_ERROR' % constant_case(view_class.__name__[:-4]),
+            camel_case_name = model_name[0].lower() + model_name[1:]
+        )}
+
+        view_actions = [
+            """{type: '%(FETCH_REQUEST)s', %(camel_case_name)s: %(model_name)s}""" % context,
+            """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s}""" % context,
+            """{type: '%(FETCH_ERROR)s', errors: any}""" % context,
+        ]
+
+        schema = [
+            '%s: {} as {[%s: %s]: %s}' % (by_key_name, key_name, key_type, model_name),
+            '%s: [] as number[]' % (list_name),
+        ]
+
+        reducer_definition = """
 case '%(FETCH_SUCCESS)s': {
 
     const %(by_key_name)s = Object.assign({}, state.%(by_key_name)s, {[action.%(camel_case_name)s.%(key_name)s]: action.%(camel_case_name)s});
     return Object.assign({}, state, {%(by_key_name)s});
 }
             """ % context
-            view_definition = """
+        view_definition = """
 
 export const create%(view_name)s = (item: %(model_name)s) => {
     const %(lookup_field)s = item.%(key_name)s;
 
     return (dispatch: Dispatch) => {
+        const errors = %(model_name)s.validate(item);
+
+        if (errors !== null) {
+            dispatch({
+                type: '%(FETCH_ERROR)s',
+                errors,
+            });
+            // Shaped like the errors of api.post.
+            return Promise.reject({response: {status: 400, data: errors}});
+        }
+
         dispatch({
             type: '%(FETCH_REQUEST)s',
             %(camel_case_name)s: item,
@@ -422,33 +1287,39 @@ export const create%(view_name)s = (item: %(model_name)s) => {
         });
     };
 };""" % context
-            exported_views.append({
-                'schema': schema,
-                'reducer': reducer_definition,
-                'definition': view_definition,
-                'actions': view_actions,
-            })
-        if issubclass(view_class, mixins.DestroyModelMixin):
-            context = {**base_context, **dict(
-                FETCH_REQUEST='DELETE_%s_REQUEST' % constant_name,
-                FETCH_SUCCESS='DELETE_%s_SUCCESS' % constant_name,
-                FETCH_ERROR='DELETE_%s_ERROR' % constant_name,
-            )}
-
-            view_actions = [
-                """{type: '%(FETCH_REQUEST)s', %(camel_case_name)s: %(model_name)s}""" % context,
-                """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s}""" % context,
-                """{type: '%(FETCH_ERROR)s', errors: any}""" % context,
-            ]
-
-            schema = [
-                '%s: {} as {[%s: %s]: %s}' % (by_key_name, key_name, key_type, model_name),
-                '%s: [] as number[]' % (list_name),
-            ]
-            reducer_definition = """
+        if entity_store:
+            schema, reducer_definition = entity_reducer('merge', context)
+
+        exported_views.append({
+            'schema': schema,
+            'reducer': reducer_definition,
+            'definition': view_definition,
+            'actions': view_actions,
+            'model': model_name,
+            'key_type': key_type,
+            'runtime': runtime,
+        })
+    if issubclass(view_class, mixins.DestroyModelMixin):
+        context = {**base_context, **dict(
+            FETCH_REQUEST='DELETE_%s_REQUEST' % constant_name,
+            FETCH_SUCCESS='DELETE_%s_SUCCESS' % constant_name,
+            FETCH_ERROR='DELETE_%s_ERROR' % constant_name,
+        )}
+
+        view_actions = [
+            """{type: '%(FETCH_REQUEST)s', %(camel_case_name)s: %(model_name)s}""" % context,
+            """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s}""" % context,
+            """{type: '%(FETCH_ERROR)s', errors: any}""" % context,
+        ]
+
+        schema = [
+            '%s: {} as {[%s: %s]: %s}' % (by_key_name, key_name, key_type, model_name),
+            '%s: [] as number[]' % (list_name),
+        ]
+        reducer_definition = """
             // Currently we do not delete objects from the store.
             """ % context
-            view_definition = """
+        view_definition = """
 
 export const delete%(view_name)s = (item: %(model_name)s) => {
     const %(lookup_field)s = item.%(key_name)s;
@@ -468,42 +1339,59 @@ export const delete%(view_name)s = (item: %(model_name)s) => {
     };
 };
                         """ % context
-            exported_views.append({
-                'schema': schema,
-                'reducer': reducer_definition,
-                'definition': view_definition,
-                'actions': view_actions,
-            })
-
-        if issubclass(view_class, mixins.UpdateModelMixin):
-            context = {**base_context, **dict(
-                FETCH_REQUEST='UPDATE_%s_REQUEST' % constant_name,
-                FETCH_SUCCESS='UPDATE_%s_SUCCESS' % constant_name,
-                FETCH_ERROR='UPDATE_%s_ERROR' % constant_name,
-            )}
-
-            view_actions = [
-                """{type: '%(FETCH_REQUEST)s', %(camel_case_name)s: %(model_name)s}""" % context,
-                """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s}""" % context,
-                """{type: '%(FETCH_ERROR)s', errors: any}""" % context,
-            ]
-            schema = [
-                '%s: {} as {[%s: %s]: %s}' % (by_key_name, key_name, key_type, model_name),
-                '%s: [] as number[]' % (list_name),
-            ]
-            reducer_definition = """
+        if entity_store:
+            schema, reducer_definition = entity_reducer('keep', context)
+
+        exported_views.append({
+            'schema': schema,
+            'reducer': reducer_definition,
+            'definition': view_definition,
+            'actions': view_actions,
+            'model': model_name,
+            'key_type': key_type,
+            'runtime': runtime,
+        })
+
+    if issubclass(view_class, mixins.UpdateModelMixin):
+        context = {**base_context, **dict(
+            FETCH_REQUEST='UPDATE_%s_REQUEST' % constant_name,
+            FETCH_SUCCESS='UPDATE_%s_SUCCESS' % constant_name,
+            FETCH_ERROR='UPDATE_%s_ERROR' % constant_name,
+        )}
+
+        view_actions = [
+            """{type: '%(FETCH_REQUEST)s', %(camel_case_name)s: %(model_name)s}""" % context,
+            """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s}""" % context,
+            """{type: '%(FETCH_ERROR)s', errors: any}""" % context,
+        ]
+        schema = [
+            '%s: {} as {[%s: %s]: %s}' % (by_key_name, key_name, key_type, model_name),
+            '%s: [] as number[]' % (list_name),
+        ]
+        reducer_definition = """
 case '%(FETCH_SUCCESS)s': {
 
     const %(by_key_name)s = Object.assign({}, state.%(by_key_name)s, {[action.%(camel_case_name)s.%(key_name)s]: action.%(camel_case_name)s});
     return Object.assign({}, state, {%(by_key_name)s});
 }
             """ % context
-            view_definition = """
+        view_definition = """
 
 export const update%(view_name)s = (item: %(model_name)s) => {
     const %(lookup_field)s = item.%(key_name)s;
 
     return (dispatch: Dispatch) => {
+        const errors = %(model_name)s.validate(item);
+
+        if (errors !== null) {
+            dispatch({
+                type: '%(FETCH_ERROR)s',
+                errors,
+            });
+            // Shaped like the errors of api.put.
+            return Promise.reject({response: {status: 400, data: errors}});
+        }
+
         dispatch({
             type: '%(FETCH_REQUEST)s',
             %(camel_case_name)s: item,
@@ -519,28 +1407,34 @@ export const update%(view_name)s = (item: %(model_name)s) => {
     };
 };
                         """ % context
-            exported_views.append({
-                'schema': schema,
-                'reducer': reducer_definition,
-                'definition': view_definition,
-                'actions': view_actions,
-            })
-        if issubclass(view_class, mixins.RetrieveModelMixin):
-            context = {**base_context, **dict(
-                FETCH_REQUEST='FETCH_%s_REQUEST' % constant_name,
-                FETCH_SUCCESS='FETCH_%s_SUCCESS' % constant_name,
-                FETCH_ERROR='FETCH_%s_ERROR' % constant_name,
-            )}
-            view_actions = [
-                """{type: '%(FETCH_REQUEST)s'}""" % context,
-                """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s}""" % context,
-                """{type: '%(FETCH_ERROR)s', errors: any}""" % context,
-            ]
-            schema = [
-                '%s: {} as {[%s: %s]: %s}' % (by_key_name, key_name, key_type, model_name),
-                '%s: [] as number[]' % (list_name),
-            ]
-            reducer_definition = """
+        if entity_store:
+            schema, reducer_definition = entity_reducer('merge', context)
+
+        exported_views.append({
+            'schema': schema,
+            'reducer': reducer_definition,
+            'definition': view_definition,
+            'actions': view_actions,
+            'model': model_name,
+            'key_type': key_type,
+            'runtime': runtime,
+        })
+    if issubclass(view_class, mixins.RetrieveModelMixin):
+        context = {**base_context, **dict(
+            FETCH_REQUEST='FETCH_%s_REQUEST' % constant_name,
+            FETCH_SUCCESS='FETCH_%s_SUCCESS' % constant_name,
+            FETCH_ERROR='FETCH_%s_ERROR' % constant_name,
+        )}
+        view_actions = [
+            """{type: '%(FETCH_REQUEST)s'}""" % context,
+            """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s}""" % context,
+            """{type: '%(FETCH_ERROR)s', errors: any}""" % context,
+        ]
+        schema = [
+            '%s: {} as {[%s: %s]: %s}' % (by_key_name, key_name, key_type, model_name),
+            '%s: [] as number[]' % (list_name),
+        ]
+        reducer_definition = """
 case '%(FETCH_SUCCESS)s': {
 
     const %(by_key_name)s = Object.assign({}, state.%(by_key_name)s, {[action.%(camel_case_name)s.%(key_name)s]: action.%(camel_case_name)s});
@@ -548,47 +1442,64 @@ case '%(FETCH_SUCCESS)s': {
 }
             """ % context
 
-            view_definition = """
+        view_definition = """
 
 export const fetch%(view_name)s = (%(args)s) => {
-    return (dispatch: Dispatch) => {
+    return (dispatch: Dispatch) => %(coalesce_start)s{
         dispatch({
             type: '%(FETCH_REQUEST)s',
         });
 
-        return api.get<%(model_name)s>(`%(url)s`).then(response => {
+        return %(get)s<%(model_name)s>(`%(url)s`%(get_options)s).then(response => {
             dispatch({
                 type: '%(FETCH_SUCCESS)s',
                 %(camel_case_name)s: response.data,
             });
             return response.data;
         });
-    };
+    }%(coalesce_end)s;
 };
                         """ % context
-            exported_views.append({
-                'schema': schema,
-                'reducer': reducer_definition,
-                'definition': view_definition,
-                'actions': view_actions,
-            })
-
-        if issubclass(view_class, mixins.ListModelMixin):
-            context = {**base_context, **dict(
-                FETCH_REQUEST='FETCH_%s_REQUEST' % constant_name,
-                FETCH_SUCCESS='FETCH_%s_SUCCESS' % constant_name,
-                FETCH_ERROR='FETCH_%s_ERROR' % constant_name,
-            )}
-            view_actions = [
-                """{type: '%(FETCH_REQUEST)s'}""" % context,
-                """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s[]}""" % context,
-                """{type: '%(FETCH_ERROR)s', errors: any}""" % context,
-            ]
-            schema = [
-                '%s: {} as {[%s: %s]: %s}' % (by_key_name, key_name, key_type, model_name),
-                '%s: [] as number[]' % (list_name),
-            ]
-            reducer_definition = """
+        if conditional:
+            view_definition = CONDITIONAL_FETCH % dict(context, response_type=model_name)
+
+        view_definition += sparse_fetch(context, 'Pick<%s, K>' % model_name)
+
+        if entity_store:
+            schema, reducer_definition = entity_reducer('merge', context)
+
+        exported_views.append({
+            'schema': schema,
+            'reducer': reducer_definition,
+            'definition': view_definition,
+            'actions': view_actions,
+            'model': model_name,
+            'key_type': key_type,
+            'runtime': fetch_runtime,
+        })
+
+    if issubclass(view_class, mixins.ListModelMixin):
+        context = {**base_context, **dict(
+            FETCH_REQUEST='FETCH_%s_REQUEST' % constant_name,
+            FETCH_SUCCESS='FETCH_%s_SUCCESS' % constant_name,
+            FETCH_ERROR='FETCH_%s_ERROR' % constant_name,
+        )}
+        columnar = format == 'columnar'
+
+        if columnar:
+            context['get'] = 'batchGet'
+            context['get_options'] = ', null, %sRows' % camel_case_model_name
+            context['conditional_options'] = ', %sRows' % camel_case_model_name
+        view_actions = [
+            """{type: '%(FETCH_REQUEST)s'}""" % context,
+            """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s[]}""" % context,
+            """{type: '%(FETCH_ERROR)s', errors: any}""" % context,
+        ]
+        schema = [
+            '%s: {} as {[%s: %s]: %s}' % (by_key_name, key_name, key_type, model_name),
+            '%s: [] as number[]' % (list_name),
+        ]
+        reducer_definition = """
 case '%(FETCH_SUCCESS)s': {
     let %(by_key_name)s = Object.assign({}, state.%(by_key_name)s);
     const %(list_name)s = action.%(camel_case_name)s.map(item => {
@@ -598,105 +1509,492 @@ case '%(FETCH_SUCCESS)s': {
     return Object.assign({}, state, {%(by_key_name)s, %(list_name)s});
 }
             """ % context
-            view_definition = """
+        view_definition = """
 
 export const fetch%(view_name)s = (%(args)s) => {
-    return (dispatch: Dispatch) => {
+    return (dispatch: Dispatch) => %(coalesce_start)s{
         dispatch({
             type: '%(FETCH_REQUEST)s',
         });
 
-        return api.get<%(model_name)s[]>(`%(url)s`).then(response => {
+        return %(get)s<%(model_name)s[]>(`%(url)s`%(get_options)s).then(response => {
             dispatch({
                 type: '%(FETCH_SUCCESS)s',
                 %(camel_case_name)s: response.data,
             });
             return response.data;
         });
-    };
+    }%(coalesce_end)s;
 };
                         """ % context
-            exported_views.append({
-                'schema': schema,
-                'reducer': reducer_definition,
-                'definition': view_definition,
-                'actions': view_actions,
-            })
-
+        list_runtime = fetch_runtime
+
+        if columnar:
+            list_runtime = list_runtime + ['batchGet', 'columnarFormat', 'decodeColumns']
+
+        if is_paginated(view_class):
+            view_actions[1] = """{type: '%(FETCH_SUCCESS)s', %(camel_case_name)s: %(model_name)s[], next: string|null, append: boolean}""" % context
+            schema = schema + ['%sNext: null as string|null' % list_name, '%sHasMore: false' % list_name]
+            reducer_definition = PAGINATED_REDUCER % context
+            view_definition = paginated_fetch(context, conditional)
+            view_definition += sparse_fetch(context, 'Page<Pick<%s, K>>' % model_name)
+            list_runtime = list_runtime + ['Page']
+        else:
+            if conditional:
+                view_definition = CONDITIONAL_FETCH % dict(context, response_type='%s[]' % model_name)
+
+            view_definition += sparse_fetch(context, 'Pick<%s, K>[]' % model_name)
+
+        if entity_store:
+            schema, reducer_definition = entity_reducer('page' if is_paginated(view_class) else 'list', context)
+
+        exported_views.append({
+            'schema': schema,
+            'reducer': reducer_definition,
+            'definition': view_definition,
+            'actions': view_actions,
+            'model': model_name,
+            'key_type': key_type,
+            'runtime': list_runtime,
+            'columnar': columnar,
+        })
+
+        if issubclass(view_class, DeltaSyncMixin):
+            # Deltas are never columnar, so requested as the other fetches.
+            exported_views.append(sync_view(base_context, entity_store, fetch_runtime))
+
+    lap('render')
     return exported_views
 
 
-def writeExports():
-    from django.conf import settings
-    import json
-    import os
-
-    to_export = {
-        'views': process_patterns(),
-        'models': process_serializers(),
+def joined(items, separator):
+    for index, item in enumerate(items):
+        if index:
+            yield separator
+        yield item
+
+
+def render_exports(views, definitions, prelude='', names=None, selectors=()):
+    """
+    Renders exported views and model definitions as one TypeScript module,
+    section by section, with `prelude` placed after the imports. Given a
+    ViewList and definitions read back from the export cache, neither the
+    module nor the entries it is rendered from are ever all in memory. `names`
+    renames the module's store exports, so several of them can be combined
+    in split mode. `selectors` are placed after the store.
+    """
+    names = names or {
+        'actions': 'Actions',
+        'initial_state': 'initialState',
+        'reducer': 'reducer',
     }
 
-    existing_deserialized_reference = None
-    destination = os.path.join(settings.BASE_DIR, 'client/exports.ts')
+    yield "import {Action, Dispatch} from 'client/reducer'\n"
+    yield "import {api} from 'client/api'\n"
+    yield prelude
+    yield "export type %s = " % names['actions']
+    yield from joined((action for view in views for action in view['actions']), "|")
 
-    # See if we already have exports.
-    if os.path.isfile(destination):
-        with open(destination, 'r') as f:
-            # The last line is a comment with a serialized structure.
-            # Remove the '// ' and deserialize for comparison.
-            try:
-                existing_deserialized_reference = json.loads(f.readlines()[-1][3:])
-            except Exception as e:
-                pass
+    if get_setting('ENTITY_STORE'):
+        yield from render_entity_store(views, names)
+    else:
+        yield from render_store(views, names)
 
-    # Only write if the exports are not exactly the same.
-    if True or (to_export != existing_deserialized_reference):
-        serialized_reference = "\n// %s" % json.dumps(to_export)
+    yield from joined((selector['definition'] for selector in selectors), "\n")
+    yield from joined((view['definition'] for view in views), "\n")
+    yield "\n"
+    yield from joined(definitions, "\n")
 
-        # This flattens an array of arrays. See
-        # See: http://stackoverflow.com/a/952946
-        actions = sum([view['actions'] for view in to_export['views']], [])
-        state = set(sum([view['schema'] for view in to_export['views']], []))
 
-        views = [view['definition'] for view in to_export['views']]
-        reducers = [view['reducer'] for view in to_export['views']]
+def render_store(views, names):
+    yield """
 
-        reducer = """
+export const %(initial_state)s = {
+    """ % names
+    # Deduplicated in order, so the output is stable between runs.
+    yield from joined(collections.OrderedDict.fromkeys(item for view in views for item in view['schema']), ",\n")
 
-export const initialState = {
-    %s
+    yield """
 };
 
-export const reducer = <T extends typeof initialState>(state: T, action: Action): T => {
+export const %(reducer)s = <T extends typeof %(initial_state)s>(state: T, action: Action): T => {
     switch (action.type) {
-        %s
+        """ % names
+    yield from joined((view['reducer'] for view in views), "\n")
+
+    yield """
         default: {
             return state;
         }
     }
 }
 
-""" % (",\n".join(state), "\n".join(reducers))
+"""
 
-        contents_to_write = ""
-        contents_to_write += "import {Action, Dispatch} from 'client/reducer'\n";
-        contents_to_write += "import {api} from 'client/api'\n";
-        contents_to_write += "export type Actions = %s" % "|".join(actions)
-        contents_to_write += reducer
-        contents_to_write += "\n".join(views)
-        contents_to_write += "\n"
-        contents_to_write += "\n".join(to_export['models'])
-        contents_to_write += serialized_reference
 
-        with open(destination, 'w') as f:
-            f.write(contents_to_write)
+def render_entity_store(views, names):
+    """
+    Renders one state slice and reducer per model. The combined reducer
+    returns the same state when no slice changed.
+    """
+    if not isinstance(views, ViewList):
+        views = ViewList([views])
 
+    slices = views.by_model()
+    camel_case_names = [model[0].lower() + model[1:] for model in slices]
 
-def generate_interface(SourceSerializer):
-        request = factory.get('/')
-        request.user = get_user_model()
+    for camel_case_name, (model, model_views) in zip(camel_case_names, slices.items()):
+        yield """
+
+export const %(camel_case_name)sSlice = {
+    """ % {'camel_case_name': camel_case_name}
+        yield from joined(collections.OrderedDict.fromkeys(item for view in model_views for item in view['schema']), ",\n")
+        yield """
+};
+
+export const %(camel_case_name)sSliceReducer = (state: typeof %(camel_case_name)sSlice, action: Action): typeof %(camel_case_name)sSlice => {
+    switch (action.type) {
+        """ % {'camel_case_name': camel_case_name}
+        yield from joined((view['reducer'] for view in model_views), "\n")
+        yield """
+        default: {
+            return state;
+        }
+    }
+}
+"""
+
+    yield """
+export const %(initial_state)s = {
+    %(slices)s
+};
+
+export const %(reducer)s = <T extends typeof %(initial_state)s>(state: T, action: Action): T => {
+    %(reducers)s
+
+    if (%(unchanged)s) {
+        return state;
+    }
+    return Object.assign({}, state, {%(changed)s});
+}
+
+""" % dict(names, **{
+        'slices': ",\n    ".join('%s: %sSlice' % (name, name) for name in camel_case_names),
+        'reducers': "\n    ".join('const %s = %sSliceReducer(state.%s, action);' % (name, name, name)
+                                  for name in camel_case_names),
+        'unchanged': " && ".join('%s === state.%s' % (name, name) for name in camel_case_names) or 'true',
+        'changed': ", ".join(camel_case_names),
+    })
+
+
+SELECTORS = """
+
+// Selectors memoized on the state they read, which return the same results
+// until the %(model_name)s items they select change.
+type %(model_name)sState = {%(by_key_name)s: {[key: %(key_type)s]: %(model_name)s}, %(list_name)s: number[]};
+
+export const select%(model_name)sById = (state: %(model_name)sState, key: %(key_type)s): %(model_name)s|undefined => state.%(by_key_name)s[key];
+
+export const select%(plural_name)s = listSelector(
+    (state: %(model_name)sState) => state.%(by_key_name)s,
+    (state: %(model_name)sState) => state.%(list_name)s,
+    (%(by_key_name)s, %(list_name)s) => %(list_name)s.filter(key => key in %(by_key_name)s).map(key => %(by_key_name)s[key])
+);"""
+
+ENTITY_SELECTORS = """
+
+// Selectors memoized on the state they read, which return the same results
+// until the %(model_name)s items they select change.
+type %(model_name)sState = {%(camel_case_name)s: typeof %(camel_case_name)sSlice};
+
+export const select%(model_name)sById = (state: %(model_name)sState, key: %(key_type)s) => getEntity(state.%(camel_case_name)s.entities, key);
+
+export const select%(plural_name)s = listSelector(
+    (state: %(model_name)sState) => state.%(camel_case_name)s.entities,
+    (state: %(model_name)sState) => state.%(camel_case_name)s.list,
+    getEntities
+);"""
+
+CHOICE_SELECTOR = """
+
+export const select%(plural_name)sBy%(field_name)s = keyedSelector((value: %(model_name)s['%(name)s']) => filteredSelector(
+    select%(plural_name)s,
+    item => item.%(name)s === value
+));"""
+
+def model_selectors(views, choices=None):
+    """
+    Yields the selectors of every model stored by `views`: one by key, one
+    listing the model and one filtering that list per choice field, as named
+    by `choices`, a dict of field names by model name.
+    """
+    entity_store = get_setting('ENTITY_STORE')
+    models = collections.OrderedDict()
+
+    for view in views:
+        models.setdefault(view['model'], view['key_type'])
 
-        serializer_instance = SourceSerializer(context={'request': request})
+    for model_name, key_type in models.items():
+        camel_case_name = model_name[0].lower() + model_name[1:]
+        context = {
+            'model_name': model_name,
+            'camel_case_name': camel_case_name,
+            'plural_name': '%ss' % model_name,
+            'by_key_name': '%ssById' % camel_case_name,
+            'list_name': '%sList' % camel_case_name,
+            'key_type': key_type,
+        }
+        model_choices = (choices or {}).get(model_name, [])
+
+        definition = (ENTITY_SELECTORS if entity_store else SELECTORS) % context
+        runtime = ['getEntity', 'getEntities', 'listSelector'] if entity_store else ['listSelector']
+
+        for name in model_choices:
+            definition += CHOICE_SELECTOR % dict(
+                context,
+                name=name,
+                field_name=''.join(part.capitalize() for part in name.split('_')),
+            )
+
+        if model_choices:
+            runtime = runtime + ['filteredSelector', 'keyedSelector']
+
+        yield {'definition': definition, 'runtime': runtime}
+
+
+# Holds the runtime helpers in split mode. Model modules never start with an
+# underscore, so it cannot clash with them.
+RUNTIME_MODULE = '_runtime'
+
+# First line of every file the generator writes. Only files starting with it
+# are ever removed.
+GENERATED_HEADER = '// Generated by generate_interfaces, do not edit.\n'
+
+def write_generated(destination, chunks):
+    return write_atomically(destination, itertools.chain([GENERATED_HEADER], chunks))
+
+def is_generated(filename):
+    try:
+        with io.open(filename, encoding='utf-8') as f:
+            return f.readline() == GENERATED_HEADER
+    except (IOError, OSError, UnicodeDecodeError):
+        return False
+
+def render_runtime(views=()):
+    """
+    Helpers shared by generated thunks and reducers, from templates/. The
+    MessagePack decoder is only included when `views` use it.
+    """
+    from react_drf.routes import reverse
+
+    batch_url_name = get_setting('BATCH_URL_NAME')
+    yield 'const BATCH_URL: string|null = %s;\n' % (json.dumps(reverse(batch_url_name)) if batch_url_name else 'null')
+
+    templates = ['requests.ts', 'selectors.ts']
+
+    if get_setting('ENTITY_STORE'):
+        templates.append('entities.ts')
+    if any('messagePackFormat' in view['runtime'] for view in views):
+        templates.append('msgpack.ts')
+
+    for template in templates:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', template)) as f:
+            yield f.read()
+
+
+def render_index(modules):
+    """
+    Re-exports every split module and combines their actions, initial state
+    and reducers.
+    """
+    stores = [module for module in modules if module['views']]
+
+    yield "import {Action} from 'client/reducer'\n"
+
+    yield "export * from './%s'\n" % RUNTIME_MODULE
+
+    for module in modules:
+        yield "import * as %sModule from './%s'\n" % (module['camel_case_name'], module['filename'])
+
+    for module in modules:
+        yield "export * from './%s'\n" % module['filename']
+
+    yield """
+export type Actions = %(actions)s;
+
+export const initialState = Object.assign({}, %(initial_states)s);
+
+export const reducer = <T extends typeof initialState>(state: T, action: Action): T => {
+    %(reducers)s
+    return state;
+}
+""" % {
+        'actions': "|".join("%(camel_case_name)sModule.%(name)sActions" % module for module in stores) or 'never',
+        'initial_states': ", ".join("%(camel_case_name)sModule.%(camel_case_name)sInitialState" % module
+                                    for module in stores),
+        'reducers': "\n    ".join("state = %(camel_case_name)sModule.%(camel_case_name)sReducer(state, action);" % module
+                                  for module in stores),
+    }
+
+
+def write_split_exports(directory, view_entries, model_entries, choices=None):
+    """
+    Writes one module per model, holding its definitions and the views that
+    serve it, plus an index.ts. Modules are ordered by name and only written
+    when their contents change. Modules generated by earlier runs that are
+    no longer written are removed. Returns the paths of the modules.
+    """
+    groups = collections.OrderedDict()
+    model_names = {
+        serializer_key(SourceSerializer): stylize_class_name(SourceSerializer._original_name)
+        for SourceSerializer, entry in model_entries
+    }
+
+    def group(name):
+        return groups.setdefault(name, {
+            'name': name,
+            'camel_case_name': name[0].lower() + name[1:],
+            'filename': snake_case(name),
+            'views': [],
+            'models': [],
+            'dependencies': set(),
+        })
+
+    for SourceSerializer, entry in model_entries:
+        module = group(stylize_class_name(SourceSerializer._original_name))
+        module['models'].append((SourceSerializer, entry))
+        module['dependencies'].update(model_names[key] for key in entry['dependencies'] if key in model_names)
+
+    for pattern, views in view_entries:
+        module = group(stylize_class_name(pattern.callback.view_class.serializer_class._original_name))
+        module['views'].append(views)
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    modules = [groups[name] for name in sorted(groups)]
+    filenames = {'index.ts', '%s.ts' % RUNTIME_MODULE}
+    all_views = ViewList([views for pattern, views in view_entries])
+    columnar = columnar_models(all_views)
+    write_generated(os.path.join(directory, '%s.ts' % RUNTIME_MODULE), itertools.chain(
+        ["import {api} from 'client/api'\n\n"],
+        joined(render_runtime(all_views), "\n"),
+    ))
+
+    for module in modules:
+        imports = "".join("import {%s} from './%s'\n" % (dependency, snake_case(dependency))
+                          for dependency in sorted(module['dependencies'] - {module['name']}))
+        definitions = model_definitions(module['models'], columnar)
+
+        if module['views']:
+            views = ViewList(module['views'])
+            selectors = list(model_selectors(views, choices))
+            runtime = sorted(set(name for item in itertools.chain(views, selectors) for name in item['runtime']))
+
+            if runtime:
+                imports += "import {%s} from './%s'\n" % (', '.join(runtime), RUNTIME_MODULE)
+
+            contents = render_exports(views, definitions, imports, names={
+                'actions': '%sActions' % module['name'],
+                'initial_state': '%sInitialState' % module['camel_case_name'],
+                'reducer': '%sReducer' % module['camel_case_name'],
+            }, selectors=selectors)
+        else:
+            contents = itertools.chain([imports], joined(definitions, "\n"))
+
+        filenames.add('%s.ts' % module['filename'])
+        write_generated(os.path.join(directory, '%s.ts' % module['filename']), contents)
+
+    write_generated(os.path.join(directory, 'index.ts'), render_index(modules))
+    remove_stale_modules(directory, filenames)
+    return [os.path.join(directory, filename) for filename in sorted(filenames)]
+
+
+def remove_stale_modules(directory, filenames):
+    """
+    Removes the modules generated in `directory` other than `filenames`,
+    leaving files written by hand alone.
+    """
+    removed = False
+
+    for filename in os.listdir(directory):
+        path = os.path.join(directory, filename)
+
+        if filename.endswith('.ts') and filename not in filenames and is_generated(path):
+            os.remove(path)
+            removed = True
+
+    if removed and not os.listdir(directory):
+        os.rmdir(directory)
+
+
+def writeExports(jobs=1, split=None):
+    from django.conf import settings
+
+    if split is None:
+        split = get_setting('SPLIT_EXPORTS')
+
+    destination = os.path.join(settings.BASE_DIR, 'client/exports.ts')
+    directory = os.path.join(settings.BASE_DIR, 'client/exports')
+
+    with profiling.phase('load cache'):
+        cache = ExportCache.load(os.path.join(settings.BASE_DIR, 'client/exports.cache.json'))
+        clear_fingerprints()
+
+    with profiling.phase('patterns'):
+        view_entries = pattern_entries(cache)
+
+    with profiling.phase('serializers'):
+        model_entries = serializer_entries(cache, jobs)
+
+    signature = output_signature(cache, split)
+
+    if cache.is_written(signature):
+        return
+
+    with profiling.phase('write'):
+        choices = {
+            stylize_class_name(SourceSerializer._original_name): entry['choices']
+            for SourceSerializer, entry in model_entries
+        }
+
+        if split:
+            # client/exports.ts would shadow client/exports/index.ts.
+            if is_generated(destination):
+                os.remove(destination)
+
+            filenames = write_split_exports(directory, view_entries, model_entries, choices)
+        else:
+            if os.path.isdir(directory):
+                remove_stale_modules(directory, set())
+
+            views = ViewList([views for pattern, views in view_entries])
+
+            write_generated(destination, render_exports(
+                views,
+                itertools.chain(["class RelatedModel {}"], model_definitions(model_entries, columnar_models(views))),
+                ''.join(joined(render_runtime(views), "\n")),
+                selectors=model_selectors(views, choices),
+            ))
+            filenames = [destination]
+
+    with profiling.phase('save cache'):
+        cache.written(signature, filenames)
+        cache.save()
+
+def output_signature(cache, split):
+    """
+    What written files depend on besides the contents of the entries: their
+    order, the layout and the URL of the batch view.
+    """
+    from react_drf.routes import reverse
+
+    batch_url_name = get_setting('BATCH_URL_NAME')
+    return digest(generator_fingerprint(), list(cache.used), split, reverse(batch_url_name) if batch_url_name else None)
+
+
+def generate_interface(SourceSerializer):
+        serializer_instance = SourceSerializer(context=introspection_context(SourceSerializer))
         interface = [
             'export abstract class %s extends RestModel {' % type(serializer_instance).__name__,
         ]
@@ -713,10 +2011,7 @@ def generate_interface(SourceSerializer):
 
 
 def generate_form(SourceSerializer):
-    request = factory.get('/')
-    request.user = get_user_model()()
-
-    serializer_instance = SourceSerializer(context={'request': request})
+    serializer_instance = SourceSerializer(context=introspection_context(SourceSerializer))
     metadata_handler = SimpleMetadata()
     serializer_metadata = metadata_handler.get_serializer_info(serializer_instance)
 
@@ -0,0 +1,49 @@
+"""
+The serializer context exported serializers are introspected with. It is
+built once per run by the INTROSPECTION_CONTEXT setting, a callable or
+dotted path to one returning the context, and shared by every serializer.
+Projects whose serializers need more than an unsaved user can extend the
+default, e.g.
+
+def introspection_context():
+    context = default_context()
+    context['request'].user.profile = Profile()
+    return context
+
+Serializers exported with `export(context=...)` use their own instead.
+"""
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+
+from react_drf.settings import get_setting
+
+
+def default_context():
+    request = RequestFactory().get('/')
+    request.user = get_user_model()()
+    return {'request': request}
+
+
+contexts = {}
+
+
+def get_provider(SourceSerializer=None):
+    provider = getattr(SourceSerializer, '_export_context', None) or get_setting('INTROSPECTION_CONTEXT')
+    return import_string(provider) if isinstance(provider, str) else provider
+
+
+def introspection_context(SourceSerializer=None):
+    """
+    A copy of the shared context, so serializers adding to it do not leak
+    into each other.
+    """
+    provider = get_provider(SourceSerializer)
+
+    if provider not in contexts:
+        contexts[provider] = provider()
+    return dict(contexts[provider])
+
+
+def clear_contexts():
+    contexts.clear()
@@ -1,3 +1,5 @@
+import functools
+
 from django.core.management.base import BaseCommand
 
 from rest_framework import serializers
@@ -6,9 +8,57 @@ from react_drf import generator
 
 
 class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', dest='watch', default=False,
+                            help='Keep running and regenerate exports when app modules change.')
+        parser.add_argument('--interval', type=float, dest='interval', default=0.25,
+                            help='Seconds between checks for changes in watch mode.')
+        parser.add_argument('--jobs', '-j', type=int, dest='jobs', default=1,
+                            help='Number of processes introspecting serializers in parallel.')
+        parser.add_argument('--profile', action='store_true', dest='profile', default=False,
+                            help='Report time spent per phase and per serializer or pattern.')
+        parser.add_argument('--profile-top', type=int, dest='profile_top', default=20,
+                            help='Number of slowest serializers and patterns to report.')
+        parser.add_argument('--profile-output', dest='profile_output', default=None,
+                            help='Also write the profile as JSON to this file.')
+        parser.add_argument('--cprofile', dest='cprofile', default=None,
+                            help='Dump cProfile stats of the generation to this file. '
+                                 'Worker processes started by --jobs are not included.')
+
     def handle(self, **options):
         from react_drf.generator import writeExports
-        writeExports()
+        regenerate = functools.partial(writeExports, jobs=options['jobs'])
+
+        if options['profile'] or options['cprofile']:
+            self.profile(regenerate, **options)
+        else:
+            regenerate()
+
+        if options['watch']:
+            from react_drf.watch import watch
+            watch(regenerate, interval=options['interval'], stdout=self.stdout)
+
+    def profile(self, regenerate, **options):
+        """
+        Profiles a single generation, the first one in watch mode.
+        """
+        from react_drf import profiling
+
+        with profiling.profiling() as profile:
+            if options['cprofile']:
+                import cProfile
+
+                profiler = cProfile.Profile()
+                profiler.runcall(regenerate)
+                profiler.dump_stats(options['cprofile'])
+            else:
+                regenerate()
+
+        if options['profile']:
+            self.stdout.write(profile.report(options['profile_top']))
+
+            if options['profile_output']:
+                profile.save(options['profile_output'], options['profile_top'])
 
         """
         print("/* tslint:disable */\nimport * as React from 'react';")
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from react_drf.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Deletes tombstones older than the TOMBSTONE_RETENTION setting. Run it periodically.'
+
+    def handle(self, **options):
+        self.stdout.write('Pruned %s tombstones.' % Tombstone.objects.prune())
@@ -0,0 +1,67 @@
+import collections
+import threading
+
+from rest_framework.metadata import SimpleMetadata
+
+from react_drf.settings import get_setting
+
+
+class SerializerInfoCache(object):
+    """
+    A bounded, thread-safe LRU cache of serializer info.
+    """
+
+    def __init__(self):
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, build):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+
+        info = build()
+
+        with self.lock:
+            self.entries[key] = info
+
+            while len(self.entries) > get_setting('METADATA_CACHE_SIZE'):
+                self.entries.popitem(last=False)
+        return info
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+serializer_info_cache = SerializerInfoCache()
+
+
+class ExportedMetadata(SimpleMetadata):
+    """
+    Metadata for exported views that computes serializer info once per
+    serializer class instead of on every OPTIONS request.
+
+    Serializers whose fields depend on the request should set
+    `metadata_per_user = True` to be cached per user instead. Sparse fields
+    are never applied to OPTIONS requests, so cached info is never pruned.
+    """
+
+    def get_serializer_info(self, serializer):
+        if hasattr(serializer, 'child'):
+            serializer = serializer.child
+
+        return serializer_info_cache.get(
+            self.get_cache_key(serializer),
+            lambda: super(ExportedMetadata, self).get_serializer_info(serializer),
+        )
+
+    def get_cache_key(self, serializer):
+        # Keyed by the class itself, so reloaded classes never hit stale info.
+        SerializerClass = type(serializer)
+
+        if getattr(SerializerClass, 'metadata_per_user', False):
+            request = serializer.context.get('request')
+            return (SerializerClass, getattr(getattr(request, 'user', None), 'pk', None))
+        return (SerializerClass, None)
@@ -0,0 +1,54 @@
+from django.db import models
+from django.db.models import signals
+from django.utils import timezone
+
+from react_drf.settings import get_setting
+
+
+class TombstoneManager(models.Manager):
+    def deleted_since(self, model, since):
+        """
+        The primary keys of objects of `model` deleted since `since`.
+        """
+        pk = model._meta.pk
+        object_ids = self.filter(model_label=model._meta.label_lower, deleted__gte=since).values_list('object_id', flat=True)
+        return [pk.to_python(object_id) for object_id in object_ids]
+
+    def horizon(self):
+        """
+        The oldest time tombstones are kept for. Deletions before it may no
+        longer be recorded.
+        """
+        return timezone.now() - get_setting('TOMBSTONE_RETENTION')
+
+    def prune(self):
+        """
+        Deletes the tombstones older than the TOMBSTONE_RETENTION setting,
+        returning how many.
+        """
+        count, deleted = self.filter(deleted__lt=self.horizon()).delete()
+        return count
+
+
+class Tombstone(models.Model):
+    """
+    Records the primary key of a deleted object, so views answering what
+    changed since a watermark can report it. See DeltaSyncMixin.
+    """
+    model_label = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=255)
+    deleted = models.DateTimeField(default=timezone.now)
+
+    objects = TombstoneManager()
+
+    class Meta:
+        index_together = [('model_label', 'deleted')]
+
+
+def record_deletion(sender, instance, **kwargs):
+    Tombstone.objects.create(model_label=sender._meta.label_lower, object_id=str(instance.pk))
+
+
+def track_deletions(model):
+    signals.post_delete.connect(record_deletion, sender=model,
+                                dispatch_uid='react_drf.tombstones.%s' % model._meta.label_lower)
@@ -0,0 +1,154 @@
+"""
+Timings for `generate_interfaces --profile`.
+
+Nothing is recorded unless a Profile is active, so the generator calls these
+helpers unconditionally.
+"""
+import collections
+import contextlib
+import json
+import time
+
+
+active = None
+
+
+class Profile(object):
+    def __init__(self):
+        self.phases = collections.OrderedDict()
+        self.counts = collections.OrderedDict()
+        self.entries = []
+        self.open_entries = []
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0) + seconds
+
+    def add_count(self, name, amount):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+        if self.open_entries:
+            record = self.open_entries[-1]
+            record[name] = record.get(name, 0) + amount
+
+    def state(self):
+        return collections.OrderedDict([
+            ('phases', self.phases),
+            ('counts', self.counts),
+            ('entries', self.entries),
+        ])
+
+    def merge(self, state):
+        """
+        Adds the state of a profile recorded elsewhere, e.g. in a worker
+        process. Phases then add up time spent across all workers.
+        """
+        for name, seconds in state['phases'].items():
+            self.add_phase(name, seconds)
+
+        for name, amount in state['counts'].items():
+            self.counts[name] = self.counts.get(name, 0) + amount
+        self.entries.extend(state['entries'])
+
+    def slowest(self, top):
+        return sorted(self.entries, key=lambda record: record['seconds'], reverse=True)[:top]
+
+    def report(self, top=20):
+        lines = ['Phases:']
+        lines.extend('  %-32s %9.3fs' % (name, seconds) for name, seconds in self.phases.items())
+        lines.append('Counts:')
+        lines.extend('  %-32s %9d' % (name, amount) for name, amount in self.counts.items())
+        lines.append('Slowest %s entries:' % top)
+
+        for record in self.slowest(top):
+            details = ', '.join(
+                '%s %s' % (value, name) for name, value in record.items()
+                if name not in ('kind', 'key', 'seconds')
+            )
+            lines.append('  %9.3fs  %-10s %s%s' % (
+                record['seconds'], record['kind'], record['key'], ' (%s)' % details if details else '',
+            ))
+        return '\n'.join(lines)
+
+    def save(self, filename, top=20):
+        contents = collections.OrderedDict(self.state())
+        contents['slowest'] = self.slowest(top)
+
+        with open(filename, 'w') as f:
+            json.dump(contents, f, indent=4)
+            f.write('\n')
+
+
+@contextlib.contextmanager
+def profiling(profile=None):
+    global active
+
+    previous = active
+    active = Profile() if profile is None else profile
+
+    try:
+        yield active
+    finally:
+        active = previous
+
+
+@contextlib.contextmanager
+def phase(name):
+    if active is None:
+        yield
+        return
+
+    # Listed in the order phases start, ahead of any nested ones.
+    active.phases.setdefault(name, 0)
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        active.add_phase(name, time.perf_counter() - started)
+
+
+@contextlib.contextmanager
+def entry(kind, key):
+    """
+    Times one serializer or pattern. Counts added while it is open are also
+    recorded on the entry itself.
+    """
+    if active is None:
+        yield
+        return
+
+    profile = active
+    record = collections.OrderedDict([('kind', kind), ('key', key), ('seconds', 0)])
+    profile.open_entries.append(record)
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        record['seconds'] = time.perf_counter() - started
+        profile.open_entries.pop()
+        profile.entries.append(record)
+
+
+def count(name, amount=1):
+    if active is not None:
+        active.add_count(name, amount)
+
+
+def laps(prefix):
+    """
+    Returns a function that records the time since its previous call, or
+    since laps() itself, as the phase `prefix.name`. Avoids nesting long
+    blocks of code in `with phase()`.
+    """
+    if active is None:
+        return lambda name: None
+
+    profile = active
+    last = [time.perf_counter()]
+
+    def lap(name):
+        now = time.perf_counter()
+        profile.add_phase('%s.%s' % (prefix, name), now - last[0])
+        last[0] = now
+    return lap
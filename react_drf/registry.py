@@ -0,0 +1,162 @@
+import collections
+import collections.abc
+
+from react_drf.routes import route_source
+
+
+def serializer_key(SourceSerializer):
+    return '%s.%s' % (SourceSerializer._original_module, SourceSerializer._original_name)
+
+def pattern_key(pattern):
+    view_class = pattern.callback.view_class
+    return '%s.%s:%s' % (view_class.__module__, view_class.__qualname__, route_source(pattern))
+
+
+class ExportCollection(collections.abc.MutableSequence):
+    """
+    Exports in registration order, deduplicated by their qualified name.
+    Registering a name again, as re-importing a module does, replaces the
+    export in place so the order stays the same.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.items = []
+        self.positions = {}
+        self.revision = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __setitem__(self, index, value):
+        items = list(self.items)
+        items[index] = value
+        self.reset(items)
+
+    def __delitem__(self, index):
+        items = list(self.items)
+        del items[index]
+        self.reset(items)
+
+    def insert(self, index, value):
+        items = list(self.items)
+        items.insert(index, value)
+        self.reset(items)
+
+    def __contains__(self, item):
+        return self.get(self.key(item)) is item
+
+    def get(self, key, default=None):
+        position = self.positions.get(key)
+        return default if position is None else self.items[position]
+
+    def add(self, item):
+        key = self.key(item)
+        position = self.positions.get(key)
+
+        if position is None:
+            self.positions[key] = len(self.items)
+            self.items.append(item)
+        else:
+            self.items[position] = item
+        self.revision += 1
+        return item
+
+    def reset(self, items):
+        self.items = []
+        self.positions = {}
+
+        for item in items:
+            self.add(item)
+        self.revision += 1
+
+
+class ExportRegistry(object):
+    """
+    The exported serializers and url patterns, indexed by model and by
+    serializer, plus the graph of which serializers nest which, as found
+    while generating them.
+    """
+
+    def __init__(self):
+        self.serializers = ExportCollection(serializer_key)
+        self.patterns = ExportCollection(pattern_key)
+        self.dependencies = {}
+        self.indexes = {}
+
+    def index(self, name, collection, keys):
+        # Rebuilt lazily whenever the collection changed since.
+        revision, index = self.indexes.get(name, (None, None))
+
+        if revision != collection.revision:
+            index = collections.defaultdict(list)
+
+            for item in collection:
+                for key in keys(item):
+                    index[key].append(item)
+            self.indexes[name] = (collection.revision, index)
+        return index
+
+    def serializers_for_model(self, model):
+        def models(SourceSerializer):
+            model = getattr(getattr(SourceSerializer, 'Meta', None), 'model', None)
+            return [] if model is None else [model]
+
+        return list(self.index('models', self.serializers, models).get(model, []))
+
+    def patterns_for_serializer(self, SourceSerializer):
+        def serializers(pattern):
+            SerializerClass = getattr(pattern.callback.view_class, 'serializer_class', None)
+            return [serializer_key(SerializerClass)] if hasattr(SerializerClass, '_original_name') else []
+
+        return list(self.index('views', self.patterns, serializers).get(serializer_key(SourceSerializer), []))
+
+    def set_dependencies(self, key, dependencies):
+        self.dependencies[key] = list(collections.OrderedDict.fromkeys(dependencies))
+
+    def dependents(self, keys):
+        """
+        The keys of the registered serializers nesting any of `keys`,
+        directly or not, including `keys` themselves.
+        """
+        nested_by = collections.defaultdict(set)
+
+        for SourceSerializer in self.serializers:
+            key = serializer_key(SourceSerializer)
+
+            for dependency in self.dependencies.get(key, ()):
+                nested_by[dependency].add(key)
+
+        affected = set(keys)
+        pending = list(affected)
+
+        while pending:
+            for other in nested_by[pending.pop()] - affected:
+                affected.add(other)
+                pending.append(other)
+        return affected
+
+    def topological_order(self):
+        """
+        The registered serializers with the ones they nest first, otherwise
+        in registration order. Cycles, such as self nesting, are broken by
+        registration order.
+        """
+        ordered = []
+        visited = set()
+
+        def visit(key):
+            if key in visited or self.serializers.get(key) is None:
+                return
+            visited.add(key)
+
+            for dependency in self.dependencies.get(key, ()):
+                visit(dependency)
+            ordered.append(self.serializers.get(key))
+
+        for SourceSerializer in self.serializers:
+            visit(serializer_key(SourceSerializer))
+        return ordered
@@ -0,0 +1,119 @@
+import collections
+
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+MESSAGEPACK_MEDIA_TYPE = 'application/msgpack'
+
+
+def require_msgpack(view_class):
+    """
+    Raises ImproperlyConfigured when `view_class` renders or parses
+    MessagePack without msgpack installed. Checked once per view, when it is
+    exported, rather than on every request.
+    """
+    if msgpack is not None:
+        return
+
+    for cls in list(getattr(view_class, 'renderer_classes', ())) + list(getattr(view_class, 'parser_classes', ())):
+        if issubclass(cls, (MessagePackRenderer, MessagePackParser)):
+            raise ImproperlyConfigured('%s of %s requires the msgpack package, install react_drf[msgpack].' % (
+                cls.__name__, view_class.__name__,
+            ))
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    Renders lists as `{"columns": [...], "rows": [[...], ...]}`, naming every
+    key once instead of once per row. Paginated lists keep their envelope
+    with the results rendered this way. Anything else, such as details and
+    errors, renders as plain JSON.
+
+    Clients opt in with its media type in the Accept header, so add it after
+    the default renderer, e.g.
+
+    renderer_classes = [JSONRenderer, ColumnarJSONRenderer]
+
+    Generated list thunks of views rendering it request and decode columns.
+    """
+    media_type = 'application/vnd.react-drf.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super(ColumnarJSONRenderer, self).render(
+            self.to_columns(data, renderer_context), accepted_media_type, renderer_context,
+        )
+
+    def to_columns(self, data, renderer_context=None):
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            return collections.OrderedDict(
+                (key, self.to_columns(value, renderer_context) if key == 'results' else value)
+                for key, value in data.items()
+            )
+        elif not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            return data
+
+        columns = self.get_columns(data, renderer_context or {})
+
+        return collections.OrderedDict([
+            ('columns', columns),
+            ('rows', [[row.get(column) for column in columns] for row in data]),
+        ])
+
+    def get_columns(self, data, renderer_context):
+        """
+        The readable fields of the view's serializer, in the order they are
+        serialized, or the keys of the first row without one.
+        """
+        view = renderer_context.get('view')
+
+        if hasattr(view, 'get_serializer'):
+            fields = view.get_serializer().fields
+            return [name for name, field in fields.items() if not field.write_only]
+        return list(data[0]) if data else []
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders MessagePack, which is smaller and faster to encode and decode
+    than JSON for large nested payloads. Values MessagePack has no type for,
+    such as dates and decimals, are encoded as they would be in JSON.
+
+    Clients opt in with its media type in the Accept header, so add it after
+    the default renderer. Generated fetch thunks of views rendering it
+    request and decode it.
+    """
+    media_type = MESSAGEPACK_MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.encoder_class().default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses request bodies sent as MessagePack.
+    """
+    media_type = MESSAGEPACK_MEDIA_TYPE
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except Exception as exc:
+            raise ParseError('MessagePack parse error - %s' % exc)
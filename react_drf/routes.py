@@ -0,0 +1,138 @@
+import collections
+import functools
+import re
+
+from django.utils.regex_helper import normalize
+
+try:
+    from django.urls import URLPattern
+except ImportError:
+    from django.core.urlresolvers import RegexURLPattern as URLPattern
+
+# django.core.urlresolvers was removed in Django 2.0, django.urls added in
+# Django 1.10.
+try:
+    from django.urls import Resolver404, clear_url_caches, get_resolver, get_script_prefix, resolve, reverse
+except ImportError:
+    from django.core.urlresolvers import Resolver404, clear_url_caches, get_resolver, get_script_prefix, resolve, reverse
+
+
+# As parsed by path(): <converter:name> or <name>.
+ROUTE_PARAMETER = re.compile(r'<(?:(?P<converter>[^>:]+):)?(?P<parameter>[^>]+)>')
+PLACEHOLDER = re.compile(r'%\((\w+)\)s')
+
+# Regex groups match strings, which callers often pass as numbers.
+REGEX_ARGUMENT_TYPE = 'string|number'
+
+URLTemplate = collections.namedtuple('URLTemplate', ['name', 'template', 'arguments'])
+
+
+def route_pattern(entry):
+    """
+    The RegexPattern or RoutePattern of a URL pattern or resolver, or the
+    entry itself before Django 2.0, where entries hold their own regex.
+    """
+    return getattr(entry, 'pattern', entry)
+
+def route_source(entry):
+    """
+    The route or regex `entry` was declared with.
+    """
+    pattern = route_pattern(entry)
+    return getattr(pattern, '_route', None) or pattern.regex.pattern
+
+@functools.lru_cache(maxsize=None)
+def url_prefixes():
+    """
+    Maps every pattern in the URLconf to the includes it is nested under,
+    outermost first.
+    """
+    prefixes = {}
+
+    def walk(resolver, prefix):
+        for entry in resolver.url_patterns:
+            if hasattr(entry, 'url_patterns'):
+                walk(entry, prefix + (entry,))
+            else:
+                prefixes[id(entry)] = prefix
+
+    walk(get_resolver(None), ())
+    return prefixes
+
+def escape_template(text):
+    return text.replace('\\', '\\\\').replace('`', '\\`').replace('${', '\\${')
+
+def converter_type(converter):
+    from django.urls.converters import IntConverter
+
+    return 'number' if isinstance(converter, IntConverter) else 'string'
+
+def compile_route(pattern):
+    """
+    The template and argument types of a path() route, typed by their
+    converters.
+    """
+    parts = []
+    arguments = collections.OrderedDict()
+    position = 0
+
+    for match in ROUTE_PARAMETER.finditer(pattern._route):
+        parameter = match.group('parameter')
+        parts.append(escape_template(pattern._route[position:match.start()]))
+        parts.append('${%s}' % parameter)
+        arguments[parameter] = converter_type(pattern.converters[parameter])
+        position = match.end()
+
+    parts.append(escape_template(pattern._route[position:]))
+    return ''.join(parts), arguments
+
+def compile_regex(pattern):
+    """
+    The template and arguments of a regex, as reverse() fills it in when
+    given every group. Optional groups are included.
+    """
+    # The candidate taking the most arguments, the first one on ties.
+    candidates = normalize(pattern.regex.pattern)
+    template, parameters = max(candidates, key=lambda candidate: len(candidate[1]))
+    parts = PLACEHOLDER.split(template)
+
+    for index in range(0, len(parts), 2):
+        parts[index] = escape_template(parts[index].replace('%%', '%'))
+    for index in range(1, len(parts), 2):
+        parts[index] = '${%s}' % parts[index]
+
+    return ''.join(parts), collections.OrderedDict((parameter, REGEX_ARGUMENT_TYPE) for parameter in parameters)
+
+@functools.lru_cache(maxsize=None)
+def compile_pattern(pattern):
+    pattern = route_pattern(pattern)
+
+    if hasattr(pattern, '_route'):
+        return compile_route(pattern)
+    return compile_regex(pattern)
+
+def url_template(pattern):
+    """
+    Compiles `pattern` to a TypeScript template literal body, e.g.
+    `/api/books/${pk}/`, with its arguments in order, including those of
+    the includes it is nested under, and its name qualified by their
+    namespaces. Patterns outside the URLconf are compiled on their own.
+    """
+    template = [get_script_prefix()]
+    arguments = collections.OrderedDict()
+    namespaces = []
+
+    for entry in url_prefixes().get(id(pattern), ()) + (pattern,):
+        entry_template, entry_arguments = compile_pattern(entry)
+        template.append(entry_template)
+        arguments.update(entry_arguments)
+
+        if getattr(entry, 'namespace', None):
+            namespaces.append(entry.namespace)
+
+    name = ':'.join(namespaces + [pattern.name]) if pattern.name else None
+    return URLTemplate(name, ''.join(template), arguments)
+
+def clear_templates():
+    url_prefixes.cache_clear()
+    compile_pattern.cache_clear()
@@ -0,0 +1,268 @@
+import collections
+import functools
+import keyword
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+from react_drf.settings import get_setting
+
+
+FIELDS_PARAM = 'fields'
+
+# Writes need every writable field and OPTIONS describes them all, so only
+# reads are pruned.
+SPARSE_METHODS = frozenset(['GET', 'HEAD'])
+
+
+def classify_field(field):
+    """
+    The kind of a serializer field, as used both to type it and to plan the
+    queries that serialize it. Checked in order, e.g. choice fields before
+    the integer fields they may be.
+    """
+    if isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.ModelSerializer):
+        return 'nested_many'
+    elif isinstance(field, serializers.ModelSerializer):
+        return 'nested'
+    elif isinstance(field, serializers.ChoiceField):
+        return 'choice'
+    elif isinstance(field, serializers.JSONField):
+        return 'json'
+    elif isinstance(field, serializers.IntegerField):
+        return 'integer'
+    elif isinstance(field, serializers.PrimaryKeyRelatedField):
+        return 'primary_key'
+    elif isinstance(field, serializers.BooleanField):
+        return 'boolean'
+    elif isinstance(field, serializers.ManyRelatedField):
+        return 'primary_keys'
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def query_plan(SerializerClass):
+    """
+    Maps each field of a model serializer to the select_related and
+    prefetch_related lookups that serialize it without extra queries, so
+    views can plan for the fields actually requested. Nested serializers
+    and many related fields are followed, foreign keys and one to ones
+    through joins unless a prefetch is already on the path. Serializers are
+    built with the context the generator introspects them with.
+    """
+    from react_drf.introspection import introspection_context
+
+    plan = collections.OrderedDict()
+
+    for name, field in SerializerClass(context=introspection_context(SerializerClass)).fields.items():
+        selects, prefetches = [], []
+        plan_field(SerializerClass.Meta.model, field, '', False, selects, prefetches)
+        plan[name] = (selects, prefetches)
+    return plan
+
+
+def plan_field(model, field, prefix, prefetched, selects, prefetches):
+    kind = classify_field(field)
+
+    if kind not in ('nested', 'nested_many', 'primary_keys') or field.source == '*' or '.' in field.source:
+        return
+
+    try:
+        model_field = model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        return
+
+    lookup = prefix + field.source
+
+    if kind == 'nested' and (model_field.many_to_one or model_field.one_to_one) and not prefetched:
+        selects.append(lookup)
+    elif model_field.is_relation:
+        prefetches.append(lookup)
+        prefetched = prefetched or not (model_field.many_to_one or model_field.one_to_one)
+    else:
+        return
+
+    if kind in ('nested', 'nested_many'):
+        serializer = field.child if kind == 'nested_many' else field
+
+        for nested in serializer.fields.values():
+            plan_field(model_field.related_model, nested, lookup + '__', prefetched, selects, prefetches)
+
+
+def requested_fields(request):
+    """
+    The fields requested with `?fields=title,author`, or None for all,
+    including on requests other than reads.
+    """
+    if getattr(request, 'method', None) not in SPARSE_METHODS:
+        return None
+
+    params = getattr(request, 'query_params', getattr(request, 'GET', {}))
+    value = params.get(FIELDS_PARAM)
+
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin(object):
+    """
+    Prunes the fields of the serializer at the root of a response to those
+    requested with `?fields=` on GET and HEAD requests. Nested serializers
+    keep all their fields. Exported serializers all include it.
+    """
+
+    def get_fields(self):
+        fields = super(SparseFieldsMixin, self).get_fields()
+        requested = self.get_requested_fields()
+
+        if requested is not None:
+            for name in list(fields):
+                if name not in requested:
+                    del fields[name]
+        return fields
+
+    def get_requested_fields(self):
+        parent = self.parent
+
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+
+        if parent is not None:
+            return None
+        return requested_fields(self.context.get('request'))
+
+
+# Fields whose to_representation() is a plain conversion, inlined as such.
+INLINE_CONVERSIONS = collections.OrderedDict([
+    (serializers.CharField, 'str'),
+    (serializers.IntegerField, 'int'),
+])
+
+
+def representation_plan(serializer):
+    """
+    How the compiled to_representation() reads each readable field, as
+    (field_name, attribute, conversion) with attribute None to delegate to
+    the field. Only concrete, non-relational model fields are read directly,
+    and only converted inline when their class keeps the conversion.
+    """
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    plan = []
+
+    for field in serializer._readable_fields:
+        attribute = conversion = None
+        source = field.source
+
+        if model is not None and source.isidentifier() and not keyword.iskeyword(source) and \
+                type(field).get_attribute is serializers.Field.get_attribute:
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                model_field = None
+
+            if model_field is not None and model_field.concrete and not model_field.is_relation:
+                attribute = model_field.attname
+
+                for FieldClass, name in INLINE_CONVERSIONS.items():
+                    if type(field).to_representation is FieldClass.to_representation:
+                        conversion = name
+                        break
+
+        plan.append((field.field_name, attribute, conversion))
+    return tuple(plan)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_representation(plan):
+    """
+    Compiles a plan into a function that, given the fields it was planned
+    for, returns a to_representation() doing the same as DRF's loop with
+    the attribute reads and conversions unrolled.
+    """
+    lines = [
+        'def build(fields):',
+        '    (%s,) = fields' % ', '.join('field_%s' % index for index in range(len(plan))) if plan else '    pass',
+        '    def to_representation(instance):',
+        '        ret = OrderedDict()',
+    ]
+
+    for index, (name, attribute, conversion) in enumerate(plan):
+        if attribute is None:
+            lines += [
+                '        try:',
+                '            attribute = field_%s.get_attribute(instance)' % index,
+                '        except SkipField:',
+                '            pass',
+                '        else:',
+                '            ret[%r] = None if attribute is None else field_%s.to_representation(attribute)' % (name, index),
+            ]
+        else:
+            convert = conversion or 'field_%s.to_representation' % index
+            lines += [
+                '        attribute = instance.%s' % attribute,
+                '        ret[%r] = None if attribute is None else %s(attribute)' % (name, convert),
+            ]
+
+    lines += [
+        '        return ret',
+        '    return to_representation',
+    ]
+
+    namespace = {'OrderedDict': collections.OrderedDict, 'SkipField': SkipField}
+    exec(compile('\n'.join(lines), '<compiled representation>', 'exec'), namespace)
+    return namespace['build']
+
+
+@functools.lru_cache(maxsize=None)
+def overrides_representation(SerializerClass):
+    """
+    Whether a class after CompiledRepresentationMixin in the MRO of
+    `SerializerClass` replaces DRF's to_representation(), which the compiled
+    one only does the same as.
+    """
+    mro = SerializerClass.__mro__
+
+    for klass in mro[mro.index(CompiledRepresentationMixin) + 1:]:
+        if 'to_representation' in vars(klass):
+            return klass is not serializers.Serializer
+    return False
+
+
+class CompiledRepresentationMixin(object):
+    """
+    Serializes model instances with a function compiled for the serializer's
+    readable fields instead of DRF's generic loop. Other instances, e.g.
+    dicts, go through DRF as usual, as does everything when the serializer
+    overrides to_representation(). Exported serializers include it when
+    exported with `compiled=True`.
+
+    With the CHECK_COMPILED_SERIALIZERS setting on, every compiled result is
+    compared to DRF's and a mismatch raises an AssertionError.
+    """
+
+    def to_representation(self, instance):
+        if not isinstance(instance, models.Model) or overrides_representation(type(self)):
+            return super(CompiledRepresentationMixin, self).to_representation(instance)
+
+        representation = self.get_compiled_representation()(instance)
+
+        if get_setting('CHECK_COMPILED_SERIALIZERS'):
+            expected = super(CompiledRepresentationMixin, self).to_representation(instance)
+            assert representation == expected and list(representation) == list(expected), (
+                'Compiled representation of %s differs from DRF: %r != %r' % (
+                    type(self).__name__, representation, expected,
+                )
+            )
+        return representation
+
+    def get_compiled_representation(self):
+        # List serializers reuse one child for every item, so compile once
+        # per instance; fields can differ per instance with `?fields=`.
+        if not hasattr(self, '_compiled_representation'):
+            fields = self._readable_fields
+            self._compiled_representation = compile_representation(representation_plan(self))(fields)
+        return self._compiled_representation
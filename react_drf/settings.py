@@ -0,0 +1,45 @@
+"""
+Settings for react_drf are all namespaced in the REACT_DRF setting, e.g.
+
+REACT_DRF = {
+    'SPLIT_EXPORTS': True,
+}
+"""
+import datetime
+
+from django.conf import settings
+
+
+DEFAULTS = {
+    # Write one module per model to client/exports/ plus an index.ts,
+    # instead of a single client/exports.ts.
+    'SPLIT_EXPORTS': False,
+
+    # Keep each model's state in its own slice, with entities in a
+    # structurally shared table instead of a flat byId map.
+    'ENTITY_STORE': False,
+
+    # URL name of a react_drf.views.BatchView. Fetch thunks then gather the
+    # GETs made in the same tick into a single request to it.
+    'BATCH_URL_NAME': None,
+
+    # Callable, or dotted path to one, returning the serializer context used
+    # to introspect exported serializers. See react_drf.introspection.
+    'INTROSPECTION_CONTEXT': 'react_drf.introspection.default_context',
+
+    # Compare the output of serializers exported with `compiled=True` to
+    # REST framework's on every call, raising on a mismatch. For tests.
+    'CHECK_COMPILED_SERIALIZERS': False,
+
+    # Number of serializer infos kept by ExportedMetadata.
+    'METADATA_CACHE_SIZE': 256,
+
+    # How long tombstones of deleted objects are kept by the
+    # prune_tombstones command. Syncs from older watermarks answer with
+    # everything instead.
+    'TOMBSTONE_RETENTION': datetime.timedelta(days=30),
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'REACT_DRF', {}).get(name, DEFAULTS[name])
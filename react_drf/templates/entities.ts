@@ -0,0 +1,148 @@
+// Entity tables share structure between states: entities are spread over a
+// two level trie by a hash of their key, so merging items only copies the
+// nodes on their paths instead of every entity of the model.
+const BITS = 5;
+const MASK = (1 << BITS) - 1;
+
+export type EntityKey = string|number;
+
+type EntityLeaf<T> = {[key: string]: T};
+type EntityBranch<T> = Array<EntityLeaf<T>|undefined>;
+
+export interface EntityTable<T> {
+    readonly size: number;
+    readonly root: ReadonlyArray<EntityBranch<T>|undefined>;
+}
+
+const hasOwnProperty = Object.prototype.hasOwnProperty;
+
+const hashKey = (key: string): number => {
+    let hash = 0;
+
+    for (let index = 0; index < key.length; index++) {
+        hash = (hash * 31 + key.charCodeAt(index)) | 0;
+    }
+    return hash;
+};
+
+export const emptyTable = <T>(): EntityTable<T> => ({size: 0, root: []});
+
+export const getEntity = <T>(table: EntityTable<T>, key: EntityKey): T|undefined => {
+    const id = String(key);
+    const hash = hashKey(id);
+    const branch = table.root[hash & MASK];
+    const leaf = branch && branch[(hash >>> BITS) & MASK];
+
+    return leaf && hasOwnProperty.call(leaf, id) ? leaf[id] : undefined;
+};
+
+export const getEntities = <T>(table: EntityTable<T>, keys: EntityKey[]): T[] => {
+    const entities: T[] = [];
+
+    for (const key of keys) {
+        const entity = getEntity(table, key);
+
+        if (entity !== undefined) {
+            entities.push(entity);
+        }
+    }
+    return entities;
+};
+
+export const entityValues = <T>(table: EntityTable<T>): T[] => {
+    const entities: T[] = [];
+
+    for (const branch of table.root) {
+        for (const leaf of branch || []) {
+            for (const id in leaf) {
+                if (hasOwnProperty.call(leaf, id)) {
+                    entities.push(leaf[id]);
+                }
+            }
+        }
+    }
+    return entities;
+};
+
+// Merges a batch of items in one pass. Nodes are copied the first time the
+// batch touches them and mutated in place afterwards, so the cost grows with
+// the number of items merged, not with the size of the table.
+export const mergeEntities = <T>(table: EntityTable<T>, items: T[], key: (item: T) => EntityKey): EntityTable<T> => {
+    if (items.length === 0) {
+        return table;
+    }
+
+    const copied = new Set<object>();
+    const root = table.root.slice();
+    let size = table.size;
+
+    for (const item of items) {
+        const id = String(key(item));
+        const hash = hashKey(id);
+        const branchIndex = hash & MASK;
+        const leafIndex = (hash >>> BITS) & MASK;
+
+        let branch = root[branchIndex];
+
+        if (branch === undefined || !copied.has(branch)) {
+            branch = branch === undefined ? [] : branch.slice();
+            copied.add(branch);
+            root[branchIndex] = branch;
+        }
+
+        let leaf = branch[leafIndex];
+
+        if (leaf === undefined || !copied.has(leaf)) {
+            leaf = Object.assign({}, leaf);
+            copied.add(leaf);
+            branch[leafIndex] = leaf;
+        }
+
+        if (leaf[id] === item) {
+            continue;
+        }
+        if (!hasOwnProperty.call(leaf, id)) {
+            size += 1;
+        }
+        leaf[id] = item;
+    }
+    return {size, root};
+};
+
+// Removes entities by key, copying the nodes holding them like
+// mergeEntities. Returns the same table when none of them is in it.
+export const removeEntities = <T>(table: EntityTable<T>, keys: EntityKey[]): EntityTable<T> => {
+    const copied = new Set<object>();
+    const root = table.root.slice();
+    let size = table.size;
+
+    for (const key of keys) {
+        const id = String(key);
+        const hash = hashKey(id);
+        const branchIndex = hash & MASK;
+        const leafIndex = (hash >>> BITS) & MASK;
+
+        let branch = root[branchIndex];
+        let leaf = branch && branch[leafIndex];
+
+        if (branch === undefined || leaf === undefined || !hasOwnProperty.call(leaf, id)) {
+            continue;
+        }
+
+        if (!copied.has(branch)) {
+            branch = branch.slice();
+            copied.add(branch);
+            root[branchIndex] = branch;
+        }
+
+        if (!copied.has(leaf)) {
+            leaf = Object.assign({}, leaf);
+            copied.add(leaf);
+            branch[leafIndex] = leaf;
+        }
+
+        delete leaf[id];
+        size -= 1;
+    }
+    return size === table.size ? table : {size, root};
+};
@@ -0,0 +1,96 @@
+// Decodes MessagePack, as rendered by MessagePackRenderer. Extension types
+// are never rendered, since dates and decimals are encoded as in JSON.
+const textDecoder = new TextDecoder();
+
+export const decodeMessagePack = (buffer: ArrayBuffer): any => {
+    const bytes = new Uint8Array(buffer);
+    const view = new DataView(buffer);
+    let offset = 0;
+
+    // Moves past `size` bytes and returns where they start.
+    const advance = (size: number) => {
+        const start = offset;
+        offset += size;
+        return start;
+    };
+
+    const text = (length: number) => textDecoder.decode(bytes.subarray(advance(length), offset));
+    const binary = (length: number) => bytes.slice(advance(length), offset);
+
+    const array = (length: number) => {
+        const items = new Array(length);
+
+        for (let index = 0; index < length; index++) {
+            items[index] = read();
+        }
+        return items;
+    };
+
+    const map = (length: number) => {
+        const object: {[key: string]: any} = {};
+
+        for (let index = 0; index < length; index++) {
+            const key = read();
+            object[key] = read();
+        }
+        return object;
+    };
+
+    const read = (): any => {
+        const type = bytes[advance(1)];
+
+        if (type <= 0x7f) {
+            return type;
+        } else if (type <= 0x8f) {
+            return map(type & 0x0f);
+        } else if (type <= 0x9f) {
+            return array(type & 0x0f);
+        } else if (type <= 0xbf) {
+            return text(type & 0x1f);
+        } else if (type >= 0xe0) {
+            return type - 0x100;
+        }
+
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: return binary(view.getUint8(advance(1)));
+            case 0xc5: return binary(view.getUint16(advance(2)));
+            case 0xc6: return binary(view.getUint32(advance(4)));
+            case 0xca: return view.getFloat32(advance(4));
+            case 0xcb: return view.getFloat64(advance(8));
+            case 0xcc: return view.getUint8(advance(1));
+            case 0xcd: return view.getUint16(advance(2));
+            case 0xce: return view.getUint32(advance(4));
+            case 0xcf: {
+                const start = advance(8);
+                return view.getUint32(start) * 0x100000000 + view.getUint32(start + 4);
+            }
+            case 0xd0: return view.getInt8(advance(1));
+            case 0xd1: return view.getInt16(advance(2));
+            case 0xd2: return view.getInt32(advance(4));
+            case 0xd3: {
+                const start = advance(8);
+                return view.getInt32(start) * 0x100000000 + view.getUint32(start + 4);
+            }
+            case 0xd9: return text(view.getUint8(advance(1)));
+            case 0xda: return text(view.getUint16(advance(2)));
+            case 0xdb: return text(view.getUint32(advance(4)));
+            case 0xdc: return array(view.getUint16(advance(2)));
+            case 0xdd: return array(view.getUint32(advance(4)));
+            case 0xde: return map(view.getUint16(advance(2)));
+            case 0xdf: return map(view.getUint32(advance(4)));
+        }
+        throw new Error(`Unsupported MessagePack type 0x${type.toString(16)} at ${offset - 1}.`);
+    };
+
+    return bytes.length === 0 ? null : read();
+};
+
+export const messagePackFormat: ResponseFormat = {
+    accept: 'application/msgpack',
+    responseType: 'arraybuffer',
+    // Responses batched through the batch view arrive as JSON.
+    decode: data => data instanceof ArrayBuffer ? decodeMessagePack(data) : data,
+};
@@ -0,0 +1,197 @@
+// Identical requests made while one is in flight share its promise, so
+// components mounting together send a single request and the thunk that
+// started it dispatches once.
+const inFlightRequests = new Map<string, Promise<any>>();
+
+export const coalesce = <T>(method: string, url: string, request: () => Promise<T>): Promise<T> => {
+    const key = `${method} ${url}`;
+    const pending = inFlightRequests.get(key);
+
+    if (pending !== undefined) {
+        return pending;
+    }
+
+    const promise = request();
+    const clear = () => {
+        if (inFlightRequests.get(key) === promise) {
+            inFlightRequests.delete(key);
+        }
+    };
+
+    inFlightRequests.set(key, promise);
+    promise.then(clear, clear);
+    return promise;
+};
+
+export interface GetResponse<T> {
+    status: number;
+    data: T;
+    headers: {[name: string]: string};
+}
+
+// How to request and decode responses rendered other than as JSON.
+export interface ResponseFormat {
+    accept: string;
+    responseType?: 'arraybuffer';
+    decode: (data: any) => any;
+}
+
+interface BatchedRequest {
+    url: string;
+    etag: string|null;
+    accept: string|null;
+    resolve: (response: GetResponse<any>) => void;
+    reject: (error: any) => void;
+}
+
+interface BatchedResponse {
+    status: number;
+    data: any;
+    etag: string|null;
+}
+
+const isSuccessful = (status: number) => (status >= 200 && status < 300) || status === 304;
+
+let pendingBatch: BatchedRequest[] = [];
+
+const sendBatch = () => {
+    const requests = pendingBatch;
+    pendingBatch = [];
+
+    api.post<{responses: BatchedResponse[]}>(BATCH_URL as string, {
+        requests: requests.map(({url, etag, accept}) => ({url, etag, accept})),
+    }).then(response => {
+        response.data.responses.forEach(({status, data, etag}, index) => {
+            const result = {status, data, headers: etag ? {etag} : {}};
+
+            if (isSuccessful(status)) {
+                requests[index].resolve(result);
+            } else {
+                // Shaped like the errors of api.get.
+                requests[index].reject({response: result});
+            }
+        });
+    }, error => {
+        requests.forEach(request => request.reject(error));
+    });
+};
+
+// GETs go through the batch view when there is one: requests made in the
+// same tick are sent together once the current task's promises settle.
+export const batchGet = <T>(url: string, etag: string|null = null, format: ResponseFormat|null = null): Promise<GetResponse<T>> => {
+    const accept = format === null ? null : format.accept;
+    const decode = (response: GetResponse<any>): GetResponse<T> => {
+        if (format === null || response.status === 304) {
+            return response;
+        }
+        return Object.assign({}, response, {data: format.decode(response.data)});
+    };
+
+    if (BATCH_URL === null) {
+        const headers: {[name: string]: string} = {};
+
+        if (etag) {
+            headers['If-None-Match'] = etag;
+        }
+        if (accept) {
+            headers['Accept'] = accept;
+        }
+        const config: any = {headers, validateStatus: isSuccessful};
+
+        if (format !== null && format.responseType) {
+            config.responseType = format.responseType;
+        }
+        return api.get<T>(url, config).then(decode);
+    }
+
+    return new Promise<GetResponse<any>>((resolve, reject) => {
+        if (pendingBatch.length === 0) {
+            Promise.resolve().then(sendBatch);
+        }
+        pendingBatch.push({url, etag, accept, resolve, reject});
+    }).then(decode);
+};
+
+// ETags and decoded data of the last successful response per URL and
+// format, for views that answer conditional requests.
+const validatedResponses = new Map<string, {etag: string, data: any}>();
+
+export const conditionalGet = <T>(url: string, format: ResponseFormat|null = null): Promise<{data: T, modified: boolean}> => {
+    const key = format === null ? url : `${format.accept} ${url}`;
+    const validated = validatedResponses.get(key);
+
+    return batchGet<T>(url, validated ? validated.etag : null, format).then(response => {
+        if (response.status === 304 && validated) {
+            return {data: validated.data as T, modified: false};
+        }
+
+        const etag = response.headers['etag'];
+
+        if (etag) {
+            validatedResponses.set(key, {etag, data: response.data});
+        } else {
+            validatedResponses.delete(key);
+        }
+        return {data: response.data, modified: true};
+    });
+};
+
+// The envelope of paginated list views.
+export interface Page<T> {
+    next: string|null;
+    previous: string|null;
+    results: T[];
+}
+
+// Requests a subset of fields from exported serializers.
+export const withFields = (url: string, fields: string[]) => {
+    const separator = url.indexOf('?') === -1 ? '?' : '&';
+    return `${url}${separator}fields=${fields.map(encodeURIComponent).join(',')}`;
+};
+
+// What changed since a watermark, as answered by views with DeltaSyncMixin.
+// Full syncs are split in pages linked by `next`.
+export interface Delta<T> {
+    watermark: string;
+    full: boolean;
+    changed: T[];
+    deleted: Array<string|number>;
+    next: string|null;
+}
+
+// Requests the changes since `watermark`, or everything without one.
+export const withSince = (url: string, watermark: string|null) => {
+    const separator = url.indexOf('?') === -1 ? '?' : '&';
+    return `${url}${separator}since=${encodeURIComponent(watermark || '')}`;
+};
+
+// Lists rendered by ColumnarJSONRenderer name each key once.
+export interface Columnar {
+    columns: string[];
+    rows: any[][];
+}
+
+export const decodeColumns = <T>({columns, rows}: Columnar): T[] => rows.map(row => {
+    const item: any = {};
+
+    for (let index = 0; index < columns.length; index++) {
+        item[columns[index]] = row[index];
+    }
+    return item as T;
+});
+
+const isColumnar = (data: any): data is Columnar => data !== null && typeof data === 'object' && Array.isArray(data.columns);
+
+// Requests columns and decodes them into items with `decode`, whether they
+// are the whole response or the results of a page.
+export const columnarFormat = <T>(decode: (data: Columnar) => T[]): ResponseFormat => ({
+    accept: 'application/vnd.react-drf.columnar+json',
+    decode: data => {
+        if (isColumnar(data)) {
+            return decode(data);
+        } else if (data !== null && typeof data === 'object' && isColumnar(data.results)) {
+            return Object.assign({}, data, {results: decode(data.results)});
+        }
+        return data;
+    },
+});
@@ -0,0 +1,60 @@
+// Lists equal item by item are replaced by the previous one, so selectors
+// keep returning the same array while the items they select are unchanged.
+const sameItems = <T>(previous: T[], next: T[]) => {
+    return previous.length === next.length && previous.every((item, index) => item === next[index]);
+};
+
+// Selects the items of a model's list, recomputing only when its entities
+// or its list of keys were replaced.
+export const listSelector = <S, E, K, T>(entities: (state: S) => E, list: (state: S) => K[], select: (entities: E, list: K[]) => T[]) => {
+    let lastEntities: E|undefined;
+    let lastList: K[]|undefined;
+    let result: T[] = [];
+
+    return (state: S): T[] => {
+        const currentEntities = entities(state);
+        const currentList = list(state);
+
+        if (currentEntities !== lastEntities || currentList !== lastList) {
+            const next = select(currentEntities, currentList);
+            result = sameItems(result, next) ? result : next;
+            lastEntities = currentEntities;
+            lastList = currentList;
+        }
+        return result;
+    };
+};
+
+// Filters what `select` returns, recomputing only when it returned another
+// list.
+export const filteredSelector = <S, T>(select: (state: S) => T[], predicate: (item: T) => boolean) => {
+    let lastItems: T[]|undefined;
+    let result: T[] = [];
+
+    return (state: S): T[] => {
+        const items = select(state);
+
+        if (items !== lastItems) {
+            const next = items.filter(predicate);
+            result = sameItems(result, next) ? result : next;
+            lastItems = items;
+        }
+        return result;
+    };
+};
+
+// Keeps one selector per value, such as each choice a list is filtered by,
+// so selecting by different values does not recompute the others.
+export const keyedSelector = <S, V, T>(create: (value: V) => (state: S) => T) => {
+    const selectors = new Map<V, (state: S) => T>();
+
+    return (state: S, value: V): T => {
+        let selector = selectors.get(value);
+
+        if (selector === undefined) {
+            selector = create(value);
+            selectors.set(value, selector);
+        }
+        return selector(state);
+    };
+};
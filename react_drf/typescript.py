@@ -0,0 +1,108 @@
+import collections
+import decimal
+import io
+import json
+
+from django.utils.encoding import force_text
+from django.utils.functional import Promise
+
+
+# Values of these keys are narrowed to their literal type, e.g. "string" as
+# "string", so TypeScript can discriminate on them.
+NARROWED_KEYS = frozenset(['name', 'type'])
+
+CONSTANTS = {None: 'null', True: 'true', False: 'false'}
+DICTS = (dict, collections.OrderedDict)
+SCALARS = (str, int, float, bool, type(None))
+SEQUENCES = (list, tuple)
+
+encode = json.JSONEncoder().encode
+encode_string = json.encoder.encode_basestring_ascii
+
+
+def is_plain(value, narrowed_keys):
+    """
+    Whether a sequence holds nothing to narrow, so it can be handed to the
+    JSON encoder as a whole. Lists of choices are the common case.
+    """
+    for item in value:
+        kind = type(item)
+
+        if kind in DICTS:
+            if not narrowed_keys.isdisjoint(item):
+                return False
+
+            for nested in item.values():
+                if type(nested) not in SCALARS:
+                    return False
+        elif kind not in SCALARS:
+            return False
+    return True
+
+
+def write_literal(write, value, narrowed_keys=NARROWED_KEYS, narrow=False):
+    """
+    Writes `value` as a TypeScript literal in a single pass, formatted like
+    `json.dumps`. Exact types are checked first since metadata is almost
+    entirely made of them.
+    """
+    kind = type(value)
+
+    if kind is str:
+        encoded = encode_string(value)
+        write('%s as %s' % (encoded, encoded) if narrow else encoded)
+    elif kind in DICTS:
+        write('{')
+        separator = ''
+
+        for key, item in value.items():
+            item_kind = type(item)
+
+            if item_kind is str:
+                encoded = encode_string(item)
+
+                if key in narrowed_keys:
+                    write('%s%s: %s as %s' % (separator, encode_string(key), encoded, encoded))
+                else:
+                    write('%s%s: %s' % (separator, encode_string(key), encoded))
+            elif item_kind is bool or item is None:
+                write('%s%s: %s' % (separator, encode_string(key), CONSTANTS[item]))
+            elif item_kind is int:
+                write('%s%s: %d' % (separator, encode_string(key), item))
+            else:
+                write('%s%s: ' % (separator, encode_string(str(key))))
+                write_literal(write, item, narrowed_keys, key in narrowed_keys)
+            separator = ', '
+        write('}')
+    elif kind in SEQUENCES and is_plain(value, narrowed_keys):
+        write(encode(value))
+    elif kind in SEQUENCES:
+        write('[')
+
+        for index, item in enumerate(value):
+            if index:
+                write(', ')
+            write_literal(write, item, narrowed_keys)
+        write(']')
+    elif kind is bool or value is None:
+        write(CONSTANTS[value])
+    elif isinstance(value, Promise):
+        write_literal(write, force_text(value), narrowed_keys, narrow)
+    elif isinstance(value, str):
+        write_literal(write, str(value), narrowed_keys, narrow)
+    elif isinstance(value, (int, float)):
+        write(repr(float(value) if isinstance(value, float) else int(value)))
+    elif isinstance(value, decimal.Decimal):
+        write(str(value))
+    elif isinstance(value, dict):
+        write_literal(write, collections.OrderedDict(value), narrowed_keys, narrow)
+    elif isinstance(value, SEQUENCES):
+        write_literal(write, list(value), narrowed_keys, narrow)
+    else:
+        raise TypeError('%r cannot be written as a TypeScript literal.' % (value,))
+
+
+def literal(value, narrowed_keys=NARROWED_KEYS):
+    buffer = io.StringIO()
+    write_literal(buffer.write, value, narrowed_keys)
+    return buffer.getvalue()
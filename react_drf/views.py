@@ -0,0 +1,407 @@
+import collections
+import datetime
+import logging
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
+
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from react_drf.cache import digest
+from react_drf.models import Tombstone, track_deletions
+from react_drf.renderers import ColumnarJSONRenderer
+from react_drf.routes import Resolver404, get_script_prefix, resolve
+from react_drf.serializers import query_plan, requested_fields
+
+
+logger = logging.getLogger('django.request')
+
+def parse_if_none_match(header):
+    return {tag.strip().replace('W/', '', 1).strip('"') for tag in header.split(',') if tag.strip()}
+
+
+class ConditionalGetMixin(object):
+    """
+    Answers GET requests with 304 Not Modified when the client's ETag still
+    matches, without serializing anything. The ETag is computed from the
+    latest `etag_field` and the number of objects, so the field should change
+    on every save, e.g. a DateTimeField with auto_now=True.
+
+    Generated fetch thunks for these views send If-None-Match and skip
+    dispatching when nothing changed.
+
+    Tags differ per user and media type, and responses vary by the headers
+    choosing them, so neither clients nor shared caches reuse a response
+    for another user or format.
+    """
+    etag_field = 'updated'
+    vary_headers = ('Accept', 'Authorization', 'Cookie')
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request, *args, **kwargs)
+
+        if etag is None:
+            return super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+
+        tags = parse_if_none_match(request.META.get('HTTP_IF_NONE_MATCH', ''))
+
+        if etag in tags or '*' in tags:
+            # Run the lookup and object permission checks a 200 would pass,
+            # so a caller who lost access gets 403/404 rather than a 304.
+            if (self.lookup_url_kwarg or self.lookup_field) in self.kwargs:
+                self.get_object()
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = '"%s"' % etag
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Set after REST framework replaces Vary with its own.
+        response = super(ConditionalGetMixin, self).finalize_response(request, response, *args, **kwargs)
+
+        if response.has_header('ETag'):
+            patch_vary_headers(response, self.vary_headers)
+        return response
+
+    def get_etag_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_etag(self, request, *args, **kwargs):
+        """
+        Returns the ETag for this request, or None to skip conditional
+        handling. The full path is included so pages and filters of the
+        same queryset get different tags, as are the negotiated media type
+        and the user, whose permissions may change what is serialized.
+        """
+        aggregate = self.get_etag_queryset().aggregate(latest=Max(self.etag_field), count=Count('pk'))
+
+        if not aggregate['count']:
+            return None
+        return digest(
+            request.get_full_path(),
+            getattr(request, 'accepted_media_type', None),
+            getattr(getattr(request, 'user', None), 'pk', None),
+            aggregate['latest'],
+            aggregate['count'],
+        )
+
+
+def sparse_columns(model, fields):
+    """
+    The columns needed to serialize `fields`, or None when a field's source
+    is not a model field, e.g. a method or a dotted path, and could touch
+    any column.
+    """
+    columns = [model._meta.pk.name]
+
+    for field in fields:
+        if field.source == '*' or '.' in field.source:
+            return None
+
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+
+        # Many to many and reverse relations have no column of their own.
+        if model_field.concrete and not model_field.many_to_many:
+            columns.append(model_field.name)
+    return columns
+
+
+class SparseQuerysetMixin(object):
+    """
+    Loads only the columns of the fields requested with `?fields=`, which
+    exported serializers prune themselves to.
+    """
+
+    def get_queryset(self):
+        queryset = super(SparseQuerysetMixin, self).get_queryset()
+
+        if requested_fields(self.request) is None:
+            return queryset
+
+        columns = sparse_columns(queryset.model, self.get_serializer().fields.values())
+        return queryset if columns is None else queryset.only(*columns)
+
+
+class QueryPlanMixin(object):
+    """
+    Applies the select_related and prefetch_related lookups planned for the
+    serializer class to get_queryset(), for the fields requested with
+    `?fields=` if any, so nested and related fields do not cost a query per
+    object.
+    """
+
+    def get_queryset(self):
+        queryset = super(QueryPlanMixin, self).get_queryset()
+        requested = requested_fields(self.request)
+        selects, prefetches = [], []
+
+        for name, (field_selects, field_prefetches) in query_plan(self.get_serializer_class()).items():
+            if requested is None or name in requested:
+                selects.extend(field_selects)
+                prefetches.extend(field_prefetches)
+
+        if selects:
+            queryset = queryset.select_related(*selects)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
+
+class DeltaSyncMixin(object):
+    """
+    Lets list views answer `?since=<watermark>` with only the objects saved
+    since, plus the primary keys of the ones deleted since, e.g.
+
+    {"watermark": "...", "full": false, "changed": [...], "deleted": [4, 7], "next": null}
+
+    An empty `since`, or a watermark older than the TOMBSTONE_RETENTION
+    setting, answers with every object and `"full": true`, in pages of
+    `sync_page_size` ordered by primary key. `next` links to the following
+    page, and every page answers the watermark of the first. Clients send
+    the watermark of the last page with their next request. Without `since`
+    the view lists as usual.
+
+    `sync_field` should change on every save, e.g. a DateTimeField with
+    auto_now=True. Deletions of the view's model are recorded as
+    tombstones, pruned by the prune_tombstones command. Objects that stop
+    matching the view's filters without being deleted are not reported.
+
+    Generated `sync<View>` thunks follow every page and merge the changes
+    into the store.
+    """
+    sync_field = 'updated'
+    sync_param = 'since'
+    sync_cursor_param = 'cursor'
+    sync_page_size = 1000
+
+    # Watermarks are moved back by this much, so objects saved by
+    # transactions still open when the response is built are not missed.
+    sync_overlap = datetime.timedelta(seconds=5)
+
+    def __init_subclass__(cls, **kwargs):
+        super(DeltaSyncMixin, cls).__init_subclass__(**kwargs)
+        model = cls.get_sync_model()
+
+        if model is not None:
+            track_deletions(model)
+
+    @classmethod
+    def get_sync_model(cls):
+        queryset = getattr(cls, 'queryset', None)
+
+        if queryset is not None:
+            return queryset.model
+
+        meta = getattr(getattr(cls, 'serializer_class', None), 'Meta', None)
+        return getattr(meta, 'model', None)
+
+    def list(self, request, *args, **kwargs):
+        if self.sync_param not in request.query_params:
+            return super(DeltaSyncMixin, self).list(request, *args, **kwargs)
+        return Response(self.get_delta(request.query_params[self.sync_param]))
+
+    def parse_watermark(self, value, param):
+        try:
+            watermark = parse_datetime(value)
+        except ValueError:
+            watermark = None
+
+        if watermark is None:
+            raise ValidationError({param: ['Expected the watermark of an earlier response.']})
+
+        # Compared with times of the same kind, naive ones being local.
+        if settings.USE_TZ and timezone.is_naive(watermark):
+            return timezone.make_aware(watermark)
+        elif not settings.USE_TZ and timezone.is_aware(watermark):
+            return timezone.make_naive(watermark)
+        return watermark
+
+    def get_delta(self, since):
+        queryset = self.filter_queryset(self.get_queryset())
+        since = self.parse_watermark(since, self.sync_param) if since else None
+
+        # Deletions this old may have been pruned, so start over.
+        if since is None or since < Tombstone.objects.horizon():
+            return self.get_full_page(queryset)
+
+        watermark = timezone.now() - self.sync_overlap
+        queryset = queryset.filter(**{'%s__gte' % self.sync_field: since})
+
+        return collections.OrderedDict([
+            ('watermark', watermark.isoformat()),
+            ('full', False),
+            ('changed', self.get_serializer(queryset, many=True).data),
+            ('deleted', Tombstone.objects.deleted_since(queryset.model, since)),
+            ('next', None),
+        ])
+
+    def get_full_page(self, queryset):
+        """
+        A page of every object, continuing after the primary key in the
+        cursor, which also carries the watermark of the first page.
+        """
+        cursor = self.request.query_params.get(self.sync_cursor_param)
+        pk = queryset.model._meta.pk
+
+        if cursor:
+            watermark, _, after = cursor.partition(',')
+            watermark = self.parse_watermark(watermark, self.sync_cursor_param)
+
+            try:
+                queryset = queryset.filter(pk__gt=pk.to_python(after))
+            except DjangoValidationError:
+                raise ValidationError({self.sync_cursor_param: ['Expected the cursor of an earlier response.']})
+        else:
+            watermark = timezone.now() - self.sync_overlap
+
+        queryset = queryset.order_by('pk')
+
+        if self.sync_page_size:
+            queryset = queryset[:self.sync_page_size + 1]
+
+        objects = list(queryset)
+        next_url = None
+
+        if self.sync_page_size and len(objects) > self.sync_page_size:
+            objects = objects[:self.sync_page_size]
+            params = self.request.query_params.copy()
+            params[self.sync_cursor_param] = '%s,%s' % (watermark.isoformat(), pk.value_to_string(objects[-1]))
+            next_url = self.request.build_absolute_uri('?%s' % params.urlencode())
+
+        return collections.OrderedDict([
+            ('watermark', watermark.isoformat()),
+            ('full', True),
+            ('changed', self.get_serializer(objects, many=True).data),
+            ('deleted', []),
+            ('next', next_url),
+        ])
+
+
+class BatchView(APIView):
+    """
+    Resolves several GETs to exported views in one request, e.g.
+
+    POST {"requests": [{"url": "/api/books/1/", "etag": null}]}
+
+    returns {"responses": [{"status": 200, "data": {...}, "etag": ...}]} in
+    the same order. Each view runs as if requested directly by the same
+    user, with the request's `accept` as its Accept header if given. Views
+    raising an error answer 500 without failing the rest of the batch. Set
+    the BATCH_URL_NAME setting to the name of this view's URL to have
+    generated fetch thunks batch their requests.
+    """
+    max_batch_size = 50
+
+    # Set on the request by middleware, such as sessions and authentication.
+    request_attributes = ('user', 'auth', 'session', 'csrf_processing_done', '_dont_enforce_csrf_checks')
+
+    def post(self, request, *args, **kwargs):
+        items = request.data.get('requests') if isinstance(request.data, dict) else None
+
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValidationError({'requests': ['Expected a list of requests.']})
+        elif len(items) > self.max_batch_size:
+            raise ValidationError({'requests': ['At most %s requests can be batched.' % self.max_batch_size]})
+
+        callbacks = self.get_exported_callbacks()
+        return Response({'responses': [self.get_response(request, item, callbacks) for item in items]})
+
+    def get_exported_callbacks(self):
+        from react_drf.generator import patterns_to_export
+
+        return {pattern.callback for pattern in patterns_to_export}
+
+    def get_response(self, request, item, callbacks):
+        url = urlsplit(str(item.get('url', '')))
+        prefix = get_script_prefix()
+        path_info = '/' + url.path[len(prefix):] if url.path.startswith(prefix) else url.path
+
+        try:
+            match = resolve(path_info)
+        except Resolver404:
+            match = None
+
+        if match is None or match.func not in callbacks:
+            return {'status': status.HTTP_404_NOT_FOUND, 'data': {'detail': 'Not found.'}, 'etag': None}
+
+        subrequest = self.get_subrequest(request, url, path_info, item.get('etag'), item.get('accept'), match)
+
+        try:
+            response = match.func(subrequest, *match.args, **match.kwargs)
+        except Exception:
+            # Logged as Django logs errors of requests made directly.
+            logger.error('Internal Server Error: %s', subrequest.path, exc_info=True, extra={
+                'status_code': status.HTTP_500_INTERNAL_SERVER_ERROR,
+                'request': subrequest,
+            })
+            return {
+                'status': status.HTTP_500_INTERNAL_SERVER_ERROR,
+                'data': {'detail': 'A server error occurred.'},
+                'etag': None,
+            }
+
+        data = getattr(response, 'data', None)
+        renderer = getattr(response, 'accepted_renderer', None)
+
+        # Responses are rendered as part of the batch, so apply the shape
+        # of the renderer each view negotiated.
+        if isinstance(renderer, ColumnarJSONRenderer):
+            data = renderer.to_columns(data, getattr(response, 'renderer_context', None))
+
+        return {
+            'status': response.status_code,
+            'data': data,
+            'etag': response.get('ETag'),
+        }
+
+    def get_subrequest(self, request, url, path_info, etag, accept=None, match=None):
+        """
+        A new GET request to `url`, sharing only the headers and middleware
+        attributes of the batch request, so views changing their request do
+        not affect each other.
+        """
+        original = request._request
+        subrequest = HttpRequest()
+        subrequest.method = 'GET'
+        subrequest.path = url.path
+        subrequest.path_info = path_info
+        subrequest.GET = QueryDict(url.query)
+        subrequest.COOKIES = dict(original.COOKIES)
+        subrequest.META = dict(original.META, REQUEST_METHOD='GET', PATH_INFO=path_info, QUERY_STRING=url.query)
+        subrequest.resolver_match = match
+
+        # HttpRequest is always http otherwise, e.g. in pagination links.
+        subrequest._get_scheme = original._get_scheme
+
+        for name in ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH', 'wsgi.input'):
+            subrequest.META.pop(name, None)
+
+        for name in self.request_attributes:
+            if hasattr(original, name):
+                setattr(subrequest, name, getattr(original, name))
+
+        if etag:
+            subrequest.META['HTTP_IF_NONE_MATCH'] = str(etag)
+        if accept:
+            subrequest.META['HTTP_ACCEPT'] = str(accept)
+        return subrequest
@@ -0,0 +1,262 @@
+import importlib
+import os
+import sys
+import time
+import traceback
+
+from django.conf import settings
+from django.db import models
+
+from react_drf import generator
+from react_drf.metadata import serializer_info_cache
+from react_drf.routes import clear_url_caches
+
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None
+
+
+class RestartRequired(Exception):
+    pass
+
+
+class PollingWatcher(object):
+    def __init__(self, interval):
+        self.interval = interval
+        self.mtimes = {}
+
+    def changed(self, filenames):
+        changed = set()
+
+        for filename in filenames:
+            try:
+                mtime = os.stat(filename).st_mtime
+            except OSError:
+                continue
+
+            previous = self.mtimes.get(filename)
+            self.mtimes[filename] = mtime
+
+            if previous is not None and previous != mtime:
+                changed.add(filename)
+        return changed
+
+    def wait(self, filenames):
+        while True:
+            changed = self.changed(filenames)
+
+            if changed:
+                return changed
+            time.sleep(self.interval)
+
+
+class InotifyWatcher(object):
+    MASK = pyinotify and (
+        pyinotify.IN_MODIFY | pyinotify.IN_CLOSE_WRITE | pyinotify.IN_MOVED_TO | pyinotify.IN_CREATE
+    )
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.directories = set()
+        self.events = set()
+        self.manager = pyinotify.WatchManager()
+        self.notifier = pyinotify.Notifier(self.manager, default_proc_fun=self.record)
+
+    def record(self, event):
+        self.events.add(event.pathname)
+
+    def changed(self, filenames):
+        for directory in set(os.path.dirname(filename) for filename in filenames) - self.directories:
+            self.manager.add_watch(directory, self.MASK)
+            self.directories.add(directory)
+
+        changed = self.events & set(filenames)
+        self.events.clear()
+        return changed
+
+    def wait(self, filenames):
+        self.changed(filenames)
+
+        while True:
+            self.notifier.check_events(timeout=None)
+            self.notifier.read_events()
+
+            # Editors tend to write a file several times in a row. Timeouts
+            # are in milliseconds.
+            while self.notifier.check_events(timeout=self.interval * 1000):
+                self.notifier.read_events()
+            self.notifier.process_events()
+
+            changed = self.changed(filenames)
+
+            if changed:
+                return changed
+
+
+def source_modules():
+    """
+    Loaded modules whose source lives in the project, keyed by filename, in
+    the order they were imported.
+    """
+    base_directory = os.path.abspath(settings.BASE_DIR) + os.sep
+    modules = {}
+
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, '__file__', None)
+
+        # Scripts run as __main__, such as manage.py, have no spec to reload.
+        if filename is None or getattr(module, '__spec__', None) is None or name.split('.')[0] == 'react_drf':
+            continue
+
+        filename = os.path.abspath(filename)
+
+        if filename.endswith(('.pyc', '.pyo')):
+            filename = filename[:-1]
+
+        if filename.startswith(base_directory) and 'site-packages' not in filename:
+            modules[filename] = module
+    return modules
+
+
+def defines_models(module):
+    return any(
+        isinstance(value, type) and issubclass(value, models.Model) and value.__module__ == module.__name__
+        for value in vars(module).values()
+    )
+
+
+def refers_to(module, other):
+    # Packages refer to their submodules once imported, but do not use them.
+    if other.__name__.startswith(module.__name__ + '.'):
+        return False
+
+    return any(
+        value is other or
+        getattr(value, '__module__', None) == other.__name__ or
+        getattr(value, '_original_module', None) == other.__name__
+        for value in vars(module).values()
+    )
+
+
+def dependent_modules(module):
+    """
+    Names of the modules exporting serializers that nest the ones `module`
+    exports, as recorded by the registry during the last run, or views
+    serving them. Serializers may nest others without referring to their
+    module, e.g. from get_fields.
+    """
+    registry = generator.registry
+    names = set()
+    keys = [
+        generator.serializer_key(SourceSerializer) for SourceSerializer in registry.serializers
+        if SourceSerializer._original_module == module.__name__
+    ]
+
+    for key in registry.dependents(keys):
+        SourceSerializer = registry.serializers.get(key)
+        names.add(SourceSerializer._original_module)
+        names.update(getattr(pattern, '_export_module', None) for pattern in registry.patterns_for_serializer(SourceSerializer))
+    return names
+
+
+def modules_to_reload(changed, modules):
+    """
+    The changed modules plus every project module that refers to them or
+    exports what depends on their exports, directly or not, in import order.
+    Models and settings cannot be reloaded in place, so those require a
+    restart.
+    """
+    to_reload = list(changed)
+    index = 0
+
+    while index < len(to_reload):
+        module = to_reload[index]
+        index += 1
+
+        if defines_models(module) or module.__name__ == os.environ.get('DJANGO_SETTINGS_MODULE'):
+            raise RestartRequired(module.__name__)
+
+        dependents = dependent_modules(module)
+
+        for other in modules:
+            if other not in to_reload and (other.__name__ in dependents or refers_to(other, module)):
+                to_reload.append(other)
+
+    # Reload modules after the ones they refer to, falling back to import
+    # order for cycles.
+    order = list(sys.modules.values())
+    pending = sorted(to_reload, key=lambda module: order.index(module))
+    ordered = []
+
+    while pending:
+        ready = [
+            module for module in pending
+            if not any(other is not module and refers_to(module, other) for other in pending)
+        ]
+        module = ready[0] if ready else pending[0]
+        pending.remove(module)
+        ordered.append(module)
+    return ordered
+
+
+def reload_exports(changed, modules):
+    """
+    Reloads the changed modules and the ones depending on them. Their exports
+    are registered again in place, and exports they no longer define are
+    removed.
+    """
+    to_reload = modules_to_reload(changed, modules)
+    names = set(module.__name__ for module in to_reload)
+
+    owned = [
+        (generator.serializers_to_export, generator.serializer_key, {
+            generator.serializer_key(SourceSerializer): SourceSerializer
+            for SourceSerializer in generator.serializers_to_export
+            if SourceSerializer._original_module in names
+        }),
+        (generator.patterns_to_export, generator.pattern_key, {
+            generator.pattern_key(pattern): pattern
+            for pattern in generator.patterns_to_export
+            if getattr(pattern, '_export_module', None) in names
+        }),
+    ]
+
+    for module in to_reload:
+        importlib.reload(module)
+
+    for collection, key, previous in owned:
+        collection[:] = [item for item in collection if previous.get(key(item)) is not item]
+
+    clear_url_caches()
+    serializer_info_cache.clear()
+    return to_reload
+
+
+def restart():
+    os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+def watch(regenerate, interval=0.25, stdout=sys.stdout):
+    watcher = (InotifyWatcher if pyinotify is not None else PollingWatcher)(interval)
+    stdout.write('Watching for changes with %s.\n' % type(watcher).__name__)
+
+    while True:
+        modules = source_modules()
+        changed = watcher.wait(list(modules))
+        started = time.time()
+
+        try:
+            reloaded = reload_exports([modules[filename] for filename in changed], list(modules.values()))
+            regenerate()
+        except RestartRequired as e:
+            stdout.write('%s cannot be reloaded in place, restarting.\n' % e)
+            restart()
+        except Exception:
+            traceback.print_exc()
+            continue
+
+        stdout.write('Regenerated exports after reloading %s in %.0fms.\n' % (
+            ', '.join(module.__name__ for module in reloaded),
+            (time.time() - started) * 1000,
+        ))
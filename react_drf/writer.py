@@ -0,0 +1,68 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+
+def file_digest(filename):
+    hasher = hashlib.sha1()
+
+    try:
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(65536), b''):
+                hasher.update(block)
+    except (IOError, OSError):
+        return None
+    return hasher.hexdigest()
+
+
+def file_stat(filename):
+    """
+    The modification time and size of `filename`, or None if missing.
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def write_atomically(destination, chunks):
+    """
+    Writes `chunks` into a temporary file next to `destination` as they are
+    produced, then moves it into place so readers such as bundlers never see
+    a partially written file. The contents are never joined in memory, but
+    whatever the chunks are rendered from stays with the caller. Identical
+    contents leave the destination untouched. Returns whether the destination
+    changed.
+    """
+    directory, filename = os.path.split(destination)
+    hasher = hashlib.sha1()
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.%s.' % filename, suffix='.tmp')
+
+    try:
+        with io.open(descriptor, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                hasher.update(chunk.encode('utf-8'))
+
+        if file_digest(destination) == hasher.hexdigest():
+            os.remove(temporary)
+            return False
+
+        # mkstemp creates private files, keep the permissions a plain open()
+        # would have given instead.
+        if os.path.exists(destination):
+            shutil.copymode(destination, temporary)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temporary, 0o666 & ~umask)
+
+        os.replace(temporary, destination)
+        return True
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
@@ -10,5 +10,18 @@ def runtests():
     execute_from_command_line(argv)
 
 
+def runbenchmarks():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+    import django
+    django.setup()
+
+    from tests import benchmarks
+    benchmarks.main([arg for arg in sys.argv[1:] if arg != '--benchmark'])
+
+
 if __name__ == '__main__':
-    runtests()
+    if '--benchmark' in sys.argv:
+        runbenchmarks()
+    else:
+        runtests()
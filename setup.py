@@ -8,4 +8,7 @@ setup(name='react_drf',
       author_email='silviogutierrez@gmail.com',
       license='MIT',
       packages=['react_drf'],
+      extras_require={
+          'msgpack': ['msgpack>=0.5.2'],
+      },
       zip_safe=False)
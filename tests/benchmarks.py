@@ -0,0 +1,268 @@
+"""
+Benchmarks for the code generator on synthetic registries.
+
+Run with `python runtests.py --benchmark [--sizes 10,100,1000] [--output
+results.json]`. Results are written as JSON so they can be compared between
+releases. Warm runs, which change nothing, taking more than `--max-warm-ratio`
+of the time of cold ones fail the benchmark. With `--renderers`, JSON and MessagePack rendering and parsing of
+list payloads with `sizes` items are benchmarked instead.
+"""
+import argparse
+import collections
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+import django
+import rest_framework
+from django.conf.urls import include, url
+from django.db import models
+from django.test.utils import override_settings
+from rest_framework import generics, serializers
+
+from react_drf import generator
+from react_drf.generator import Denum, DenumMeta, export
+from react_drf.routes import clear_url_caches
+
+
+def build_registry(size):
+    """
+    Builds `size` exported models, serializers and list/detail/create views.
+    Every model has string and integer Denum choices, and nests a summary of
+    the previous one through a foreign key and a many to many relation.
+    """
+    prefix = 'Bench%s' % size
+    patterns = []
+    previous = None
+
+    for index in range(size):
+        name = '%sModel%s' % (prefix, index)
+
+        Status = DenumMeta('Status', (Denum,), collections.OrderedDict([
+            ('DRAFT', ('draft', 'Draft')),
+            ('PUBLISHED', ('published', 'Published')),
+            ('ARCHIVED', ('archived', 'Archived')),
+        ]))
+        Level = DenumMeta('Level', (Denum,), collections.OrderedDict([
+            ('LOW', (1, 'Low')),
+            ('HIGH', (2, 'High')),
+        ]))
+
+        attributes = {
+            '__module__': __name__,
+            'Meta': type('Meta', (), {'app_label': 'tests'}),
+            'Status': Status,
+            'Level': Level,
+            'title': models.CharField(max_length=200),
+            'description': models.TextField(blank=True),
+            'status': models.CharField(max_length=20, choices=Status),
+            'level': models.IntegerField(choices=Level),
+            'count': models.IntegerField(default=0),
+            'active': models.BooleanField(default=True),
+            'updated': models.DateTimeField(auto_now=True),
+        }
+        serializer_attributes = {'__module__': __name__}
+        fields = ['id', 'title', 'description', 'status', 'level', 'count', 'active', 'updated']
+
+        if previous is not None:
+            PreviousModel, PreviousSummarySerializer = previous
+            attributes['parent'] = models.ForeignKey(PreviousModel, null=True, related_name='+')
+            attributes['related'] = models.ManyToManyField(PreviousModel, related_name='+')
+            serializer_attributes['parent'] = PreviousSummarySerializer(read_only=True, allow_null=True)
+            serializer_attributes['related'] = PreviousSummarySerializer(read_only=True, many=True)
+            fields += ['parent', 'related']
+
+        Model = type(name, (models.Model,), attributes)
+        serializer_attributes['Meta'] = type('Meta', (), {'model': Model, 'fields': fields})
+        Serializer = export(type('%sSerializer' % name, (serializers.ModelSerializer,), serializer_attributes))
+        SummarySerializer = export(type('%sSummarySerializer' % name, (serializers.ModelSerializer,), {
+            '__module__': __name__,
+            'Meta': type('Meta', (), {'model': Model, 'fields': ['id', 'title', 'status']}),
+        }))
+
+        List = type('%sList' % name, (generics.ListCreateAPIView,), {
+            '__module__': __name__,
+            'serializer_class': Serializer,
+            'queryset': Model.objects.all(),
+        })
+        Detail = type('%sDetail' % name, (generics.RetrieveUpdateDestroyAPIView,), {
+            '__module__': __name__,
+            'serializer_class': Serializer,
+            'queryset': Model.objects.all(),
+        })
+        patterns += export(
+            url(r'^%s/$' % name.lower(), List.as_view(), name='%s-list' % name.lower()),
+            url(r'^%s/(?P<pk>\d+)/$' % name.lower(), Detail.as_view(), name='%s-detail' % name.lower()),
+        )
+        previous = (Model, SummarySerializer)
+
+    urlconf = types.ModuleType('tests.benchmark_urls_%s' % size)
+    urlconf.urlpatterns = [url(r'^api/', include(patterns))]
+    sys.modules[urlconf.__name__] = urlconf
+    return urlconf.__name__
+
+
+def measure(phase, size, function, output_size):
+    started = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - started
+
+    # Measured again separately, tracing allocations slows everything down.
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return collections.OrderedDict([
+        ('size', size),
+        ('phase', phase),
+        ('seconds', seconds),
+        ('peak_bytes', peak),
+        ('output_bytes', output_size(result)),
+    ])
+
+
+def benchmark(size):
+    serializers_to_export = list(generator.serializers_to_export)
+    patterns_to_export = list(generator.patterns_to_export)
+    base_directory = tempfile.mkdtemp()
+    os.mkdir(os.path.join(base_directory, 'client'))
+    destination = os.path.join(base_directory, 'client', 'exports.ts')
+    cache = os.path.join(base_directory, 'client', 'exports.cache.json')
+
+    def write_cold():
+        if os.path.exists(cache):
+            os.remove(cache)
+        shutil.rmtree(os.path.splitext(cache)[0], ignore_errors=True)
+        generator.writeExports()
+
+    def exports_size(result):
+        return os.path.getsize(destination)
+
+    def strings_size(result):
+        return sum(len(item.encode('utf-8')) for item in result)
+
+    def views_size(result):
+        return sum(len(view['definition'].encode('utf-8')) + len(view['reducer'].encode('utf-8')) for view in result)
+
+    try:
+        generator.serializers_to_export[:] = []
+        generator.patterns_to_export[:] = []
+        urlconf = build_registry(size)
+
+        with override_settings(ROOT_URLCONF=urlconf, BASE_DIR=base_directory):
+            clear_url_caches()
+
+            return [
+                measure('process_serializers', size, generator.process_serializers, strings_size),
+                measure('process_patterns', size, generator.process_patterns, views_size),
+                measure('write_exports_cold', size, write_cold, exports_size),
+                measure('write_exports_warm', size, generator.writeExports, exports_size),
+            ]
+    finally:
+        generator.serializers_to_export[:] = serializers_to_export
+        generator.patterns_to_export[:] = patterns_to_export
+        clear_url_caches()
+        shutil.rmtree(base_directory)
+
+
+def build_payload(size):
+    """
+    A list response of `size` items shaped like the output of the
+    serializers build_registry() exports: scalar fields, a nested summary
+    and three related ones.
+    """
+    def summary(index):
+        return collections.OrderedDict([('id', index), ('title', 'Summary %s' % index), ('status', 'published')])
+
+    return [collections.OrderedDict([
+        ('id', index),
+        ('title', 'Title %s' % index),
+        ('description', 'A description of the item. ' * 4),
+        ('status', 'draft'),
+        ('level', 1),
+        ('count', index * 7),
+        ('active', index % 2 == 0),
+        ('updated', '2016-06-01T12:00:00.000000Z'),
+        ('parent', summary(index - 1)),
+        ('related', [summary(index + offset) for offset in range(3)]),
+    ]) for index in range(size)]
+
+
+def benchmark_renderers(size):
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from react_drf.renderers import MessagePackParser, MessagePackRenderer, msgpack
+
+    payload = build_payload(size)
+    formats = [('json', JSONRenderer(), JSONParser())]
+
+    if msgpack is not None:
+        formats.append(('msgpack', MessagePackRenderer(), MessagePackParser()))
+    else:
+        sys.stderr.write('msgpack is not installed, only JSON is benchmarked.\n')
+
+    results = []
+
+    for name, renderer, parser in formats:
+        content = renderer.render(payload)
+        results.append(measure('render_%s' % name, size, lambda: renderer.render(payload), len))
+        results.append(measure('parse_%s' % name, size, lambda: parser.parse(io.BytesIO(content)),
+                               lambda result: len(content)))
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='runtests.py --benchmark')
+    parser.add_argument('--sizes', default='10,100,1000',
+                        help='Comma separated numbers of serializers to benchmark.')
+    parser.add_argument('--output', help='Write results to this file instead of stdout.')
+    parser.add_argument('--renderers', action='store_true',
+                        help='Benchmark renderers on list payloads instead of the generator.')
+    parser.add_argument('--max-warm-ratio', type=float, default=0.25,
+                        help='Fail when warm runs take more than this fraction of the time of cold ones.')
+    options = parser.parse_args(argv)
+
+    results = collections.OrderedDict([
+        ('python', platform.python_version()),
+        ('django', django.get_version()),
+        ('rest_framework', rest_framework.VERSION),
+        ('results', []),
+    ])
+
+    for size in [int(size) for size in options.sizes.split(',')]:
+        results['results'].extend(benchmark_renderers(size) if options.renderers else benchmark(size))
+
+    contents = json.dumps(results, indent=4)
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            f.write(contents + '\n')
+    else:
+        print(contents)
+
+    failures = slow_warm_runs(results['results'], options.max_warm_ratio)
+
+    if failures:
+        sys.exit('\n'.join(failures))
+
+
+def slow_warm_runs(results, max_ratio):
+    seconds = {(result['size'], result['phase']): result['seconds'] for result in results}
+    failures = []
+
+    for size, phase in seconds:
+        if phase == 'write_exports_warm':
+            ratio = seconds[size, phase] / seconds[size, 'write_exports_cold']
+
+            if ratio > max_ratio:
+                failures.append('Warm runs of %s serializers took %.2f of the time of cold ones, more than %.2f.' % (
+                    size, ratio, max_ratio))
+    return failures
@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+    mentor = models.ForeignKey('self', null=True, related_name='+')
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=100)
+
+
+class Article(models.Model):
+    title = models.CharField(max_length=100)
+    updated = models.DateTimeField(auto_now=True)
+    author = models.ForeignKey(Author, null=True, related_name='articles')
+    tags = models.ManyToManyField(Tag, related_name='articles')
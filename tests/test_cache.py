@@ -0,0 +1,265 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf.urls import url
+from django.core.validators import MaxValueValidator
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from rest_framework import generics, serializers
+from rest_framework.settings import api_settings
+
+from react_drf import generator, profiling
+from react_drf.cache import ExportCache
+
+from tests.models import Article, Author
+
+
+def build_serializer(max_length, max_pages=1000):
+    class BookSerializer(serializers.Serializer):
+        title = serializers.CharField(max_length=max_length)
+        pages = serializers.IntegerField(validators=[MaxValueValidator(max_pages)])
+
+    return BookSerializer
+
+
+class FingerprintTests(TestCase):
+    def setUp(self):
+        self.exported = list(generator.serializers_to_export)
+
+    def tearDown(self):
+        generator.serializers_to_export[:] = self.exported
+        generator.clear_fingerprints()
+
+    def test_fingerprint_is_stable(self):
+        Wrapped = generator.export(build_serializer(100))
+        fingerprint = generator.fingerprint_serializer(Wrapped)
+
+        generator.clear_fingerprints()
+        self.assertEqual(generator.fingerprint_serializer(Wrapped), fingerprint)
+        self.assertEqual(generator.serializer_key(Wrapped), 'tests.test_cache.BookSerializer')
+
+    def test_fingerprint_changes_with_fields(self):
+        first = generator.export(build_serializer(100))
+        second = generator.export(build_serializer(200))
+
+        self.assertEqual(generator.serializer_key(first), generator.serializer_key(second))
+        self.assertNotEqual(generator.fingerprint_serializer(first), generator.fingerprint_serializer(second))
+
+    def test_fingerprint_changes_with_validators(self):
+        first = generator.export(build_serializer(100, max_pages=1000))
+        second = generator.export(build_serializer(100, max_pages=2000))
+
+        self.assertNotEqual(generator.fingerprint_serializer(first), generator.fingerprint_serializer(second))
+
+
+class ShelfSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Author
+        fields = ['id', 'name']
+
+
+ShelfExport = generator.bind_export()(ShelfSerializer)
+
+
+class ShelvedArticleSerializer(serializers.ModelSerializer):
+    author = ShelfExport()
+
+    class Meta:
+        model = Article
+        fields = ['id', 'title', 'author']
+
+
+ShelvedArticleExport = generator.bind_export()(ShelvedArticleSerializer)
+
+
+class ShelfDetail(generics.RetrieveAPIView):
+    serializer_class = ShelfExport
+
+
+class ShelfList(generics.ListAPIView):
+    serializer_class = ShelfExport
+
+
+urlpatterns = [
+    url(r'^shelves/(?P<pk>\d+)/$', ShelfDetail.as_view(), name='shelf-detail'),
+    url(r'^shelves/$', ShelfList.as_view(), name='shelf-list'),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class WriteExportsCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'client'))
+        self.destination = os.path.join(self.directory, 'client', 'exports.ts')
+        self.exported = list(generator.serializers_to_export)
+        self.patterns = list(generator.patterns_to_export)
+        generator.serializers_to_export[:] = [ShelfExport]
+        generator.patterns_to_export[:] = urlpatterns
+        self.dependencies = dict(generator.registry.dependencies)
+
+        # REST framework caches settings as they are first read, as
+        # ModelSerializer does with this one.
+        vars(api_settings).pop('URL_FIELD_NAME', None)
+
+    def tearDown(self):
+        generator.serializers_to_export[:] = self.exported
+        generator.patterns_to_export[:] = self.patterns
+        generator.registry.dependencies = self.dependencies
+        generator.clear_fingerprints()
+        shutil.rmtree(self.directory)
+
+    def write(self, jobs=1):
+        with override_settings(BASE_DIR=self.directory), profiling.profiling() as profile:
+            generator.writeExports(jobs=jobs)
+        return profile.counts
+
+    def read(self):
+        with open(self.destination) as f:
+            return f.read()
+
+    def test_unchanged_run_rebuilds_nothing(self):
+        counts = self.write()
+        self.assertNotIn('cached patterns', counts)
+        self.assertEqual(counts['cached serializers'], 0)
+
+        # Far enough in the past that a rewrite could not keep it.
+        os.utime(self.destination, (0, 0))
+        counts = self.write()
+
+        self.assertEqual(counts['cached patterns'], 2)
+        self.assertEqual(counts['cached serializers'], 1)
+        self.assertNotIn('views', counts)
+        self.assertNotIn('fields', counts)
+        self.assertEqual(os.path.getmtime(self.destination), 0)
+
+    def test_unchanged_run_writes_nothing(self):
+        self.write()
+        path = os.path.join(self.directory, 'client', 'exports.cache.json')
+        os.utime(path, (0, 0))
+
+        with mock.patch.object(generator, 'render_exports') as render_exports:
+            counts = self.write()
+
+        self.assertEqual(counts['cached serializers'], 1)
+        self.assertFalse(render_exports.called)
+        self.assertEqual(os.path.getmtime(path), 0)
+
+        # Files changed since are written again.
+        with open(self.destination, 'a') as f:
+            f.write('// Edited\n')
+
+        self.write()
+        self.assertNotIn('// Edited', self.read())
+
+    def test_view_changes_rebuild_only_that_view(self):
+        self.write()
+
+        ShelfList.coalesce_requests = False
+        try:
+            counts = self.write()
+        finally:
+            del ShelfList.coalesce_requests
+
+        self.assertEqual(counts['cached patterns'], 1)
+        self.assertEqual(counts['cached serializers'], 1)
+
+    def test_changes_rebuild_nesting_serializers(self):
+        generator.serializers_to_export[:] = [ShelvedArticleExport, ShelfExport]
+        self.write()
+
+        path = os.path.join(self.directory, 'client', 'exports.cache.json')
+
+        with open(path) as f:
+            stored = json.load(f)
+
+        # As if the nested serializer changed in a way its nesting one's
+        # fingerprint cannot see.
+        stored['entries']['serializer:%s' % generator.serializer_key(ShelfExport)]['fingerprint'] = 'changed'
+
+        with open(path, 'w') as f:
+            json.dump(stored, f)
+
+        self.assertEqual(self.write()['cached serializers'], 0)
+        self.assertEqual(self.write()['cached serializers'], 2)
+
+    def test_jobs_write_the_same_exports(self):
+        generator.serializers_to_export[:] = [ShelvedArticleExport, ShelfExport]
+        self.write(jobs=1)
+        serial = self.read()
+
+        shutil.rmtree(os.path.join(self.directory, 'client'))
+        os.mkdir(os.path.join(self.directory, 'client'))
+        counts = self.write(jobs=2)
+
+        self.assertEqual(counts['cached serializers'], 0)
+        self.assertEqual(self.read(), serial)
+        self.assertIn('author: Shelf;', serial)
+
+        # Forking workers must leave the test database usable.
+        Author.objects.create(name='Author')
+        self.assertEqual(Author.objects.count(), 1)
+
+
+class ExportCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'exports.cache.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_only_changed_entries_are_rebuilt(self):
+        built = []
+
+        def build(value):
+            def _build():
+                built.append(value)
+                return [value]
+            return _build
+
+        cache = ExportCache.load(self.path)
+        cache.get_or_build('a', '1', build('a'))
+        cache.get_or_build('b', '1', build('b'))
+        cache.save()
+
+        cache = ExportCache.load(self.path)
+        self.assertEqual(cache.get_or_build('a', '1', build('a')), ['a'])
+        self.assertEqual(cache.get_or_build('b', '2', build('b2')), ['b2'])
+        self.assertEqual(built, ['a', 'b', 'b2'])
+
+    def test_unused_entries_are_dropped(self):
+        cache = ExportCache.load(self.path)
+        cache.get_or_build('a', '1', lambda: ['a'])
+        cache.get_or_build('b', '1', lambda: ['b'])
+        cache.save()
+
+        cache = ExportCache.load(self.path)
+        cache.get_or_build('a', '1', lambda: ['a'])
+        cache.save()
+
+        self.assertEqual(list(ExportCache.load(self.path).entries), ['a'])
+
+    def test_values_are_stored_apart_and_read_when_used(self):
+        cache = ExportCache.load(self.path)
+        cache.get_or_build('a', '1', lambda: ['a'])
+        cache.get_or_build('b', '1', lambda: ['b'])
+        cache.save()
+
+        cache = ExportCache.load(self.path)
+        self.assertTrue(cache.is_fresh('a', '1'))
+        cache.use('a')
+        cache.store('b', '2', ['b2'])
+
+        self.assertEqual(cache.used, {'a': {'fingerprint': '1'}, 'b': {'fingerprint': '2'}})
+        self.assertEqual((list(cache.stored('a')), list(cache.stored('b'))), (['a'], ['b2']))
+
+        cache.save()
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, 'exports.cache'))), 2)
+
+        shutil.rmtree(os.path.join(self.directory, 'exports.cache'))
+        self.assertFalse(ExportCache.load(self.path).is_fresh('a', '1'))
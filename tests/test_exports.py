@@ -0,0 +1,428 @@
+import os
+import shutil
+import tempfile
+
+from django.conf.urls import url
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from rest_framework import generics, pagination, renderers, serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.metadata import SimpleMetadata
+
+from react_drf import generator
+from react_drf.renderers import ColumnarJSONRenderer, MessagePackRenderer
+from react_drf.views import ConditionalGetMixin, DeltaSyncMixin
+from react_drf.writer import write_atomically
+
+
+class BookSerializer(serializers.Serializer):
+    title = serializers.CharField()
+
+
+class BookDetail(generics.RetrieveAPIView):
+    serializer_class = generator.export(BookSerializer)
+
+
+class PlainBookDetail(BookDetail):
+    coalesce_requests = False
+
+
+class ConditionalBookDetail(ConditionalGetMixin, BookDetail):
+    pass
+
+
+class BookPagination(pagination.CursorPagination):
+    page_size = 20
+    ordering = 'title'
+
+
+class BookList(generics.ListAPIView):
+    serializer_class = generator.export(BookSerializer)
+    pagination_class = BookPagination
+
+
+class ColumnarBookList(generics.ListAPIView):
+    serializer_class = generator.export(BookSerializer)
+    renderer_classes = [renderers.JSONRenderer, ColumnarJSONRenderer]
+
+
+class MessagePackBookDetail(BookDetail):
+    renderer_classes = [renderers.JSONRenderer, MessagePackRenderer, ColumnarJSONRenderer]
+
+
+class SyncedBookList(DeltaSyncMixin, generics.ListAPIView):
+    serializer_class = generator.export(BookSerializer)
+
+
+class WritableBookList(generics.ListCreateAPIView):
+    serializer_class = generator.export(BookSerializer)
+
+
+class ReviewSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(max_length=20)
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+    verdict = serializers.ChoiceField(choices=['good', 'bad'], required=False)
+    note = serializers.CharField(allow_null=True, allow_blank=True, required=False)
+    stars = serializers.ChoiceField(choices=[1, 2, 3], allow_blank=True, required=False)
+    labels = serializers.MultipleChoiceField(choices=['new', 'used'], required=False)
+    summary = serializers.CharField(min_length=3, required=False)
+    code = serializers.CharField(max_length=4, trim_whitespace=False, required=False)
+    published = serializers.ChoiceField(choices=[True, False], required=False)
+
+
+urlpatterns = [
+    url(r'^books/(?P<pk>\d+)/$', BookDetail.as_view(), name='book-detail'),
+    url(r'^plain-books/(?P<pk>\d+)/$', PlainBookDetail.as_view(), name='plain-book-detail'),
+    url(r'^conditional-books/(?P<pk>\d+)/$', ConditionalBookDetail.as_view(), name='conditional-book-detail'),
+    url(r'^books/$', BookList.as_view(), name='book-list'),
+    url(r'^columnar-books/$', ColumnarBookList.as_view(), name='columnar-book-list'),
+    url(r'^msgpack-books/(?P<pk>\d+)/$', MessagePackBookDetail.as_view(), name='msgpack-book-detail'),
+    url(r'^synced-books/$', SyncedBookList.as_view(), name='synced-book-list'),
+    url(r'^writable-books/$', WritableBookList.as_view(), name='writable-book-list'),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class ThunkTests(TestCase):
+    def test_fetches_are_coalesced(self):
+        view, = generator.process_pattern([], urlpatterns[0])
+
+        self.assertIn("return (dispatch: Dispatch) => coalesce('GET', `/books/${pk}/`, () => {", view['definition'])
+        self.assertEqual(view['runtime'], ['coalesce', 'withFields'])
+
+    def test_fetches_take_a_subset_of_fields(self):
+        view, = generator.process_pattern([], urlpatterns[0])
+
+        self.assertIn(
+            'export const fetchBookFields = <K extends keyof Book>(pk: string|number, fields: K[]) => {',
+            view['definition'],
+        )
+        self.assertIn('const url = withFields(`/books/${pk}/`, fields);', view['definition'])
+        self.assertIn(
+            "return () => coalesce('GET', url, () => api.get<Pick<Book, K>>(url).then(response => response.data));",
+            view['definition'],
+        )
+
+    def test_views_can_opt_out_of_coalescing(self):
+        view, = generator.process_pattern([], urlpatterns[1])
+
+        self.assertIn('return (dispatch: Dispatch) => {', view['definition'])
+        self.assertNotIn('coalesce', view['definition'])
+        self.assertEqual(view['runtime'], ['withFields'])
+
+    def test_conditional_views_skip_success_when_not_modified(self):
+        view, = generator.process_pattern([], urlpatterns[2])
+
+        self.assertIn('return conditionalGet<Book>(`/conditional-books/${pk}/`)', view['definition'])
+        self.assertIn('if (response.modified) {', view['definition'])
+        self.assertEqual(view['runtime'], ['coalesce', 'conditionalGet', 'withFields'])
+
+    def test_fetches_are_batched_with_a_batch_view(self):
+        with override_settings(REACT_DRF={'BATCH_URL_NAME': 'book-list'}):
+            view, = generator.process_pattern([], urlpatterns[0])
+            runtime = ''.join(generator.render_runtime())
+
+        self.assertIn('return batchGet<Book>(`/books/${pk}/`)', view['definition'])
+        self.assertEqual(view['runtime'], ['coalesce', 'batchGet', 'withFields'])
+        self.assertIn('const BATCH_URL: string|null = "/books/";', runtime)
+        self.assertIn('const BATCH_URL: string|null = null;', ''.join(generator.render_runtime()))
+
+    def test_paginated_lists_append_pages(self):
+        view, = generator.process_pattern([], urlpatterns[3])
+
+        self.assertIn("export const fetchBooks = () => fetchBooksPage(`/books/`, false);", view['definition'])
+        self.assertIn('export const fetchMoreBooks = (next: string) => fetchBooksPage(next, true);', view['definition'])
+        self.assertIn('return api.get<Page<Book>>(url)', view['definition'])
+        self.assertIn('const bookList = action.append ? state.bookList.concat(page) : page;', view['reducer'])
+        self.assertIn('bookListHasMore: false', view['schema'])
+        self.assertEqual(view['runtime'], ['coalesce', 'withFields', 'Page'])
+
+    def test_lists_without_page_size_are_not_paginated(self):
+        self.assertFalse(generator.is_paginated(generics.ListAPIView))
+        self.assertTrue(generator.is_paginated(BookList))
+
+    def test_view_lists_are_read_again_per_model(self):
+        reads = []
+
+        class Source(object):
+            def __init__(self, views):
+                self.views = views
+
+            def __iter__(self):
+                reads.append(self)
+                return iter(self.views)
+
+        books, authors = Source([{'model': 'Book'}, {'model': 'Book'}]), Source([{'model': 'Author'}])
+        views = generator.ViewList([books, authors])
+        by_model = views.by_model()
+        del reads[:]
+
+        self.assertEqual(list(by_model), ['Book', 'Author'])
+        self.assertEqual(len(list(by_model['Book'])), 2)
+        self.assertEqual(reads, [books])
+        self.assertEqual(len(list(views)), 3)
+
+    def test_columnar_lists_are_decoded(self):
+        view, = generator.process_pattern([], urlpatterns[4])
+        decoder, = generator.model_definitions([
+            (BookList.serializer_class, {'definitions': [], 'dependencies': [], 'columns': ['id', 'title']}),
+        ], generator.columnar_models([view]))
+
+        self.assertIn('return batchGet<Book[]>(`/columnar-books/`, null, bookRows).then(response => {', view['definition'])
+        self.assertEqual(view['runtime'], ['coalesce', 'withFields', 'batchGet', 'columnarFormat', 'decodeColumns'])
+        self.assertIn('const bookColumns = "id,title";', decoder)
+        self.assertIn('return data.rows.map(row => ({"id": row[0], "title": row[1]}) as Book);', decoder)
+
+        columns = []
+        generator.process_serializer([], ColumnarBookList.serializer_class, None, columns)
+        self.assertEqual(columns, ['title'])
+
+    def test_message_pack_is_requested_and_decoded(self):
+        view, = generator.process_pattern([], urlpatterns[5])
+
+        self.assertEqual(generator.response_format(MessagePackBookDetail), 'msgpack')
+        self.assertIn('return batchGet<Book>(`/msgpack-books/${pk}/`, null, messagePackFormat).then(', view['definition'])
+        self.assertIn('batchGet<Pick<Book, K>>(url, null, messagePackFormat)', view['definition'])
+        self.assertEqual(view['runtime'], ['coalesce', 'withFields', 'batchGet', 'messagePackFormat'])
+        self.assertIn('export const decodeMessagePack', ''.join(generator.render_runtime([view])))
+        self.assertNotIn('decodeMessagePack', ''.join(generator.render_runtime()))
+
+    def test_synced_lists_merge_deltas(self):
+        view, sync = generator.process_pattern([], urlpatterns[6])
+
+        self.assertIn('export const syncSyncedBooks = (watermark: string|null) => {', sync['definition'])
+        self.assertIn('const url = withSince(`/synced-books/`, watermark);', sync['definition'])
+        self.assertIn("return (dispatch: Dispatch) => coalesce('GET', url, () => {", sync['definition'])
+        self.assertIn("case 'SYNC_SYNCED_BOOKS_SUCCESS': {", sync['reducer'])
+        self.assertIn('delete booksById[key];', sync['reducer'])
+        self.assertIn('syncedBooksWatermark: null as string|null', sync['schema'])
+        self.assertIn('let bookList = action.full && !action.append ? [] : state.bookList;', sync['reducer'])
+        self.assertIn('const syncedBooksWatermark = action.next === null ? action.watermark : state.syncedBooksWatermark;', sync['reducer'])
+        self.assertIn('return response.data.next === null ? response.data : syncPage(response.data.next, true);', sync['definition'])
+        self.assertEqual(sync['runtime'], ['coalesce', 'withFields', 'withSince', 'Delta'])
+
+        with override_settings(REACT_DRF={'ENTITY_STORE': True}):
+            view, sync = generator.process_pattern([], urlpatterns[6])
+
+        self.assertIn('const entities = removeEntities(mergeEntities(', sync['reducer'])
+        self.assertIn('removeEntities', sync['runtime'])
+
+    def test_selectors_are_memoized_per_model(self):
+        views = generator.process_pattern([], urlpatterns[0]) + generator.process_pattern([], urlpatterns[3])
+        selector, = generator.model_selectors(views, {'Book': ['reading_status']})
+
+        self.assertIn('export const selectBookById = (state: BookState, key: number): Book|undefined => state.booksById[key];', selector['definition'])
+        self.assertIn('export const selectBooks = listSelector(', selector['definition'])
+        self.assertIn(
+            "export const selectBooksByReadingStatus = keyedSelector((value: Book['reading_status']) => filteredSelector(",
+            selector['definition'],
+        )
+        self.assertEqual(selector['runtime'], ['listSelector', 'filteredSelector', 'keyedSelector'])
+
+        with override_settings(REACT_DRF={'ENTITY_STORE': True}):
+            selector, = generator.model_selectors(views)
+
+        self.assertIn('getEntity(state.book.entities, key)', selector['definition'])
+        self.assertNotIn('ByReadingStatus', selector['definition'])
+        self.assertEqual(selector['runtime'], ['getEntity', 'getEntities', 'listSelector'])
+
+        exports = ''.join(generator.render_exports(views, [], selectors=[selector]))
+        self.assertLess(exports.index('export const selectBooks'), exports.index('export const fetchBook'))
+        self.assertIn('export const keyedSelector', ''.join(generator.render_runtime()))
+
+    def test_writes_are_validated_before_sending(self):
+        create, fetch = generator.process_pattern([], urlpatterns[7])
+
+        self.assertIn('const errors = Book.validate(item);', create['definition'])
+        self.assertIn("type: 'CREATE_WRITABLE_BOOK_ERROR',", create['definition'])
+        self.assertIn('return Promise.reject({response: {status: 400, data: errors}});', create['definition'])
+        self.assertLess(create['definition'].index('validate'), create['definition'].index('api.post'))
+
+    def test_validators_are_compiled_from_metadata(self):
+        serializer = ReviewSerializer()
+        validator = generator.compile_validator('Review', serializer, SimpleMetadata().get_serializer_info(serializer))
+
+        self.assertIn('export const validate = (item: Partial<Review>): {[field: string]: string[]}|null => {', validator)
+        self.assertIn(
+            'const validChoices: {[field: string]: Set<string>} = {'
+            '"verdict": new Set<string>(["good", "bad"]), '
+            '"stars": new Set<string>(["1", "2", "3"]), '
+            '"labels": new Set<string>(["new", "used"]), '
+            '"published": new Set<string>(["True", "False"])};',
+            validator,
+        )
+        self.assertIn(
+            "} else if (typeof value === 'string' && value.trim().length > 20) {\n"
+            '                errors["title"] = ["Ensure this field has no more than 20 characters."];',
+            validator,
+        )
+        self.assertIn(
+            "} else if (value !== undefined && value !== null && value !== '' && Number(value) < 1) {\n"
+            '                errors["rating"] = ["Ensure this value is greater than or equal to 1."];',
+            validator,
+        )
+        self.assertIn(
+            'if (value !== undefined && value !== null && !validChoices["verdict"].has(choiceKey(value))) {\n'
+            '                errors["verdict"] = ["\\"" + value + "\\" is not a valid choice."];',
+            validator,
+        )
+
+    def test_choices_are_matched_as_the_serializer_does(self):
+        serializer = ReviewSerializer()
+        validator = generator.compile_validator('Review', serializer, SimpleMetadata().get_serializer_info(serializer))
+
+        # Numbers and their strings are both valid, as is blank when allowed.
+        self.assertIn(
+            "if (value !== undefined && value !== null && value !== '' && !validChoices[\"stars\"].has(choiceKey(value))) {",
+            validator,
+        )
+        self.assertEqual(serializer.fields['stars'].run_validation('2'), 2)
+        self.assertEqual(serializer.fields['stars'].run_validation(''), '')
+
+        # Lists are checked item by item.
+        self.assertIn(
+            'if (Array.isArray(value) && value.some(item => !validChoices["labels"].has(choiceKey(item)))) {\n'
+            '                errors["labels"] = ["\\"" + value.find(item => !validChoices["labels"].has(choiceKey(item))) + "\\" is not a valid choice."];',
+            validator,
+        )
+        self.assertEqual(serializer.fields['labels'].run_validation(['new']), {'new'})
+        self.assertNotIn('data["id"]', validator)
+        self.assertNotIn('errors["verdict"] = ["This field is required."]', validator)
+        self.assertNotIn('errors["note"]', validator)
+
+        # Booleans are keyed as str() spells them.
+        self.assertIn("const choiceKey = (value: any): string => typeof value === 'boolean' ? (value ? 'True' : 'False') : String(value);", validator)
+        self.assertIn('!validChoices["published"].has(choiceKey(value))', validator)
+        self.assertIs(serializer.fields['published'].run_validation(True), True)
+
+    def test_lengths_are_checked_as_the_serializer_does(self):
+        serializer = ReviewSerializer()
+        validator = generator.compile_validator('Review', serializer, SimpleMetadata().get_serializer_info(serializer))
+
+        # Whitespace is trimmed before checking lengths and blanks.
+        self.assertIn(
+            "if (typeof value === 'string' && value.trim() === '') {\n"
+            '                errors["summary"] = ["This field may not be blank."];\n'
+            "            } else if (typeof value === 'string' && value.trim() !== '' && value.trim().length < 3) {",
+            validator,
+        )
+        self.assertEqual(serializer.fields['summary'].run_validation('  abc  '), 'abc')
+        self.assertEqual(serializer.fields['title'].run_validation(' %s ' % ('a' * 20)), 'a' * 20)
+
+        with self.assertRaises(ValidationError):
+            serializer.fields['summary'].run_validation('   ')
+
+        # Unless the field keeps it.
+        self.assertIn("} else if (typeof value === 'string' && value.length > 4) {", validator)
+
+        with self.assertRaises(ValidationError):
+            serializer.fields['code'].run_validation(' abc ')
+
+
+class SplitExportsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_index_combines_modules_with_views(self):
+        index = ''.join(generator.render_index([
+            {'name': 'Author', 'camel_case_name': 'author', 'filename': 'author', 'views': []},
+            {'name': 'BookShelf', 'camel_case_name': 'bookShelf', 'filename': 'book_shelf', 'views': [{}]},
+        ]))
+
+        self.assertIn("export * from './author'\n", index)
+        self.assertIn("export * from './book_shelf'\n", index)
+        self.assertIn('export type Actions = bookShelfModule.BookShelfActions;', index)
+        self.assertIn('state = bookShelfModule.bookShelfReducer(state, action);', index)
+        self.assertNotIn('authorModule.authorReducer', index)
+
+    def test_entity_store_splits_state_per_model(self):
+        view = {
+            'model': 'BookShelf',
+            'schema': ['entities: emptyTable<BookShelf>()', 'list: [] as number[]'],
+            'reducer': "case 'FETCH_BOOK_SHELVES_SUCCESS': {}",
+            'definition': '',
+            'actions': ["{type: 'FETCH_BOOK_SHELVES_SUCCESS'}"],
+        }
+
+        with override_settings(REACT_DRF={'ENTITY_STORE': True}):
+            exports = ''.join(generator.render_exports([view, dict(view, reducer='')], [], ''.join(generator.render_runtime())))
+
+        self.assertIn('export const mergeEntities', exports)
+        self.assertEqual(exports.count('entities: emptyTable<BookShelf>()'), 1)
+        self.assertIn('export const bookShelfSliceReducer', exports)
+        self.assertIn('bookShelf: bookShelfSlice', exports)
+        self.assertIn('const bookShelf = bookShelfSliceReducer(state.bookShelf, action);', exports)
+        self.assertNotIn('ById', exports)
+
+    def test_writes_and_removes_only_generated_modules(self):
+        exported = list(generator.serializers_to_export)
+        patterns = list(generator.patterns_to_export)
+        client = os.path.join(self.directory, 'client')
+        directory = os.path.join(client, 'exports')
+        os.makedirs(directory)
+
+        for filename, contents in [('custom.ts', 'export {}\n'), ('stale.ts', generator.GENERATED_HEADER)]:
+            with open(os.path.join(directory, filename), 'w') as f:
+                f.write(contents)
+
+        try:
+            generator.serializers_to_export[:] = [BookDetail.serializer_class]
+            generator.patterns_to_export[:] = [urlpatterns[0], urlpatterns[3]]
+
+            with override_settings(ROOT_URLCONF=__name__, BASE_DIR=self.directory):
+                generator.writeExports(split=True)
+                self.assertEqual(sorted(os.listdir(directory)), ['_runtime.ts', 'book.ts', 'custom.ts', 'index.ts'])
+
+                with open(os.path.join(directory, 'book.ts')) as f:
+                    book = f.read()
+                with open(os.path.join(directory, 'index.ts')) as f:
+                    index = f.read()
+
+                self.assertTrue(book.startswith(generator.GENERATED_HEADER))
+                self.assertIn('export const fetchBook = (pk: string|number) => {', book)
+                self.assertIn('export const fetchMoreBooks = (next: string) => fetchBooksPage(next, true);', book)
+                self.assertIn("export * from './book'\n", index)
+                self.assertIn('state = bookModule.bookReducer(state, action);', index)
+
+                generator.writeExports(split=False)
+                self.assertEqual(os.listdir(directory), ['custom.ts'])
+                self.assertTrue(generator.is_generated(os.path.join(client, 'exports.ts')))
+
+                os.remove(os.path.join(directory, 'custom.ts'))
+                generator.writeExports(split=True)
+                self.assertFalse(os.path.exists(os.path.join(client, 'exports.ts')))
+        finally:
+            generator.serializers_to_export[:] = exported
+            generator.patterns_to_export[:] = patterns
+            generator.clear_fingerprints()
+
+    def test_write_atomically(self):
+        destination = os.path.join(self.directory, 'index.ts')
+
+        self.assertTrue(write_atomically(destination, (chunk for chunk in ['export ', '{}'])))
+        self.assertFalse(write_atomically(destination, ['export {}']))
+        self.assertTrue(write_atomically(destination, ['export {};']))
+
+        with open(destination) as f:
+            self.assertEqual(f.read(), 'export {};')
+        self.assertEqual(os.listdir(self.directory), ['index.ts'])
+
+    def test_write_atomically_keeps_destination_on_error(self):
+        destination = os.path.join(self.directory, 'index.ts')
+        write_atomically(destination, ['export {}'])
+
+        def chunks():
+            yield 'export '
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            write_atomically(destination, chunks())
+
+        with open(destination) as f:
+            self.assertEqual(f.read(), 'export {}')
+        self.assertEqual(os.listdir(self.directory), ['index.ts'])
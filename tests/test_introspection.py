@@ -0,0 +1,54 @@
+from django.test import TestCase, override_settings
+
+from rest_framework import serializers
+
+from react_drf import generator
+from react_drf.introspection import clear_contexts, default_context, introspection_context
+
+
+class Profile(object):
+    nickname = 'Nick'
+
+
+def profile_context():
+    context = default_context()
+    context['request'].user.profile = Profile()
+    return context
+
+
+class ProfileSerializer(serializers.Serializer):
+    def get_fields(self):
+        fields = super(ProfileSerializer, self).get_fields()
+        fields[self.context['request'].user.profile.nickname.lower()] = serializers.CharField()
+        return fields
+
+
+class IntrospectionContextTests(TestCase):
+    def setUp(self):
+        self.exported = list(generator.serializers_to_export)
+        clear_contexts()
+
+    def tearDown(self):
+        generator.serializers_to_export[:] = self.exported
+        clear_contexts()
+
+    def test_context_is_built_once_per_run(self):
+        first, second = introspection_context(), introspection_context()
+
+        self.assertIsNot(first, second)
+        self.assertIs(first['request'], second['request'])
+
+        clear_contexts()
+        self.assertIsNot(introspection_context()['request'], first['request'])
+
+    @override_settings(REACT_DRF={'INTROSPECTION_CONTEXT': 'tests.test_introspection.profile_context'})
+    def test_context_from_settings(self):
+        definitions = generator.process_serializer([], generator.export(ProfileSerializer))
+
+        self.assertIn('nick: string;', ''.join(definitions))
+
+    def test_context_per_serializer(self):
+        Wrapped = generator.export(context=profile_context)(ProfileSerializer)
+
+        self.assertIsInstance(introspection_context(Wrapped)['request'].user.profile, Profile)
+        self.assertFalse(hasattr(introspection_context()['request'].user, 'profile'))
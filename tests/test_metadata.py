@@ -0,0 +1,52 @@
+from django.test import TestCase, override_settings
+
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+
+from react_drf.metadata import ExportedMetadata, serializer_info_cache
+
+
+class BookSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=100)
+
+
+class PersonalBookSerializer(BookSerializer):
+    metadata_per_user = True
+
+
+class User(object):
+    def __init__(self, pk):
+        self.pk = pk
+
+
+class ExportedMetadataTests(TestCase):
+    def setUp(self):
+        serializer_info_cache.clear()
+
+    def serializer(self, SerializerClass, user):
+        request = APIRequestFactory().options('/')
+        request.user = user
+        return SerializerClass(context={'request': request})
+
+    def test_info_is_computed_once_per_class(self):
+        metadata = ExportedMetadata()
+        info = metadata.get_serializer_info(self.serializer(BookSerializer, User(1)))
+
+        self.assertEqual(info['title']['max_length'], 100)
+        self.assertIs(metadata.get_serializer_info(self.serializer(BookSerializer, User(2))), info)
+        self.assertIs(metadata.get_serializer_info(BookSerializer(many=True)), info)
+
+    def test_info_is_cached_per_user(self):
+        metadata = ExportedMetadata()
+        first = metadata.get_serializer_info(self.serializer(PersonalBookSerializer, User(1)))
+
+        self.assertIs(metadata.get_serializer_info(self.serializer(PersonalBookSerializer, User(1))), first)
+        self.assertIsNot(metadata.get_serializer_info(self.serializer(PersonalBookSerializer, User(2))), first)
+
+    @override_settings(REACT_DRF={'METADATA_CACHE_SIZE': 1})
+    def test_cache_is_bounded(self):
+        metadata = ExportedMetadata()
+        metadata.get_serializer_info(self.serializer(BookSerializer, User(1)))
+        metadata.get_serializer_info(self.serializer(PersonalBookSerializer, User(1)))
+
+        self.assertEqual(list(serializer_info_cache.entries), [(PersonalBookSerializer, 1)])
@@ -0,0 +1,32 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from react_drf.models import Tombstone
+
+from tests.models import Article
+
+
+class TombstoneTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+
+        for object_id, days in [('1', 1), ('2', 10), ('3', 100)]:
+            Tombstone.objects.create(model_label='tests.article', object_id=object_id, deleted=now - datetime.timedelta(days=days))
+
+    def test_deleted_since(self):
+        since = timezone.now() - datetime.timedelta(days=5)
+        self.assertEqual(Tombstone.objects.deleted_since(Article, since), [1])
+
+    @override_settings(REACT_DRF={'TOMBSTONE_RETENTION': datetime.timedelta(days=20)})
+    def test_prune_keeps_retention(self):
+        stdout = io.StringIO()
+        call_command('prune_tombstones', stdout=stdout)
+
+        self.assertEqual(stdout.getvalue(), 'Pruned 1 tombstones.\n')
+        self.assertEqual(sorted(Tombstone.objects.values_list('object_id', flat=True)), ['1', '2'])
+        self.assertEqual(Tombstone.objects.prune(), 0)
@@ -0,0 +1,47 @@
+from django.test import TestCase
+
+from rest_framework import serializers
+
+from react_drf import generator, profiling
+
+
+class BookSerializer(serializers.Serializer):
+    title = serializers.CharField()
+    pages = serializers.IntegerField()
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.exported = list(generator.serializers_to_export)
+        generator.serializers_to_export[:] = [generator.export(BookSerializer)]
+
+    def tearDown(self):
+        generator.serializers_to_export[:] = self.exported
+        generator.clear_fingerprints()
+
+    def test_inactive_records_nothing(self):
+        generator.process_serializers()
+        self.assertIsNone(profiling.active)
+
+    def test_records_phases_entries_and_counts(self):
+        with profiling.profiling() as profile:
+            generator.process_serializers()
+
+        self.assertEqual(profile.counts['fields'], 2)
+        self.assertEqual(len(profile.entries), 1)
+        self.assertEqual(profile.entries[0]['key'], 'tests.test_profiling.BookSerializer')
+        self.assertEqual(profile.entries[0]['fields'], 2)
+        self.assertIn('serializers.metadata', profile.phases)
+        self.assertIn('tests.test_profiling.BookSerializer (2 fields)', profile.report())
+
+    def test_merge_adds_up(self):
+        profile = profiling.Profile()
+        other = profiling.Profile()
+        other.add_phase('write', 1.5)
+        other.add_count('fields', 3)
+
+        profile.merge(other.state())
+        profile.merge(other.state())
+
+        self.assertEqual(profile.phases['write'], 3)
+        self.assertEqual(profile.counts['fields'], 6)
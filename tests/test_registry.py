@@ -0,0 +1,92 @@
+from django.conf.urls import url
+from django.test import TestCase
+
+from rest_framework import generics, serializers
+
+from react_drf import generator
+from react_drf.registry import ExportRegistry, serializer_key
+
+from tests.models import Article, Author
+
+
+class MentorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Author
+        fields = ['id', 'name']
+
+
+class ArticleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Article
+        fields = ['id', 'title']
+
+
+class RegistryTests(TestCase):
+    def setUp(self):
+        self.registry = ExportRegistry()
+        self.exported = list(generator.serializers_to_export)
+        self.dependencies = dict(generator.registry.dependencies)
+
+    def tearDown(self):
+        generator.serializers_to_export[:] = self.exported
+        generator.registry.dependencies = self.dependencies
+
+    def export(self, SourceSerializer):
+        return self.registry.serializers.add(generator.bind_export()(SourceSerializer))
+
+    def test_reregistering_replaces_in_place(self):
+        first = self.export(MentorSerializer)
+        self.export(ArticleSerializer)
+        second = self.export(MentorSerializer)
+
+        self.assertEqual(list(self.registry.serializers), [second, self.registry.serializers[1]])
+        self.assertNotIn(first, self.registry.serializers)
+
+        self.registry.serializers[:] = [second, second]
+        self.assertEqual(len(self.registry.serializers), 1)
+
+    def test_indexes(self):
+        Mentor = self.export(MentorSerializer)
+        ArticleExport = self.export(ArticleSerializer)
+
+        class ArticleList(generics.ListAPIView):
+            serializer_class = ArticleExport
+
+        pattern = self.registry.patterns.add(url(r'^articles/$', ArticleList.as_view()))
+
+        self.assertEqual(self.registry.serializers_for_model(Author), [Mentor])
+        self.assertEqual(self.registry.patterns_for_serializer(ArticleExport), [pattern])
+        self.assertEqual(self.registry.patterns_for_serializer(Mentor), [])
+
+        self.registry.serializers[:] = [ArticleExport]
+        self.assertEqual(self.registry.serializers_for_model(Author), [])
+
+    def test_dependency_graph(self):
+        Mentor = generator.export(MentorSerializer)
+
+        class AuthorSerializer(serializers.ModelSerializer):
+            mentor = Mentor()
+
+            class Meta:
+                model = Author
+                fields = ['id', 'mentor']
+
+        AuthorExport = generator.export(AuthorSerializer)
+
+        class NestedArticleSerializer(serializers.ModelSerializer):
+            author = AuthorExport()
+
+            class Meta:
+                model = Article
+                fields = ['id', 'author']
+
+        ArticleExport = generator.export(NestedArticleSerializer)
+        generator.serializers_to_export[:] = [ArticleExport, AuthorExport, Mentor]
+
+        entries = generator.serializer_entries()
+
+        self.assertEqual([SourceSerializer for SourceSerializer, entry in entries], [Mentor, AuthorExport, ArticleExport])
+        self.assertEqual(generator.registry.dependents([serializer_key(Mentor)]), {
+            serializer_key(Mentor), serializer_key(AuthorExport), serializer_key(ArticleExport),
+        })
+        self.assertEqual(generator.registry.dependents([serializer_key(ArticleExport)]), {serializer_key(ArticleExport)})
@@ -0,0 +1,137 @@
+import datetime
+import io
+import unittest
+from unittest import mock
+
+from django.conf.urls import url
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from rest_framework import generics, pagination, renderers, serializers
+from rest_framework.test import APIRequestFactory
+
+from react_drf import generator
+from react_drf.renderers import ColumnarJSONRenderer, MessagePackParser, MessagePackRenderer, msgpack
+from react_drf.views import BatchView
+
+from tests.models import Article
+
+
+COLUMNAR = ColumnarJSONRenderer.media_type
+
+
+class ArticleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Article
+        fields = ['id', 'title']
+
+
+class ColumnarArticleList(generics.ListAPIView):
+    queryset = Article.objects.order_by('pk')
+    serializer_class = generator.export(ArticleSerializer)
+    renderer_classes = [renderers.JSONRenderer, ColumnarJSONRenderer]
+
+
+class ArticlePagination(pagination.PageNumberPagination):
+    page_size = 1
+
+
+class PaginatedArticleList(ColumnarArticleList):
+    pagination_class = ArticlePagination
+
+
+urlpatterns = [
+    url(r'^articles/$', ColumnarArticleList.as_view(), name='columnar-article-list'),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class ColumnarJSONRendererTests(TestCase):
+    def setUp(self):
+        self.exported = list(generator.patterns_to_export)
+        self.first = Article.objects.create(title='First')
+        self.second = Article.objects.create(title='Second')
+
+    def tearDown(self):
+        generator.patterns_to_export[:] = self.exported
+
+    def get(self, view, accept=COLUMNAR, **params):
+        response = view.as_view()(APIRequestFactory().get('/articles/', params, HTTP_ACCEPT=accept))
+        return response.render()
+
+    def test_lists_are_rendered_as_columns(self):
+        response = self.get(ColumnarArticleList)
+
+        self.assertEqual(response['Content-Type'], COLUMNAR)
+        self.assertJSONEqual(response.content.decode(), {
+            'columns': ['id', 'title'],
+            'rows': [[self.first.pk, 'First'], [self.second.pk, 'Second']],
+        })
+        self.assertJSONEqual(self.get(ColumnarArticleList, fields='title').content.decode(), {
+            'columns': ['title'],
+            'rows': [['First'], ['Second']],
+        })
+        self.assertJSONEqual(self.get(ColumnarArticleList, 'application/json').content.decode(), [
+            {'id': self.first.pk, 'title': 'First'},
+            {'id': self.second.pk, 'title': 'Second'},
+        ])
+
+    def test_pages_keep_their_envelope(self):
+        page = self.get(PaginatedArticleList).data
+
+        self.assertEqual(page['count'], 2)
+        self.assertJSONEqual(self.get(PaginatedArticleList).content.decode(), dict(page, results={
+            'columns': ['id', 'title'],
+            'rows': [[self.first.pk, 'First']],
+        }))
+
+    def test_batched_requests_negotiate_columns(self):
+        generator.register_list_of_urls_for_export(urlpatterns)
+        request = APIRequestFactory().post('/batch/', {'requests': [
+            {'url': '/articles/', 'accept': COLUMNAR},
+            {'url': '/articles/'},
+        ]}, format='json')
+        columnar, plain = BatchView.as_view()(request).data['responses']
+
+        self.assertEqual(columnar['data']['columns'], ['id', 'title'])
+        self.assertEqual(len(plain['data']), 2)
+
+
+@unittest.skipIf(msgpack is None, 'msgpack is not installed')
+class MessagePackTests(TestCase):
+    def test_round_trip(self):
+        data = {'title': 'First', 'tags': [1, 2], 'updated': datetime.datetime(2016, 1, 2, 3, 4, 5), 'author': None}
+        content = MessagePackRenderer().render(data)
+
+        self.assertEqual(MessagePackParser().parse(io.BytesIO(content)), dict(data, updated='2016-01-02T03:04:05'))
+        self.assertEqual(MessagePackRenderer().render(None), b'')
+
+    def test_negotiated_by_exported_views(self):
+        class MessagePackArticleList(ColumnarArticleList):
+            renderer_classes = [renderers.JSONRenderer, MessagePackRenderer]
+
+        article = Article.objects.create(title='First')
+        request = APIRequestFactory().get('/articles/', HTTP_ACCEPT='application/msgpack')
+        response = MessagePackArticleList.as_view()(request).render()
+
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content, raw=False), [{'id': article.pk, 'title': 'First'}])
+
+
+class MessagePackRequirementTests(TestCase):
+    def setUp(self):
+        self.patterns = list(generator.patterns_to_export)
+
+    def tearDown(self):
+        generator.patterns_to_export[:] = self.patterns
+
+    def test_checked_when_exported(self):
+        class MessagePackArticleList(ColumnarArticleList):
+            parser_classes = [MessagePackParser]
+
+        with mock.patch('react_drf.renderers.msgpack', None):
+            generator.export(url(r'^articles/$', ColumnarArticleList.as_view()))
+
+            with self.assertRaisesRegex(ImproperlyConfigured, 'MessagePackParser of MessagePackArticleList'):
+                generator.export(url(r'^msgpack-articles/$', MessagePackArticleList.as_view()))
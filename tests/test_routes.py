@@ -0,0 +1,75 @@
+import unittest
+
+from django.conf.urls import include, url
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from react_drf.routes import clear_templates, compile_pattern, reverse, url_template
+
+try:
+    from django.urls import path
+except ImportError:
+    path = None
+
+
+def view(request, **kwargs):
+    pass
+
+
+library = [
+    url(r'^books/(?P<pk>\d+)\.json$', view, name='book'),
+    url(r'^v1000/(?P<code>[a-z]+)/(?:(?P<page>\d+)/)?$', view, name='page'),
+    url(r'^unnamed/$', view),
+]
+
+urlpatterns = [
+    url(r'^shelves/(?P<shelf>\d+)/', include(library, namespace='library')),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class URLTemplateTests(TestCase):
+    def setUp(self):
+        clear_templates()
+
+    def tearDown(self):
+        clear_templates()
+
+    def fill(self, template, **kwargs):
+        for name, value in kwargs.items():
+            template = template.replace('${%s}' % name, str(value))
+        return template
+
+    def test_includes_prefix_arguments_and_names(self):
+        compiled = url_template(library[0])
+
+        self.assertEqual(compiled.name, 'library:book')
+        self.assertEqual(compiled.template, '/shelves/${shelf}/books/${pk}.json')
+        self.assertEqual(list(compiled.arguments.items()), [('shelf', 'string|number'), ('pk', 'string|number')])
+        self.assertEqual(self.fill(compiled.template, shelf=7, pk=1000), reverse(compiled.name, kwargs={'shelf': 7, 'pk': 1000}))
+
+    def test_literal_digits_and_optional_groups(self):
+        compiled = url_template(library[1])
+
+        self.assertEqual(compiled.template, '/shelves/${shelf}/v1000/${code}/${page}/')
+        self.assertEqual(
+            self.fill(compiled.template, shelf=1000, code='abc', page=2000),
+            reverse(compiled.name, kwargs={'shelf': 1000, 'code': 'abc', 'page': 2000}),
+        )
+
+    def test_unnamed_and_unrouted_patterns(self):
+        self.assertEqual(url_template(library[2]).template, '/shelves/${shelf}/unnamed/')
+        self.assertIsNone(url_template(library[2]).name)
+
+        loose = url(r'^loose/(?P<pk>\d+)/$', view, name='loose')
+        self.assertEqual(url_template(loose).template, '/loose/${pk}/')
+
+    def test_compiled_once_per_pattern(self):
+        self.assertIs(compile_pattern(library[0]), compile_pattern(library[0]))
+
+    @unittest.skipIf(path is None, 'path() requires Django 2.0')
+    def test_routes_are_typed_by_converters(self):
+        compiled = url_template(path('authors/<int:pk>/<slug:slug>/', view))
+
+        self.assertEqual(compiled.template, '/authors/${pk}/${slug}/')
+        self.assertEqual(list(compiled.arguments.items()), [('pk', 'number'), ('slug', 'string')])
@@ -0,0 +1,89 @@
+from django.test import TestCase, override_settings
+
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+
+from react_drf import generator
+from react_drf.serializers import overrides_representation, representation_plan
+
+from tests.models import Article, Author
+
+
+class ShoutingField(serializers.CharField):
+    def to_representation(self, value):
+        return value.upper()
+
+
+class CompiledArticleSerializer(serializers.ModelSerializer):
+    headline = ShoutingField(source='title')
+    summary = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Article
+        fields = ['id', 'title', 'headline', 'updated', 'author', 'summary']
+
+    def get_summary(self, article):
+        return '%s by %s' % (article.title, article.author.name if article.author else 'nobody')
+
+
+class ExtendedArticleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Article
+        fields = ['id', 'title']
+
+    def to_representation(self, article):
+        representation = super(ExtendedArticleSerializer, self).to_representation(article)
+        representation['extra'] = True
+        return representation
+
+
+@override_settings(REACT_DRF={'CHECK_COMPILED_SERIALIZERS': True})
+class CompiledRepresentationTests(TestCase):
+    def setUp(self):
+        self.exported = list(generator.serializers_to_export)
+        self.Serializer = generator.export(compiled=True)(CompiledArticleSerializer)
+
+        author = Author.objects.create(name='Author')
+        Article.objects.create(title='First', author=author)
+        Article.objects.create(title='Second')
+
+    def tearDown(self):
+        generator.serializers_to_export[:] = self.exported
+
+    def test_plan_reads_model_fields_directly(self):
+        self.assertEqual(representation_plan(self.Serializer()), (
+            ('id', 'id', 'int'),
+            ('title', 'title', 'str'),
+            ('headline', 'title', None),
+            ('updated', 'updated', None),
+            ('author', None, None),
+            ('summary', None, None),
+        ))
+
+    def test_matches_rest_framework(self):
+        articles = Article.objects.order_by('pk')
+        data = self.Serializer(articles, many=True).data
+
+        self.assertEqual(data, CompiledArticleSerializer(articles, many=True).data)
+        self.assertEqual(data[0]['headline'], 'FIRST')
+        self.assertEqual(data[1]['summary'], 'Second by nobody')
+
+    def test_sparse_fields_and_plain_objects(self):
+        request = APIRequestFactory().get('/articles/', {'fields': 'title,summary'})
+        article = Article.objects.get(title='First')
+
+        self.assertEqual(self.Serializer(article, context={'request': request}).data, {
+            'title': 'First',
+            'summary': 'First by Author',
+        })
+
+        request = APIRequestFactory().get('/articles/', {'fields': 'title'})
+        self.assertEqual(self.Serializer({'title': 'Plain'}, context={'request': request}).data, {'title': 'Plain'})
+
+    def test_overridden_representation_is_kept(self):
+        Serializer = generator.export(compiled=True)(ExtendedArticleSerializer)
+        article = Article.objects.get(title='First')
+
+        self.assertFalse(overrides_representation(self.Serializer))
+        self.assertTrue(overrides_representation(Serializer))
+        self.assertEqual(Serializer(article).data, {'id': article.pk, 'title': 'First', 'extra': True})
@@ -0,0 +1,48 @@
+import collections
+import decimal
+import json
+
+from django.test import TestCase
+from django.utils.translation import ugettext_lazy
+
+from react_drf.typescript import literal
+
+
+class LiteralTests(TestCase):
+    def test_narrows_names_and_types(self):
+        field = collections.OrderedDict([
+            ('type', 'nested object'),
+            ('children', {'type': 'string'}),
+            ('name', 'author'),
+        ])
+
+        self.assertEqual(
+            literal(field),
+            '{"type": "nested object" as "nested object", "children": {"type": "string" as "string"}, '
+            '"name": "author" as "author"}',
+        )
+
+    def test_values_are_not_narrowed(self):
+        field = collections.OrderedDict([
+            ('type', 'choice'),
+            ('label', 'string'),
+            ('choices', [{'value': 'string', 'display_name': 'A "string"'}]),
+        ])
+
+        self.assertEqual(
+            literal(field),
+            '{"type": "choice" as "choice", "label": "string", '
+            '"choices": [{"value": "string", "display_name": "A \\"string\\""}]}',
+        )
+
+    def test_formatted_like_json(self):
+        value = collections.OrderedDict([
+            ('required', True), ('default', None), ('max_digits', 6), ('ratio', 0.5), ('items', [1, 'a', False]),
+        ])
+        self.assertEqual(literal(value), json.dumps(value))
+
+    def test_other_values(self):
+        self.assertEqual(literal([decimal.Decimal('1.50'), ugettext_lazy('Title')]), '[1.50, "Title"]')
+
+        with self.assertRaises(TypeError):
+            literal(object())
@@ -0,0 +1,412 @@
+import datetime
+from unittest import mock
+from urllib.parse import parse_qsl, urlsplit
+
+from django.conf.urls import url
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from rest_framework import generics, permissions, serializers
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from react_drf import generator
+from react_drf.metadata import ExportedMetadata, serializer_info_cache
+from react_drf.serializers import query_plan
+from react_drf.views import BatchView, ConditionalGetMixin, DeltaSyncMixin, QueryPlanMixin, SparseQuerysetMixin
+
+from tests.models import Article, Author, Tag
+
+
+class ArticleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Article
+        fields = ['id', 'title']
+
+
+class ArticleList(ConditionalGetMixin, generics.ListAPIView):
+    queryset = Article.objects.all()
+    serializer_class = ArticleSerializer
+
+
+class ArticleDetail(ConditionalGetMixin, generics.RetrieveAPIView):
+    queryset = Article.objects.all()
+    serializer_class = ArticleSerializer
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.article = Article.objects.create(title='First')
+
+    def get(self, view, etag=None, **kwargs):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return view.as_view()(self.factory.get('/articles/', **headers), **kwargs)
+
+    def test_not_modified_until_changed(self):
+        response = self.get(ArticleList)
+        etag = response['ETag']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+        response = self.get(ArticleList, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        Article.objects.create(title='Second')
+        response = self.get(ArticleList, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_is_tagged_by_its_object(self):
+        other = Article.objects.create(title='Other')
+        etag = self.get(ArticleDetail, pk=self.article.pk)['ETag']
+
+        self.assertEqual(self.get(ArticleDetail, etag, pk=self.article.pk).status_code, 304)
+
+        other.title = 'Changed'
+        other.save()
+        self.assertEqual(self.get(ArticleDetail, etag, pk=self.article.pk).status_code, 304)
+
+        self.article.save()
+        self.assertEqual(self.get(ArticleDetail, etag, pk=self.article.pk).status_code, 200)
+
+    def test_tags_vary_by_user_and_format(self):
+        first, second = [get_user_model().objects.create(username=name) for name in ('first', 'second')]
+
+        def get(user, etag=None, **kwargs):
+            headers = dict(kwargs, HTTP_IF_NONE_MATCH=etag) if etag else kwargs
+            request = self.factory.get('/articles/', **headers)
+            force_authenticate(request, user)
+            return ArticleList.as_view()(request)
+
+        response = get(first)
+        etag = response['ETag']
+
+        self.assertEqual(response['Vary'], 'Accept, Authorization, Cookie')
+        self.assertEqual(get(first, etag)['Vary'], 'Accept, Authorization, Cookie')
+        self.assertEqual(get(first, etag).status_code, 304)
+        self.assertEqual(get(second, etag).status_code, 200)
+        self.assertEqual(get(None, etag).status_code, 200)
+        self.assertEqual(get(first, etag, HTTP_ACCEPT='text/html').status_code, 200)
+
+    def test_object_permissions_are_checked_before_not_modified(self):
+        etag = self.get(ArticleDetail, pk=self.article.pk)['ETag']
+
+        class Denied(permissions.BasePermission):
+            def has_object_permission(self, request, view, obj):
+                return False
+
+        with mock.patch.object(ArticleDetail, 'permission_classes', [Denied]):
+            for tag in (etag, '*'):
+                response = self.get(ArticleDetail, tag, pk=self.article.pk)
+                self.assertEqual(response.status_code, 403)
+                self.assertFalse(response.has_header('ETag'))
+
+    def test_missing_objects_are_not_tagged(self):
+        response = self.get(ArticleDetail, pk=self.article.pk + 100)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class SparseArticleList(SparseQuerysetMixin, generics.ListAPIView):
+    queryset = Article.objects.all()
+    serializer_class = generator.export(ArticleSerializer)
+
+
+class WritableSparseArticleList(SparseQuerysetMixin, generics.ListCreateAPIView):
+    queryset = Article.objects.all()
+    serializer_class = SparseArticleList.serializer_class
+    metadata_class = ExportedMetadata
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.exported = list(generator.serializers_to_export)
+        Article.objects.create(title='First')
+
+    def tearDown(self):
+        generator.serializers_to_export[:] = self.exported
+
+    def test_requested_fields_only(self):
+        request = APIRequestFactory().get('/articles/', {'fields': 'title'})
+        view = SparseArticleList(request=SparseArticleList().initialize_request(request), format_kwarg=None)
+
+        self.assertEqual(view.get_queryset().query.deferred_loading, ({'id', 'title'}, False))
+        self.assertEqual(SparseArticleList.as_view()(request).data, [{'title': 'First'}])
+
+    def test_all_fields_by_default(self):
+        article, = SparseArticleList.as_view()(APIRequestFactory().get('/articles/')).data
+
+        self.assertEqual(set(article), {'id', 'title'})
+
+    def test_only_reads_are_pruned(self):
+        serializer_info_cache.clear()
+        view = WritableSparseArticleList.as_view()
+
+        actions = view(APIRequestFactory().options('/articles/?fields=id')).data['actions']
+        self.assertEqual(set(actions['POST']), {'id', 'title'})
+        actions = view(APIRequestFactory().options('/articles/')).data['actions']
+        self.assertEqual(set(actions['POST']), {'id', 'title'})
+
+        response = view(APIRequestFactory().post('/articles/?fields=id', {'title': 'Second'}, format='json'))
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Article.objects.filter(title='Second').exists())
+
+
+class MentorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Author
+        fields = ['id', 'name']
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    mentor = MentorSerializer()
+
+    class Meta:
+        model = Author
+        fields = ['id', 'name', 'mentor']
+
+
+class TagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ['id', 'name']
+
+
+class NestedArticleSerializer(serializers.ModelSerializer):
+    author = AuthorSerializer()
+    tags = TagSerializer(many=True)
+    tag_ids = serializers.PrimaryKeyRelatedField(source='tags', many=True, read_only=True)
+
+    class Meta:
+        model = Article
+        fields = ['id', 'title', 'author', 'tags', 'tag_ids']
+
+
+class PlannedArticleList(QueryPlanMixin, SparseQuerysetMixin, generics.ListAPIView):
+    queryset = Article.objects.all()
+    serializer_class = generator.export(NestedArticleSerializer)
+
+
+class UserArticleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Article
+        fields = ['id', 'title', 'author']
+
+    def get_fields(self):
+        fields = super(UserArticleSerializer, self).get_fields()
+
+        if not self.context['request'].user.is_staff:
+            fields['author'] = AuthorSerializer(read_only=True)
+        return fields
+
+
+class QueryPlanTests(TestCase):
+    def setUp(self):
+        self.exported = list(generator.serializers_to_export)
+
+    def tearDown(self):
+        generator.serializers_to_export[:] = self.exported
+
+    def test_plan_per_field(self):
+        plan = query_plan(NestedArticleSerializer)
+
+        self.assertEqual(plan['title'], ([], []))
+        self.assertEqual(plan['author'], (['author', 'author__mentor'], []))
+        self.assertEqual(plan['tags'], ([], ['tags']))
+        self.assertEqual(plan['tag_ids'], ([], ['tags']))
+        self.assertIs(query_plan(NestedArticleSerializer), plan)
+
+    def test_plan_uses_introspection_context(self):
+        self.assertEqual(query_plan(UserArticleSerializer)['author'], (['author', 'author__mentor'], []))
+
+    def test_list_queries_do_not_grow_with_objects(self):
+        mentor = Author.objects.create(name='Mentor')
+        tag = Tag.objects.create(name='Tag')
+
+        for index in range(3):
+            article = Article.objects.create(title=str(index), author=Author.objects.create(name='Author', mentor=mentor))
+            article.tags.add(tag)
+
+        with self.assertNumQueries(2):
+            response = PlannedArticleList.as_view()(APIRequestFactory().get('/articles/'))
+            response.render()
+
+        self.assertEqual(response.data[0]['author']['mentor']['name'], 'Mentor')
+
+        with self.assertNumQueries(1):
+            response = PlannedArticleList.as_view()(APIRequestFactory().get('/articles/', {'fields': 'title,author'}))
+            response.render()
+
+        self.assertEqual(response.data[0]['author']['mentor']['name'], 'Mentor')
+
+
+class SyncedArticleList(DeltaSyncMixin, generics.ListAPIView):
+    queryset = Article.objects.all()
+    serializer_class = ArticleSerializer
+    sync_overlap = datetime.timedelta(0)
+
+
+class DeltaSyncTests(TestCase):
+    def sync(self, since=None, **params):
+        if since is not None:
+            params['since'] = since
+        return SyncedArticleList.as_view()(APIRequestFactory().get('/articles/', params))
+
+    def test_changes_since_watermark(self):
+        first = Article.objects.create(title='First')
+        second = Article.objects.create(title='Second')
+        Article.objects.create(title='Third')
+
+        delta = self.sync('').data
+        self.assertTrue(delta['full'])
+        self.assertEqual(len(delta['changed']), 3)
+        self.assertEqual(delta['deleted'], [])
+        self.assertIsNone(delta['next'])
+
+        deleted = second.pk
+        first.save()
+        second.delete()
+        delta = self.sync(delta['watermark']).data
+
+        self.assertFalse(delta['full'])
+        self.assertEqual(delta['changed'], [{'id': first.pk, 'title': 'First'}])
+        self.assertEqual(delta['deleted'], [deleted])
+
+        delta = self.sync(delta['watermark']).data
+        self.assertEqual((delta['changed'], delta['deleted']), ([], []))
+
+    def test_full_syncs_are_paginated(self):
+        articles = [Article.objects.create(title=str(index)) for index in range(5)]
+
+        with mock.patch.object(SyncedArticleList, 'sync_page_size', 2):
+            pages = [self.sync('').data]
+
+            while pages[-1]['next']:
+                url = urlsplit(pages[-1]['next'])
+                request = APIRequestFactory().get(url.path, dict(parse_qsl(url.query, keep_blank_values=True)))
+                pages.append(SyncedArticleList.as_view()(request).data)
+
+        self.assertEqual([[item['id'] for item in page['changed']] for page in pages], [
+            [articles[0].pk, articles[1].pk], [articles[2].pk, articles[3].pk], [articles[4].pk],
+        ])
+        self.assertEqual({page['watermark'] for page in pages}, {pages[0]['watermark']})
+        self.assertTrue(all(page['full'] for page in pages))
+        self.assertEqual(self.sync('', cursor='yesterday,1').status_code, 400)
+        self.assertEqual(self.sync('', cursor='%s,first' % pages[0]['watermark']).status_code, 400)
+
+    def test_old_watermarks_sync_everything(self):
+        Article.objects.create(title='First')
+        Article.objects.create(title='Second').delete()
+        watermark = (timezone.now() - datetime.timedelta(days=31)).isoformat()
+
+        delta = self.sync(watermark).data
+        self.assertTrue(delta['full'])
+        self.assertEqual(([item['title'] for item in delta['changed']], delta['deleted']), (['First'], []))
+
+        with override_settings(REACT_DRF={'TOMBSTONE_RETENTION': datetime.timedelta(days=60)}):
+            delta = self.sync(watermark).data
+
+        self.assertFalse(delta['full'])
+        self.assertEqual(len(delta['deleted']), 1)
+
+    def test_watermarks_with_and_without_timezones(self):
+        Article.objects.create(title='First')
+
+        for use_tz in (True, False):
+            with override_settings(USE_TZ=use_tz):
+                for watermark in ('2100-01-01T00:00:00+00:00', '2100-01-01T00:00:00'):
+                    delta = self.sync(watermark).data
+                    self.assertEqual((delta['full'], delta['changed']), (False, []))
+
+                    delta = self.sync('', cursor='%s,0' % watermark).data
+                    self.assertEqual((delta['full'], len(delta['changed'])), (True, 1))
+
+    def test_lists_without_since(self):
+        Article.objects.create(title='First')
+
+        self.assertEqual(len(self.sync().data), 1)
+        self.assertEqual(self.sync('yesterday').status_code, 400)
+
+
+class UnexportedArticleList(generics.ListAPIView):
+    queryset = Article.objects.all()
+    serializer_class = ArticleSerializer
+
+
+class FailingArticleList(ArticleList):
+    def list(self, request, *args, **kwargs):
+        raise ValueError('Failed')
+
+
+class ResolvedArticleDetail(ArticleDetail):
+    def retrieve(self, request, *args, **kwargs):
+        response = super(ResolvedArticleDetail, self).retrieve(request, *args, **kwargs)
+        response.data = dict(response.data, url_name=request.resolver_match.url_name, url=request.build_absolute_uri())
+        return response
+
+
+urlpatterns = [
+    url(r'^articles/$', ArticleList.as_view(), name='article-list'),
+    url(r'^articles/(?P<pk>\d+)/$', ArticleDetail.as_view(), name='article-detail'),
+    url(r'^unexported-articles/$', UnexportedArticleList.as_view(), name='unexported-article-list'),
+    url(r'^failing-articles/$', FailingArticleList.as_view(), name='failing-article-list'),
+    url(r'^resolved-articles/(?P<pk>\d+)/$', ResolvedArticleDetail.as_view(), name='resolved-article-detail'),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class BatchViewTests(TestCase):
+    def setUp(self):
+        self.exported = list(generator.patterns_to_export)
+        generator.register_list_of_urls_for_export(urlpatterns[:2] + urlpatterns[3:])
+        self.article = Article.objects.create(title='First')
+
+    def tearDown(self):
+        generator.patterns_to_export[:] = self.exported
+
+    def batch(self, *requests, **kwargs):
+        request = APIRequestFactory().post('/batch/', {'requests': list(requests)}, format='json', **kwargs)
+        return BatchView.as_view()(request)
+
+    def test_responses_follow_request_order(self):
+        detail = '/articles/%s/' % self.article.pk
+        response = self.batch({'url': detail}, {'url': 'http://testserver/articles/?page=1'})
+        first, second = response.data['responses']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((first['status'], first['data']['title']), (200, 'First'))
+        self.assertEqual((second['status'], len(second['data'])), (200, 1))
+
+        first, = self.batch({'url': detail, 'etag': first['etag']}).data['responses']
+        self.assertEqual((first['status'], first['data']), (304, None))
+
+    def test_only_exported_views_are_resolved(self):
+        unexported, missing = self.batch({'url': '/unexported-articles/'}, {'url': '/missing/'}).data['responses']
+
+        self.assertEqual(unexported['status'], 404)
+        self.assertEqual(missing['status'], 404)
+
+    def test_views_get_their_own_requests(self):
+        detail = '/resolved-articles/%s/' % self.article.pk
+        first, second = self.batch({'url': detail}, {'url': detail + '?page=2'}, secure=True).data['responses']
+
+        self.assertEqual(first['data']['url_name'], 'resolved-article-detail')
+        self.assertEqual(first['data']['url'], 'https://testserver%s' % detail)
+        self.assertEqual(second['data']['url'], 'https://testserver%s?page=2' % detail)
+
+    def test_errors_fail_only_their_request(self):
+        with self.assertLogs('django.request', 'ERROR') as logs:
+            failing, listed = self.batch({'url': '/failing-articles/'}, {'url': '/articles/'}).data['responses']
+
+        self.assertEqual(failing['status'], 500)
+        self.assertEqual((listed['status'], len(listed['data'])), (200, 1))
+        self.assertIn('Internal Server Error: /failing-articles/', logs.output[0])
+
+    def test_rejects_malformed_and_oversized_batches(self):
+        self.assertEqual(self.batch('/articles/').status_code, 400)
+        self.assertEqual(self.batch(*[{'url': '/articles/'}] * 51).status_code, 400)
@@ -0,0 +1,211 @@
+import importlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+
+from react_drf import generator
+from react_drf.watch import PollingWatcher, RestartRequired, modules_to_reload, reload_exports, watch
+
+
+SOURCES = {
+    'watched_models': '''
+from django.db import models
+
+
+class Shelf(models.Model):
+    class Meta:
+        abstract = True
+''',
+    'watched_serializers': '''
+from rest_framework import serializers
+
+from react_drf import generator
+from tests.models import Author
+
+
+class ShelfSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Author
+        fields = ['id', 'name']
+
+
+class BookcaseSerializer(ShelfSerializer):
+    pass
+
+
+ShelfExport = generator.export(ShelfSerializer)
+BookcaseExport = generator.export(BookcaseSerializer)
+''',
+    'watched_views': '''
+from rest_framework import generics
+
+from watched_serializers import ShelfExport
+
+
+class ShelfList(generics.ListAPIView):
+    serializer_class = ShelfExport
+''',
+    'watched_urls': '''
+from django.conf.urls import url
+
+from react_drf import generator
+from watched_views import ShelfList
+
+urlpatterns = generator.export(
+    url(r'^shelves/$', ShelfList.as_view(), name='shelf-list'),
+    url(r'^bookcases/$', ShelfList.as_view(), name='bookcase-list'),
+)
+''',
+    'watched_constants': '''
+SHELVES = 3
+''',
+    'watched_cases': '''
+from rest_framework import serializers
+
+from react_drf import generator
+from tests.models import Author
+
+
+class CaseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Author
+        fields = ['id', 'mentor']
+
+    def get_fields(self):
+        from watched_serializers import ShelfExport
+
+        fields = super(CaseSerializer, self).get_fields()
+        fields['mentor'] = ShelfExport(read_only=True)
+        return fields
+
+
+CaseExport = generator.export(CaseSerializer)
+''',
+}
+
+
+class PollingWatcherTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'serializers.py')
+
+        with open(self.filename, 'w') as f:
+            f.write('')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_reports_modified_files(self):
+        watcher = PollingWatcher(interval=0.01)
+        self.assertEqual(watcher.changed([self.filename]), set())
+
+        stat = os.stat(self.filename)
+        os.utime(self.filename, (stat.st_atime, stat.st_mtime + 1))
+
+        self.assertEqual(watcher.wait([self.filename]), {self.filename})
+        self.assertEqual(watcher.changed([self.filename]), set())
+
+
+class ReloadTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.exported = list(generator.serializers_to_export)
+        self.patterns = list(generator.patterns_to_export)
+        self.dependencies = dict(generator.registry.dependencies)
+        sys.path.insert(0, self.directory)
+
+        # Reloads must see sources written within the same second.
+        self.dont_write_bytecode = sys.dont_write_bytecode
+        sys.dont_write_bytecode = True
+
+        for name, source in SOURCES.items():
+            self.write(name, source)
+
+        self.modules = [importlib.import_module(name) for name in sorted(SOURCES)]
+
+    def tearDown(self):
+        for name in SOURCES:
+            sys.modules.pop(name, None)
+
+        sys.path.remove(self.directory)
+        sys.dont_write_bytecode = self.dont_write_bytecode
+        generator.serializers_to_export[:] = self.exported
+        generator.patterns_to_export[:] = self.patterns
+        generator.registry.dependencies = self.dependencies
+        shutil.rmtree(self.directory)
+
+    def write(self, name, source):
+        with open(os.path.join(self.directory, '%s.py' % name), 'w') as f:
+            f.write(source)
+
+    def test_referring_modules_are_reloaded_after(self):
+        views = sys.modules['watched_views']
+        urls = sys.modules['watched_urls']
+        serializers = sys.modules['watched_serializers']
+
+        self.assertEqual(modules_to_reload([serializers], self.modules), [serializers, views, urls])
+        self.assertEqual(modules_to_reload([urls], self.modules), [urls])
+        self.assertEqual(modules_to_reload([sys.modules['watched_constants']], self.modules), [sys.modules['watched_constants']])
+
+    def test_modules_nesting_exports_are_reloaded(self):
+        serializers = sys.modules['watched_serializers']
+        cases = sys.modules['watched_cases']
+        self.assertNotIn(cases, modules_to_reload([serializers], self.modules))
+
+        generator.serializers_to_export[:] = [serializers.ShelfExport, cases.CaseExport]
+        generator.serializer_entries()
+
+        self.assertIn(cases, modules_to_reload([serializers], self.modules))
+        self.assertEqual(modules_to_reload([cases], self.modules), [cases])
+
+    def test_models_and_settings_require_a_restart(self):
+        with self.assertRaisesRegex(RestartRequired, 'watched_models'):
+            modules_to_reload([sys.modules['watched_models']], self.modules)
+
+        with mock.patch.dict(os.environ, {'DJANGO_SETTINGS_MODULE': 'watched_constants'}):
+            with self.assertRaisesRegex(RestartRequired, 'watched_constants'):
+                modules_to_reload([sys.modules['watched_constants']], self.modules)
+
+    def test_exports_are_replaced_in_place(self):
+        Shelf = sys.modules['watched_serializers'].ShelfExport
+        position = list(generator.serializers_to_export).index(Shelf)
+        patterns = len(generator.patterns_to_export)
+
+        self.write('watched_serializers', SOURCES['watched_serializers'].replace(
+            "BookcaseExport = generator.export(BookcaseSerializer)\n", '',
+        ))
+        self.write('watched_urls', SOURCES['watched_urls'].replace(
+            "    url(r'^bookcases/$', ShelfList.as_view(), name='bookcase-list'),\n", '',
+        ))
+        reloaded = reload_exports([sys.modules['watched_serializers']], self.modules)
+
+        self.assertEqual([module.__name__ for module in reloaded], ['watched_serializers', 'watched_views', 'watched_urls'])
+        self.assertIsNot(sys.modules['watched_serializers'].ShelfExport, Shelf)
+        self.assertIs(generator.serializers_to_export[position], sys.modules['watched_serializers'].ShelfExport)
+        self.assertIsNone(generator.serializers_to_export.get('watched_serializers.BookcaseSerializer'))
+        self.assertEqual(len(generator.patterns_to_export), patterns - 1)
+        self.assertIs(
+            generator.patterns_to_export[-1].callback.view_class.serializer_class,
+            sys.modules['watched_serializers'].ShelfExport,
+        )
+
+    def test_watch_restarts_on_model_changes(self):
+        models = sys.modules['watched_models']
+        regenerate = mock.Mock()
+        stdout = io.StringIO()
+
+        with mock.patch('react_drf.watch.pyinotify', None), \
+                mock.patch('react_drf.watch.source_modules', return_value={models.__file__: models}), \
+                mock.patch.object(PollingWatcher, 'wait', return_value={models.__file__}), \
+                mock.patch('react_drf.watch.restart', side_effect=SystemExit) as restart:
+            with self.assertRaises(SystemExit):
+                watch(regenerate, stdout=stdout)
+
+        restart.assert_called_once_with()
+        regenerate.assert_not_called()
+        self.assertIn('watched_models cannot be reloaded in place, restarting.', stdout.getvalue())